@@ -1,3 +1,9 @@
+from .profiler import Profiler, PROFILE
+from .export import SeriesInfo, ExportedData, export_series, CYCLES, EUROS, SECONDS
+from .data_series import DataSeries
+from .aggregate import Aggregate, WindowAggregator
 from .data_collector import DataCollector
+from .convergence import ConvergenceMonitor
 from .data_generator import DataGenerator
+from .cycle_record import CycleRecord
 from .simulator import Simulator
@@ -0,0 +1,76 @@
+from enum import Enum
+from typing import Any, Optional
+
+
+class Aggregate(Enum):
+    """Aggregates of a field over the cycles of a collect window. The series of the field itself holds its last value
+    of the window, as when the field is only sampled."""
+    SUM = 0
+    MEAN = 1
+    MIN = 2
+    MAX = 3
+
+    def series_name(self, data_field: str) -> str:
+        """:return the name of the series of the aggregate of a data field."""
+        return data_field + " (" + self.name.lower() + ")"
+
+    @staticmethod
+    def data_field(series_name: str) -> str:
+        """:return the data field of which a series holds an aggregate, or the name of the series if it holds no
+        aggregate."""
+        for aggregate in Aggregate:
+            suffix: str = " (" + aggregate.name.lower() + ")"
+
+            if series_name.endswith(suffix):
+                return series_name[:-len(suffix)]
+
+        return series_name
+
+
+class WindowAggregator:
+    """The running aggregates of a field over the cycles of the current collect window."""
+
+    __slots__ = ('__sum', '__count', '__min', '__max')
+
+    def __init__(self):
+        self.__sum: Any = None
+        self.__count: int = 0
+        self.__min: Any = None
+        self.__max: Any = None
+
+    @property
+    def count(self) -> int:
+        """:return the number of cycles added since the window started."""
+        return self.__count
+
+    def add(self, value: Any):
+        if self.__count == 0:
+            self.__sum = value
+            self.__min = value
+            self.__max = value
+        else:
+            self.__sum += value
+            self.__min = min(self.__min, value)
+            self.__max = max(self.__max, value)
+
+        self.__count += 1
+
+    def value(self, aggregate: Aggregate) -> Optional[Any]:
+        """:return the aggregate of the window, None if no cycle was added."""
+        if self.__count == 0:
+            return None
+        elif aggregate == Aggregate.SUM:
+            return self.__sum
+        elif aggregate == Aggregate.MEAN:
+            return self.__sum / self.__count
+        elif aggregate == Aggregate.MIN:
+            return self.__min
+        else:
+            return self.__max
+
+    def reset(self):
+        """Start a new window."""
+        self.__sum = None
+        self.__count = 0
+        self.__min = None
+        self.__max = None
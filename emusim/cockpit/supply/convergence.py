@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+from math import isfinite
+from typing import List, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from . import DataCollector
+
+
+class ConvergenceMonitor:
+    """Detects a steady state of a simulation from the collected data. The simulation is in a steady state when all
+    watched series varied less than the tolerance over the last window samples. The tolerance is absolute for values up
+    to 1, like rates and ratios, and relative to the last value for larger values."""
+
+    def __init__(self, series: List[Tuple[str, str]], window: int, tolerance: float = 1e-6):
+        """:param series the category and data field of the watched series. They need to be collected.
+        :param window the number of samples over which the series need to be stable.
+        :param tolerance the maximum variation of a series in the window."""
+        self.series: List[Tuple[str, str]] = series
+        self.window: int = max(2, window)
+        self.tolerance: float = tolerance
+
+    def converged(self, collector: DataCollector) -> bool:
+        """:return True if all watched series are stable over the last window samples collected."""
+        for category, data_field in self.series:
+            values: List[float] = [float(value)
+                                   for value in collector.get_data_series(category, data_field)[-self.window:]]
+
+            if len(values) < self.window or not all(isfinite(value) for value in values):
+                return False
+
+            if max(values) - min(values) > self.tolerance * max(1.0, abs(values[-1])):
+                return False
+
+        return True
@@ -0,0 +1,19 @@
+from typing import Any, Dict, Optional, Tuple
+
+
+class CycleRecord:
+    """A cycle of a simulation run, as yielded by Simulator.stream. The sample holds the data collected in the cycle by
+    category and data field, or None when no data was collected in the cycle."""
+
+    __slots__ = ('cycle', 'sample')
+
+    def __init__(self, cycle: int, sample: Optional[Dict[Tuple[str, str], Any]] = None):
+        self.cycle: int = cycle
+        self.sample: Optional[Dict[Tuple[str, str], Any]] = sample
+
+    @property
+    def collected(self) -> bool:
+        return self.sample is not None
+
+    def __repr__(self) -> str:
+        return "CycleRecord(" + str(self.cycle) + ", " + str(self.sample) + ")"
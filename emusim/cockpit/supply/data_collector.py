@@ -2,19 +2,52 @@ from __future__ import annotations
 
 from decimal import *
 from collections import OrderedDict as OrdDict
-from typing import List, KeysView, OrderedDict, TYPE_CHECKING
+from typing import Any, Callable, Dict, List, KeysView, Optional, OrderedDict, Tuple, TYPE_CHECKING
+
+import numpy as np
+
+from .data_series import DataSeries
+from .aggregate import Aggregate, WindowAggregator
+from .export import export_series
 
 if TYPE_CHECKING:
     from . import Simulator
 
 
 class DataCollector():
+    """Collects the data of a simulation in columns, a DataSeries per category and data field. The columns are
+    preallocated for the samples of a run, see reserve. They hold float64 values, unless exact is set."""
+
+    # Number of samples a column is allocated for when no run reserved them
+    DEFAULT_CAPACITY: int = 64
 
     def __init__(self, simulator: Simulator):
         self.__simulator = simulator
-        self.__data_dict: OrderedDict[str, OrderedDict[str, List[Decimal]]] = OrdDict()
+        self.__data_dict: OrderedDict[str, OrderedDict[str, DataSeries]] = OrdDict()
+        self.__first: Optional[DataSeries] = None
+        self.__capacity: int = self.DEFAULT_CAPACITY
         self.__data_structure: OrderedDict[str, OrderedDict[str, bool]] = OrdDict()
 
+        # Minimum number of recent samples retained per series, for streamed runs in bounded memory. Older samples are
+        # dropped in batches, so at most twice as many are held. None retains all samples.
+        self.retain: Optional[int] = None
+
+        # Whether the columns created from now on hold the numbers as they were collected, like Decimals, in object
+        # arrays instead of float64 arrays. Exact columns take several times the memory.
+        self.exact: bool = False
+
+        # Aggregates of fields over every cycle of a collect window, see set_aggregates
+        self.__aggregates: OrderedDict[str, OrderedDict[str, List[Aggregate]]] = OrdDict()
+        self.__aggregators: Dict[Tuple[str, str], WindowAggregator] = {}
+
+        # The series of the fields which are collected with the getters of their data and their collection steps, and
+        # the aggregated fields with the series of their aggregates. Compiled on the first collection of a run, and
+        # again after set_collect_data or set_aggregates changed.
+        self.__plan: Optional[List[Tuple[DataSeries, Callable[[], Decimal],
+                                         Optional[Callable[[Decimal], None]]]]] = None
+        self.__window_plan: Optional[List[Tuple[Callable[[], Decimal], WindowAggregator,
+                                                List[Tuple[Aggregate, DataSeries]]]]] = None
+
     @property
     def simulator(self) -> Simulator:
         return self.__simulator
@@ -23,30 +56,82 @@ class DataCollector():
     def data_structure(self) -> OrderedDict[str, OrderedDict[str, bool]]:
         return self.__data_structure
 
+    @property
+    def aggregating(self) -> bool:
+        """:return True if collected fields are aggregated over their collect windows, so every cycle needs to be
+        accumulated."""
+        if self.__plan is None:
+            self.__compile_plan()
+
+        return len(self.__window_plan) > 0
+
     @property
     def size(self) -> int:
-        if len(self.get_categories()) > 0:
-            category: str = list(self.get_categories())[0]
+        """:return the number of samples in the first series."""
+        return len(self.__first) if self.__first is not None else 0
 
-            if len(self.get_data_fields(category)) > 0:
-                return len(self.get_data_series(category, list(self.get_data_fields(category))[0]))
+    @property
+    def nbytes(self) -> int:
+        """:return the number of bytes allocated for the columns. Of exact columns, without the numbers they refer
+        to."""
+        return sum(series.nbytes for data_fields in self.__data_dict.values() for series in data_fields.values())
+
+    def reserve(self, samples: int):
+        """Allocate the columns created from now on for a number of samples. Columns which fill up double in size.
 
-        return 0
+        :param samples the expected number of samples of each series."""
+        self.__capacity = max(1, samples)
 
     def set_collect_data(self, category: str, data_field: str, collect: bool):
         if not category in self.data_structure:
             self.data_structure[category] = OrdDict()
 
+        if self.data_structure[category].get(data_field) != collect:
+            self.__plan = None
+
         self.data_structure[category][data_field] = collect
 
+    def set_aggregates(self, category: str, data_field: str, aggregates: List[Aggregate]):
+        """Aggregate a collected field over all cycles of each collect window, instead of only sampling it on the last
+        cycle. Every aggregate is collected as a series of its own, named by Aggregate.series_name, after the series of
+        the field.
+
+        :param category the category of the field.
+        :param data_field the data field.
+        :param aggregates the aggregates to collect. Empty to only sample the field."""
+        if not category in self.__aggregates:
+            self.__aggregates[category] = OrdDict()
+
+        self.__aggregates[category][data_field] = list(aggregates)
+        self.__plan = None
+
+    def get_aggregates(self, category: str, data_field: str) -> List[Aggregate]:
+        return self.__aggregates.get(category, {}).get(data_field, [])
+
     def add_data(self, category: str, data_field: str, data: Decimal):
+        series: DataSeries = self.__series(category, data_field)
+        series.append(data)
+
+        if self.retain is not None and len(series) >= 2 * max(1, self.retain):
+            series.trim(max(1, self.retain))
+
+    def __series(self, category: str, data_field: str) -> DataSeries:
         if not category in self.__data_dict:
             self.__data_dict[category] = OrdDict()
 
         if not data_field in self.__data_dict[category]:
-            self.__data_dict[category][data_field] = []
+            capacity: int = self.__capacity
+
+            # retained series never hold more than twice the retained samples
+            if self.retain is not None:
+                capacity = min(capacity, 2 * max(1, self.retain))
 
-        self.__data_dict[category][data_field].append(data)
+            self.__data_dict[category][data_field] = DataSeries(capacity, self.exact)
+
+            if self.__first is None:
+                self.__first = self.__data_dict[category][data_field]
+
+        return self.__data_dict[category][data_field]
 
     def get_categories(self) -> KeysView[str]:
         return self.__data_dict.keys()
@@ -54,17 +139,99 @@ class DataCollector():
     def get_data_fields(self, category: str) -> KeysView[str]:
         return self.__data_dict[category].keys()
 
-    def get_data_series(self, category: str, data_field: str) -> List[Decimal]:
+    def get_data_series(self, category: str, data_field: str) -> np.ndarray:
+        """:return a view of the collected series, empty if it was not collected. The view is not copied, so it is only
+        extended by collections when taken again."""
+        if category in self.__data_dict and data_field in self.__data_dict[category]:
+            return self.__data_dict[category][data_field].values
+        else:
+            return np.empty(0, dtype=object if self.exact else float)
+
+    def get_last_data(self, category: str, data_field: str) -> Optional[Decimal]:
+        """:return the last collected data of a field as it was collected, so it is exact when the series holds
+        float64 values. None if it was not collected."""
         if category in self.__data_dict and data_field in self.__data_dict[category]:
-            return self.__data_dict[category][data_field]
+            return self.__data_dict[category][data_field].last
         else:
-            return []
+            return None
+
+    def accumulate(self):
+        """Add the data of the current cycle to the aggregates of its collect window."""
+        if self.__plan is None:
+            self.__compile_plan()
+
+        for getter, aggregator, series in self.__window_plan:
+            aggregator.add(getter())
 
     def collect_data(self):
+        if self.__plan is None:
+            self.__compile_plan()
+
+        # the collected cycle completes the window
+        if len(self.__window_plan) > 0:
+            self.accumulate()
+
+        for series, getter, step in self.__plan:
+            data: Decimal = getter()
+            series.append(data)
+
+            if step is not None:
+                step(data)
+
+        for getter, aggregator, aggregate_series in self.__window_plan:
+            for aggregate, series in aggregate_series:
+                series.append(aggregator.value(aggregate))
+
+            aggregator.reset()
+
+        if self.retain is not None:
+            retain: int = max(1, self.retain)
+
+            for data_fields in self.__data_dict.values():
+                for series in data_fields.values():
+                    if len(series) >= 2 * retain:
+                        series.trim(retain)
+
+    def __compile_plan(self):
+        self.__plan = []
+        self.__window_plan = []
+
         for category in self.data_structure.keys():
             for data_field in self.data_structure[category].keys():
                 if self.data_structure[category][data_field]:
-                    self.add_data(category, data_field, self.simulator.data(category, data_field))
+                    getter: Callable[[], Decimal] = self.simulator.data_getter(category, data_field)
+                    self.__plan.append((self.__series(category, data_field), getter,
+                                        self.simulator.collection_step(category, data_field)))
+
+                    aggregates: List[Aggregate] = self.get_aggregates(category, data_field)
+
+                    if len(aggregates) > 0:
+                        aggregator: WindowAggregator = self.__aggregators.setdefault((category, data_field),
+                                                                                     WindowAggregator())
+                        aggregate_series: List[Tuple[Aggregate, DataSeries]] = \
+                            [(aggregate, self.__series(category, aggregate.series_name(data_field)))
+                             for aggregate in aggregates]
+                        self.__window_plan.append((getter, aggregator, aggregate_series))
+
+    def export(self, path: str):
+        """Write all collected series with their metadata to a binary file, see export_series. Read it with
+        ExportedData.
+
+        :param path the path of the .npz file."""
+        export_series(path, ((category, data_field, self.get_data_series(category, data_field),
+                              self.simulator.series_info(category, data_field))
+                             for category in self.get_categories() for data_field in self.get_data_fields(category)))
 
     def clear(self):
-        self.__data_dict.clear()
\ No newline at end of file
+        self.__data_dict.clear()
+        self.__aggregators.clear()
+        self.__first = None
+        self.__plan = None
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # the getters are bound to the simulator, copies compile their own plan
+        state: Dict[str, Any] = self.__dict__.copy()
+        state['_DataCollector__plan'] = None
+        state['_DataCollector__window_plan'] = None
+
+        return state
@@ -9,6 +9,12 @@ class DataGenerator(ABC):
     def generate_next(self):
         pass
 
+    def generate_cycles(self, cycles: int):
+        """Generate the data of a number of cycles in which no data is collected. Subclasses can override this with
+        a closed form."""
+        for cycle in range(cycles):
+            self.generate_next()
+
     @property
     def data_collector(self) -> DataCollector:
         return self.__data_collector
@@ -0,0 +1,69 @@
+from typing import Any, Tuple
+
+import numpy as np
+
+
+class DataSeries:
+    """A collected series in a preallocated array, which grows geometrically when it is full. Values are converted to
+    float64 when they are added. Exact series hold the numbers as they were added, like Decimals, in an object array
+    instead. The last value is kept as it was added in both cases."""
+
+    __slots__ = ('__values', '__length', '__capacity', '__last')
+
+    def __init__(self, capacity: int, exact: bool = False):
+        """:param capacity the number of values to allocate for on the first append.
+        :param exact whether the values are held as they were added instead of as float64."""
+        self.__values: np.ndarray = np.empty(0, dtype=object if exact else float)
+        self.__length: int = 0
+        self.__capacity: int = max(1, capacity)
+        self.__last: Any = None
+
+    def __len__(self) -> int:
+        return self.__length
+
+    @property
+    def values(self) -> np.ndarray:
+        """:return a view of the values of the series. It is not copied, so it shares the values which are shifted by
+        trim."""
+        return self.__values[:self.__length]
+
+    @property
+    def last(self) -> Any:
+        """:return the last value as it was added, None if the series is empty."""
+        return self.__last
+
+    @property
+    def nbytes(self) -> int:
+        """:return the number of bytes allocated for the values. Of an exact series, without the objects it refers
+        to."""
+        return self.__values.nbytes
+
+    def append(self, value: Any):
+        if self.__length == len(self.__values):
+            self.__grow()
+
+        self.__values[self.__length] = value
+        self.__length += 1
+        self.__last = value
+
+    def trim(self, length: int):
+        """Keep the last length values."""
+        if self.__length > length:
+            self.__values[:length] = self.__values[self.__length - length:self.__length]
+            self.__length = length
+
+    def __getstate__(self) -> Tuple[np.ndarray, int, Any]:
+        # the unused part of the array is not saved
+        return self.values.copy(), self.__capacity, self.__last
+
+    def __setstate__(self, state: Tuple[np.ndarray, int, Any]):
+        self.__values, self.__capacity, self.__last = state
+        self.__length = len(self.__values)
+
+    def __grow(self):
+        if self.__length == 0:
+            self.__values = np.empty(self.__capacity, dtype=self.__values.dtype)
+        else:
+            values: np.ndarray = np.empty(2 * len(self.__values), dtype=self.__values.dtype)
+            values[:self.__length] = self.__values
+            self.__values = values
@@ -1,10 +1,16 @@
 from __future__ import annotations
 
+from .numeric import NumericMode, Fixed
+from .balance_entries import BalanceEntries, EntryId
+from .balance_history import BalanceHistory, ColumnarHistory, SparseHistory, RingHistory, MappedHistory, \
+    ForkedHistory
 from .balance_sheet import BalanceSheet, BalanceSheetTimeline
-from .balance_entries import BalanceEntries
-from .economic_actor import EconomicActor
+from .journal import BookingJournal
+from .economic_actor import EconomicActor, CheckLevel
 from .central_bank import CentralBank, QEMode, HelicopterMode
 from .bank import Bank, SpendingMode, DebtPayment
 from .private_actor import PrivateActor, DefaultingMode
 from .euro_economy import EuroEconomy
 from .aggregate_simulator import SimpleDataGenerator, AggregateSimulator
+from .ensemble import EnsembleSimulator
+from .sweep import Scenario, ScenarioResult, SweepRunner, run_scenario
@@ -1,11 +1,20 @@
 from __future__ import annotations
 
+import random
+
+from collections import OrderedDict as OrdDict
+from copy import deepcopy
 from decimal import *
-from typing import TYPE_CHECKING, List
+from functools import partial
+from typing import TYPE_CHECKING, Any, Callable, Iterator, List, Optional, OrderedDict, Tuple
+
+import numpy as np
 
-from . import EuroEconomy, BalanceEntries
-from .. import Simulator, DataGenerator
-from emusim.cockpit.utilities.cycles import Period, Interval
+from . import EuroEconomy, EntryId, CheckLevel, NumericMode
+from .numeric import max_divergence
+from .. import Simulator, DataGenerator, ConvergenceMonitor, Aggregate, SeriesInfo, PROFILE, CYCLES, EUROS, \
+    SECONDS
+from emusim.cockpit.utilities.cycles import Period, Interval, EventCalendar
 
 if TYPE_CHECKING:
     from . import EconomicActor
@@ -30,6 +39,7 @@ REQUIRED_LENDING_RATE = "Required lending rate"
 LENDING_RATE = "Lending rate"
 DEBT_RATIO = "Debt ratio"
 SECURITIES_RATIO = "Securities ratio"
+EXTRAPOLATED = "Extrapolated"
 
 SYSTEM_OBLIGATORY_DATA_FIELDS = [CYCLE, REAL_GROWTH]
 
@@ -67,6 +77,9 @@ PERCENTAGE_FIELDS = [GROWTH_TARGET, INFLATION, NOMINAL_GROWTH, REAL_GROWTH, MBS_
 
 DEFLATABLE_FIELDS = [IM, IM_TARGET, LENDING, REQUIRED_LENDING]
 
+# System data fields which are stable in a steady state
+STEADY_STATE_FIELDS = [REAL_GROWTH, DEBT_RATIO, REQUIRED_LENDING_RATE]
+
 # Bank category
 BANK = "Bank"
 
@@ -93,12 +106,21 @@ PRIVATE_SECTOR_BS = "Private sector balance sheet"
 
 BALANCE_SHEET_CATEGORIES = [CENTRAL_BANK_BS, BANK_BS, PRIVATE_SECTOR_BS]
 
+# Bank data fields which are money amounts
+BANK_MONEY_FIELDS = [INCOME, COSTS, PROFIT]
+
+# Phases of process_cycle, as methods of the economy
+ECONOMY_PHASES = ["start_transactions", "inflate", "update_reserves", "grow_securities", "grow_mbs",
+                  "update_risk_assets", "process_qe", "process_helicopter_money", "process_bank_loans",
+                  "process_savings", "process_bank_income_and_spending", "process_borrowing", "end_transactions",
+                  "skip_cycles"]
+
 
 class SimpleDataGenerator(DataGenerator):
 
     def __init__(self, economy: EuroEconomy):
         self.__economy = economy
-        self.__growth_influence_rate: Decimal = Decimal(0.0)
+        self.__growth_influence_rate: Decimal = economy.numeric_mode.number(0.0)
 
     @property
     def growth_influence_rate(self) -> Decimal:
@@ -106,29 +128,51 @@ class SimpleDataGenerator(DataGenerator):
 
     @growth_influence_rate.setter
     def growth_influence_rate(self, rate: Decimal):
-        self.__growth_influence_rate = Decimal(rate)
+        self.__growth_influence_rate = self.__economy.numeric_mode.number(rate)
 
     def generate_next(self):
-        real_growth: Decimal = self.data_collector.get_data_series(SYSTEM, REAL_GROWTH)[-1]
+        real_growth: Decimal = self.data_collector.get_last_data(SYSTEM, REAL_GROWTH)
         self.__economy.inflation += self.__economy.inflation * real_growth * self.growth_influence_rate
 
+    def generate_cycles(self, cycles: int):
+        real_growth: Decimal = self.data_collector.get_last_data(SYSTEM, REAL_GROWTH)
+        self.__economy.inflation *= (1 + real_growth * self.growth_influence_rate) ** cycles
+
 
 class AggregateSimulator(Simulator):
     # the structure of the data and whether or not it needs to be collected
 
     def __init__(self, economy: EuroEconomy, generator: DataGenerator):
         self.__economy: EuroEconomy = economy
-        self.__desired_im: Decimal = Decimal(0.0) # im if growth_target is maintained
-        self.__start_im: Decimal = Decimal(0.0)
-        self.__target_im: Decimal = Decimal(0.0)
-        self.__nominal_growth = Decimal(0.0)
-        self.__real_growth = Decimal(0.0)
-        self.__required_lending: Decimal = Decimal(0.0)
-        self.__lending: Decimal = Decimal(0.0)
-        self.__required_lending_rate: Decimal = Decimal(0.0)
-        self.__lending_rate: Decimal = Decimal(0.0)
-        self.__debt_ratio: Decimal = Decimal(0.0)
-        self.__securities_ratio: Decimal = Decimal(0.0)
+        self.__number = economy.numeric_mode.number
+        self.__money = economy.numeric_mode.money
+        self.__desired_im: Decimal = self.__money(0.0) # im if growth_target is maintained
+        self.__start_im: Decimal = self.__money(0.0)
+        self.__target_im: Decimal = self.__money(0.0)
+        self.__nominal_growth = self.__number(0.0)
+        self.__real_growth = self.__number(0.0)
+        self.__required_lending: Decimal = self.__money(0.0)
+        self.__lending: Decimal = self.__money(0.0)
+        self.__required_lending_rate: Decimal = self.__number(0.0)
+        self.__lending_rate: Decimal = self.__number(0.0)
+        self.__debt_ratio: Decimal = self.__number(0.0)
+        self.__securities_ratio: Decimal = self.__number(0.0)
+        self.__deflator: Decimal = self.__number(1.0) # product of 1 + the collected inflation rates
+
+        # How often balance sheets are validated during a run. A failed validation stops the run.
+        self.check_level: CheckLevel = CheckLevel.FULL
+        self.check_interval: int = Period.MONTH_DAYS
+        self.__failed_check: Optional[Tuple[int, EconomicActor]] = None
+
+        # Jump over cycles without events in which only securities and MBS grow. See EuroEconomy.event_calendar.
+        self.skip_idle_cycles: bool = False
+        self.__calendar: Optional[EventCalendar] = None
+        self.__economy_calendar: Optional[EventCalendar] = None
+
+        # Stop a run when the watched series reach a steady state and extrapolate the collected data to the cycles of
+        # the run. The extrapolated samples are flagged in the EXTRAPOLATED series. See STEADY_STATE_FIELDS.
+        self.convergence: Optional[ConvergenceMonitor] = None
+        self.__extrapolated: int = 0
 
         super().__init__(generator)
         self.generator.data_collector = self.collector
@@ -140,120 +184,259 @@ class AggregateSimulator(Simulator):
         for data_field in SYSTEM_DATA_FIELDS:
             self.collector.set_collect_data(SYSTEM, data_field, False)
 
+        self.collector.set_collect_data(SYSTEM, EXTRAPOLATED, False)
+
         for data_field in CENTRAL_BANK_DATA_FIELDS:
             self.collector.set_collect_data(CENTRAL_BANK, data_field, False)
 
         for data_field in BANK_DATA_FIELDS:
             self.collector.set_collect_data(BANK, data_field, False)
 
-        # Central bank balance sheet
-        for asset in self.economy.central_bank.asset_names:
-            self.collector.set_collect_data(CENTRAL_BANK_BS, asset, False)
-
-        for liability in self.economy.central_bank.liability_names:
-            self.collector.set_collect_data(CENTRAL_BANK_BS, liability, False)
+        # Balance sheets of the central bank, the bank and the private sector
+        for category in BALANCE_SHEET_CATEGORIES:
+            self.set_collect_balance_data(category, False)
 
-        # Bank balance sheet
-        for asset in self.economy.bank.asset_names:
-            self.collector.set_collect_data(BANK_BS, asset, False)
+        # Cumulative time of the phases when profiling
+        for obj, method_name in self._profiled_phases():
+            self.collector.set_collect_data(PROFILE, method_name, False)
 
-        for liability in self.economy.bank.liability_names:
-            self.collector.set_collect_data(BANK_BS, liability, False)
+    @property
+    def economy(self) -> EuroEconomy:
+        return self.__economy
 
-        # Private sector balance sheet
-        for asset in self.economy.client.asset_names:
-            self.collector.set_collect_data(PRIVATE_SECTOR_BS, asset, False)
+    @property
+    def numeric_mode(self) -> NumericMode:
+        return self.economy.numeric_mode
+
+    @numeric_mode.setter
+    def numeric_mode(self, mode: NumericMode):
+        """Select the type of numbers of the simulation. Decimal for exact results, float for speed. The economy, the
+        state of the simulator and the generator are converted."""
+        if mode != self.economy.numeric_mode:
+            self.economy.numeric_mode = mode
+
+        mode.convert_attributes(self)
+        mode.convert_attributes(self.generator)
+        self.__number = mode.number
+        self.__money = mode.money
+
+        self.__desired_im = mode.convert_money(self.__desired_im)
+        self.__start_im = mode.convert_money(self.__start_im)
+        self.__target_im = mode.convert_money(self.__target_im)
+        self.__required_lending = mode.convert_money(self.__required_lending)
+        self.__lending = mode.convert_money(self.__lending)
 
-        for liability in self.economy.client.liability_names:
-            self.collector.set_collect_data(PRIVATE_SECTOR_BS, liability, False)
+    @property
+    def failed_check(self) -> Optional[Tuple[int, EconomicActor]]:
+        """:return the cycle and the economic actor of which the balance sheet did not validate during the last run.
+        None if all checks passed."""
+        return self.__failed_check
 
     @property
-    def economy(self) -> EuroEconomy:
-        return self.__economy
+    def extrapolated(self) -> int:
+        """:return the number of samples at the end of the collected series which were extrapolated from a steady
+        state instead of simulated."""
+        return self.__extrapolated
+
+    def _start_run(self, cycles: int):
+        super()._start_run(cycles)
+        self.__deflator = self.__number(1.0)
+        self.__failed_check = None
+        self.__extrapolated = 0
+
+        # the ratios are only updated when they apply, so a run does not start from the ones of the previous run
+        self.__debt_ratio = self.__number(0.0)
+        self.__securities_ratio = self.__number(0.0)
+
+    def _simulate(self, cycles: Optional[int] = None) -> Iterator[Tuple[int, bool]]:
+        # parameters may have changed since the run was started, as in forks
+        self.economy.set_check_level(self.check_level, self.check_interval)
+        self.__calendar = EventCalendar([self.collect_interval, self.economy.bank.client_interaction_interval])
+        self.__economy_calendar = self.economy.event_calendar()
+
+        yield from super()._simulate(cycles)
+
+        if self.converged and self.__extrapolated == 0:
+            yield from self.__extrapolate()
+
+    def _fork_state(self) -> List[Any]:
+        return [actor.balance.fork_history() for actor in self.economy.actors]
+
+    def _profiled_phases(self) -> List[Tuple[Any, str]]:
+        return super()._profiled_phases() + [(self.economy, phase) for phase in ECONOMY_PHASES] \
+               + [(self, 'deflate')]
+
+    def _converged(self) -> bool:
+        return self.convergence is not None and self.convergence.converged(self.collector)
+
+    def _next_event(self, cycle: int) -> int:
+        if not self.skip_idle_cycles or cycle == 0:
+            return cycle
+
+        # the economic actors count their own cycles
+        offset: int = self.economy.central_bank.cycle - cycle
+
+        return min(self.__calendar.next_event(cycle), self.__economy_calendar.next_event(cycle + offset) - offset)
+
+    def _skip_cycles(self, cycle: int, cycles: int) -> int:
+        skipped_cycles: int = self.economy.skip_cycles(cycle, cycles)
+
+        if skipped_cycles < cycles:
+            self.__set_failed_check(cycle + skipped_cycles)
+
+        return skipped_cycles
+
+    def numeric_divergence(self, cycles: int, mode: NumericMode = NumericMode.FLOAT)\
+            -> OrderedDict[str, OrderedDict[str, Decimal]]:
+        """Run the simulation on two copies of the simulator, one in the current numeric mode and one in another mode,
+        with the same random state. The simulator itself is not changed. Histories mapped to files are copied to new
+        files next to them.
+
+        :param cycles the number of cycles to run.
+        :param mode the numeric mode to compare with.
+        :return the maximum divergence of each collected series from the one in the current mode. See
+        numeric.max_divergence."""
+        reference: AggregateSimulator = deepcopy(self)
+        simulator: AggregateSimulator = deepcopy(self)
+        simulator.numeric_mode = mode
+
+        random_state = random.getstate()
+        reference.run_simulation(cycles)
+        random.setstate(random_state)
+        simulator.run_simulation(cycles)
+
+        divergence: OrderedDict[str, OrderedDict[str, Decimal]] = OrdDict()
+
+        for category in reference.collector.get_categories():
+            divergence[category] = OrdDict()
+
+            for data_field in reference.collector.get_data_fields(category):
+                divergence[category][data_field] = \
+                    max_divergence(reference.collector.get_data_series(category, data_field),
+                                   simulator.collector.get_data_series(category, data_field))
+
+        return divergence
 
     def data(self, category: str, data_field: str) -> Decimal:
-        data: Decimal = Decimal(0.0)
+        return self.data_getter(category, data_field)()
+
+    def data_getter(self, category: str, data_field: str) -> Callable[[], Decimal]:
+        getter: Callable[[], Decimal] = lambda: self.__number(0.0)
 
         if category == SYSTEM:
             if data_field == CYCLE:
-                data = Decimal(self.economy.central_bank.cycle)
+                getter = lambda: self.__number(self.economy.central_bank.cycle)
             elif data_field == GROWTH_TARGET:
-                data = self.economy.growth_rate
+                getter = lambda: self.economy.growth_rate
             elif data_field == REAL_GROWTH:
-                data = self.__real_growth
+                getter = lambda: self.__real_growth
             elif data_field == NOMINAL_GROWTH:
-                data = self.__nominal_growth
+                getter = lambda: self.__nominal_growth
             elif data_field == MBS_GROWTH:
-                data = self.economy.mbs_growth
+                getter = lambda: self.economy.mbs_growth
             elif data_field == SECURITY_GROWTH:
-                data = self.economy.security_growth
+                getter = lambda: self.economy.security_growth
             elif data_field == INFLATION:
-                data = self.economy.inflation
+                getter = lambda: self.economy.inflation
             elif data_field == IM:
-                data = self.economy.im
+                getter = lambda: self.economy.im
             elif data_field == IM_TARGET:
-                data = self.__target_im
+                getter = lambda: self.__target_im
             elif data_field == LENDING_SATISFACTION:
-                data = self.economy.lending_satisfaction_rate
+                getter = lambda: self.economy.lending_satisfaction_rate
             elif data_field == REQUIRED_LENDING:
-                data = self.__required_lending
+                getter = lambda: self.__required_lending
             elif data_field == LENDING:
-                data = self.__lending
+                getter = lambda: self.__lending
             elif data_field == REQUIRED_LENDING_RATE:
-                data = self.__required_lending_rate
+                getter = lambda: self.__required_lending_rate
             elif data_field == LENDING_RATE:
-                data = self.__lending_rate
+                getter = lambda: self.__lending_rate
             elif data_field == DEBT_RATIO:
-                data = self.__debt_ratio
+                getter = lambda: self.__debt_ratio
             elif data_field == SECURITIES_RATIO:
-                data = self.__securities_ratio
-        elif category == CENTRAL_BANK:
-            data = Decimal(0.0)
+                getter = lambda: self.__securities_ratio
         elif category == BANK:
             if data_field == INCOME:
-                data = self.economy.bank.income
+                getter = lambda: self.economy.bank.income
             elif data_field == COSTS:
-                data = self.economy.bank.costs
+                getter = lambda: self.economy.bank.costs
             elif data_field == PROFIT:
-                data = self.economy.bank.profit
+                getter = lambda: self.economy.bank.profit
             elif data_field == INSTALLMENT_RATIO:
-                data = self.economy.bank.installment / self.economy.bank.balance.assets_value
+                getter = lambda: self.economy.bank.installment / self.economy.bank.balance.assets_value
         elif category == PRIVATE_SECTOR:
             if data_field == INSTALLMENT_RATIO:
-                data = self.economy.bank.client_installment / self.economy.client.balance.assets_value
-        elif category == CENTRAL_BANK_BS:
-            data = self.__balance_entry(self.economy.central_bank, data_field)
-        elif category == BANK_BS:
-            data = self.__balance_entry(self.economy.bank, data_field)
-        elif category == PRIVATE_SECTOR_BS:
-            data = self.__balance_entry(self.economy.client, data_field)
+                getter = lambda: self.economy.bank.client_installment / self.economy.client.balance.assets_value
+        elif category in BALANCE_SHEET_CATEGORIES:
+            getter = self.__balance_entry_getter(self.__balance_sheet_actor(category), data_field)
+        elif category == PROFILE:
+            getter = lambda: self.__number(self.profiler.time(data_field))
 
         if data_field in DEFLATABLE_FIELDS or category in BALANCE_SHEET_CATEGORIES:
-            data = self.deflate(data, True)
+            amount: Callable[[], Decimal] = getter
 
-        return data
+            return lambda: self.deflate(amount(), True)
 
-    def __balance_entry(self, economic_actor: EconomicActor, entry: str) -> Decimal:
+        return getter
+
+    def series_info(self, category: str, data_field: str) -> SeriesInfo:
+        # aggregates of a field have the unit of the field
+        field: str = Aggregate.data_field(data_field)
+        deflated: bool = field in DEFLATABLE_FIELDS or category in BALANCE_SHEET_CATEGORIES
+
+        if category == SYSTEM and field == CYCLE:
+            return SeriesInfo(CYCLES)
+        elif deflated or (category == BANK and field in BANK_MONEY_FIELDS):
+            return SeriesInfo(EUROS, deflated=deflated)
+        elif category == PROFILE:
+            return SeriesInfo(SECONDS)
+        else:
+            return SeriesInfo(percentage=field in PERCENTAGE_FIELDS)
+
+    def collection_step(self, category: str, data_field: str) -> Optional[Callable[[Decimal], None]]:
+        # amounts are deflated by every collected inflation rate, not by the ones only aggregated
+        if category == SYSTEM and data_field == INFLATION:
+            return self.__apply_inflation
+
+        return None
+
+    def __apply_inflation(self, inflation: Decimal):
+        self.__deflator *= 1 + inflation
+
+    def __balance_entry_getter(self, economic_actor: EconomicActor, entry: str) -> Callable[[], Decimal]:
         if entry in economic_actor.asset_names:
-            data = economic_actor.asset(entry)
+            return partial(economic_actor.asset, entry)
         else:
-            data = economic_actor.liability(entry)
+            return partial(economic_actor.liability, entry)
 
-        return data
+    def set_collect_balance_data(self, category: str, collect: bool, entries: Optional[List[str]] = None):
+        """Select the balance sheet entries of an economic actor which are collected.
 
-    def collect_data(self):
-        self.collector.collect_data()
+        :param category the balance sheet category of the actor, one of BALANCE_SHEET_CATEGORIES.
+        :param collect whether or not the entries need to be collected.
+        :param entries the names of the assets and liabilities. None for all entries of the actor."""
+        actor: EconomicActor = self.__balance_sheet_actor(category)
 
-        self.__collect_balance_data(CENTRAL_BANK_BS, self.economy.central_bank)
-        self.__collect_balance_data(BANK_BS, self.economy.central_bank.bank)
-        self.__collect_balance_data(PRIVATE_SECTOR_BS, self.economy.central_bank.bank.client)
+        if entries is None:
+            entries = list(actor.asset_names) + list(actor.liability_names)
 
-    def __collect_balance_data(self, category: str, actor: EconomicActor):
-        for asset_name in actor.asset_names:
-            self.collector.add_data(category, asset_name, actor.asset(asset_name))
+        for entry in entries:
+            self.collector.set_collect_data(category, entry, collect)
 
-        for liability_name in actor.liability_names:
-            self.collector.add_data(category, liability_name, actor.liability(liability_name))
+    def __balance_sheet_actor(self, category: str) -> EconomicActor:
+        if category == CENTRAL_BANK_BS:
+            return self.economy.central_bank
+        elif category == BANK_BS:
+            return self.economy.bank
+        elif category == PRIVATE_SECTOR_BS:
+            return self.economy.client
+        else:
+            raise ValueError(f"{category} is not a balance sheet category")
+
+    def collect_data(self):
+        """Collect the enabled fields. Balance sheet entries are only collected when enabled, like all other fields."""
+        self.collector.collect_data()
 
     def process_cycle(self, cycle: int) -> bool:
         """Process a full cycle.
@@ -299,11 +482,11 @@ class AggregateSimulator(Simulator):
 
         # calculations which only make sense on client interaction cycles
         if self.economy.bank.client_interaction_interval.period_complete(cycle):
-            self.__required_lending = Decimal(max(self.__target_im - self.economy.im, 0.0))
+            self.__required_lending = self.__money(max(self.__target_im - self.economy.im, 0.0))
             self.__lending = self.__required_lending * self.economy.lending_satisfaction_rate
 
             # multiplier to extrapolate to % per year
-            multiplier: Decimal = Decimal(Period.YEAR_DAYS / self.economy.bank.client_interaction_interval.days)
+            multiplier: Decimal = self.__number(Period.YEAR_DAYS / self.economy.bank.client_interaction_interval.days)
 
             self.economy.process_borrowing(self.__lending)
 
@@ -315,8 +498,8 @@ class AggregateSimulator(Simulator):
                 self.__required_lending_rate = self.__required_lending / self.economy.im * multiplier
                 self.__lending_rate = self.__lending / self.economy.im * multiplier
             else:
-                self.__required_lending_rate = Decimal('Infinity')
-                self.__lending_rate = Decimal('Infinity')
+                self.__required_lending_rate = self.__number('Infinity')
+                self.__lending_rate = self.__number('Infinity')
 
             self.__nominal_growth = round((self.economy.im - self.__start_im) / self.__start_im * multiplier, 8)
 
@@ -327,23 +510,112 @@ class AggregateSimulator(Simulator):
             # set start_im for next growth cycle
             self.__start_im = self.economy.im
 
-        self.__debt_ratio = self.economy.client.liability(BalanceEntries.DEBT) / self.economy.im
+        self.__debt_ratio = self.economy.client.liability_at(EntryId.DEBT) / self.economy.im
+
+        if self.economy.client.asset_at(EntryId.SECURITIES) > self.__money(0.0):
+            self.__securities_ratio = self.economy.client.asset_at(EntryId.SECURITIES) \
+                                      / self.economy.client.assets_value
+
+        if not self.economy.end_transactions():
+            self.__set_failed_check(cycle)
+
+            return False
+
+        return self.economy.im > 0
 
-        if self.economy.client.balance.asset(BalanceEntries.SECURITIES) > Decimal(0.0):
-            self.__securities_ratio = self.economy.client.balance.asset(BalanceEntries.SECURITIES) \
-                                      / self.economy.client.balance.assets_value
+    def __extrapolate(self) -> Iterator[Tuple[int, bool]]:
+        """Extend the collected series from the steady state to the cycles of the run, with the samples which would
+        have been collected. Money amounts grow at their rate over the window of the convergence monitor, the cycle
+        count continues and all other series, like rates and ratios, keep their last value.
 
-        return self.economy.end_transactions()\
-               and self.economy.im > 0
+        :return the cycle of every extrapolated sample, as the cycles of _simulate."""
+        days: int = self.collect_interval.days
+        samples: int = self.cycles // days - self.cycle // days
+        series_values: List[Tuple[str, str, List[Decimal]]] = []
+
+        for category in self.collector.get_categories():
+            for data_field in self.collector.get_data_fields(category):
+                if category == SYSTEM and data_field == EXTRAPOLATED:
+                    continue
+
+                series: List[Decimal] = self.collector.get_data_series(category, data_field)
+                last: Decimal = series[-1]
+
+                # aggregates of a field are extrapolated as the field
+                field: str = Aggregate.data_field(data_field)
+
+                if category == SYSTEM and field == CYCLE:
+                    values: List[Decimal] = [last + (series[-1] - series[-2]) * sample
+                                             for sample in range(1, samples + 1)]
+                elif category in BALANCE_SHEET_CATEGORIES or field in DEFLATABLE_FIELDS \
+                        or (category == BANK and field in BANK_MONEY_FIELDS):
+                    window: List[Decimal] = series[-self.convergence.window:]
+
+                    # float64 series are extrapolated in the numbers of the numeric mode
+                    if not self.collector.exact:
+                        window = [self.__number(value) for value in window]
+
+                    values: List[Decimal] = self.__extrapolate_amount(window, samples)
+                else:
+                    values: List[Decimal] = [last] * samples
+
+                series_values.append((category, data_field, values))
+
+        if len(self.collector.get_data_series(SYSTEM, EXTRAPOLATED)) == 0:
+            for sample in range(self.collector.size):
+                self.collector.add_data(SYSTEM, EXTRAPOLATED, self.__number(0.0))
+
+        for sample in range(samples):
+            for category, data_field, values in series_values:
+                self.collector.add_data(category, data_field, values[sample])
+
+            self.collector.add_data(SYSTEM, EXTRAPOLATED, self.__number(1.0))
+            self.__extrapolated = sample + 1
+
+            yield (self.cycle // days + sample + 1) * days - 1, True
+
+    def __extrapolate_amount(self, window: List[Decimal], samples: int) -> List[Decimal]:
+        """:return the next samples of an amount, growing geometrically over the window, or linearly when it crosses
+        or touches zero."""
+        first: Decimal = window[0]
+        last: Decimal = window[-1]
+        steps: int = len(window) - 1
+
+        if first != 0 and last != 0 and (first > 0) == (last > 0):
+            rate = (last / first) ** (self.__number(1.0) / steps)
+
+            return [last * rate ** sample for sample in range(1, samples + 1)]
+        else:
+            step = (last - first) / steps
+
+            return [last + step * sample for sample in range(1, samples + 1)]
+
+    def __set_failed_check(self, cycle: int):
+        for actor in self.economy.actors:
+            if not actor.state_saved:
+                self.__failed_check = (cycle, actor)
+                break
 
     # only call after initial_inflation_rate has been applied in a cycle
     def deflate(self, amount: Decimal, skip_one: bool = False) -> Decimal:
-        inflation_rates: List[Decimal] = self.collector.get_data_series(SYSTEM, INFLATION)
+        """Deflate an amount by all inflation rates collected so far.
 
+        :param amount the amount.
+        :param skip_one whether the inflation of the current client interval is skipped.
+        :return the deflated amount."""
         if not skip_one:
             amount /= 1 + self.economy.client_interval_inflation_rate
 
-        for inflation in inflation_rates:
-            amount /= 1 + inflation
+        return amount / self.__deflator
+
+    def deflate_series(self, series: List[Decimal]) -> np.ndarray:
+        """Deflate a series of collected nominal amounts, each by the inflation rates collected up to and including
+        its sample. Needs the INFLATION series to be collected in full. The amounts are deflated exactly when the
+        collector is exact, as floats otherwise.
+
+        :param series the amounts, one per sample.
+        :return the deflated amounts."""
+        dtype: type = object if self.collector.exact and self.numeric_mode != NumericMode.FLOAT else float
+        inflation_rates: np.ndarray = np.asarray(self.collector.get_data_series(SYSTEM, INFLATION), dtype=dtype)
 
-        return amount
+        return np.asarray(series, dtype=dtype) / np.cumprod(1 + inflation_rates)[:len(series)]
@@ -1,4 +1,6 @@
 # balance sheet entries
+from typing import Dict, List
+
 
 class BalanceEntries:
     QE = "QE"
@@ -18,9 +20,48 @@ class BalanceEntries:
     ALL = [QE, LOANS, MBS, SECURITIES, DEPOSITS, DEBT, UNRESOLVED_DEBT, SAVINGS, EQUITY, MBS_EQUITY,
            HELICOPTER_MONEY, RESERVES, INTEREST]
 
+    # Balance sheets store their entries in fixed size arrays. The id of an entry is its position in ALL.
+    COUNT: int = len(ALL)
+    IDS: Dict[str, int] = {name: entry_id for entry_id, name in enumerate(ALL)}
+
     @staticmethod
     def equity_type(asset: str) -> str:
         if asset == BalanceEntries.MBS:
             return BalanceEntries.MBS_EQUITY
         else:
             return BalanceEntries.EQUITY
+
+    @staticmethod
+    def id_mask(names: List[str]) -> List[bool]:
+        """:return a list with an element for each entry id which is True for the ids of the given names."""
+        mask: List[bool] = [False] * BalanceEntries.COUNT
+
+        for name in names:
+            mask[BalanceEntries.IDS[name]] = True
+
+        return mask
+
+
+class EntryId:
+    """Ids of the balance entries, to be used with the indexed balance sheet methods."""
+
+    QE: int = BalanceEntries.IDS[BalanceEntries.QE]
+    LOANS: int = BalanceEntries.IDS[BalanceEntries.LOANS]
+    MBS: int = BalanceEntries.IDS[BalanceEntries.MBS]
+    SECURITIES: int = BalanceEntries.IDS[BalanceEntries.SECURITIES]
+    DEPOSITS: int = BalanceEntries.IDS[BalanceEntries.DEPOSITS]
+    DEBT: int = BalanceEntries.IDS[BalanceEntries.DEBT]
+    UNRESOLVED_DEBT: int = BalanceEntries.IDS[BalanceEntries.UNRESOLVED_DEBT]
+    SAVINGS: int = BalanceEntries.IDS[BalanceEntries.SAVINGS]
+    EQUITY: int = BalanceEntries.IDS[BalanceEntries.EQUITY]
+    MBS_EQUITY: int = BalanceEntries.IDS[BalanceEntries.MBS_EQUITY]
+    HELICOPTER_MONEY: int = BalanceEntries.IDS[BalanceEntries.HELICOPTER_MONEY]
+    RESERVES: int = BalanceEntries.IDS[BalanceEntries.RESERVES]
+    INTEREST: int = BalanceEntries.IDS[BalanceEntries.INTEREST]
+
+    @staticmethod
+    def equity_type(asset: int) -> int:
+        if asset == EntryId.MBS:
+            return EntryId.MBS_EQUITY
+        else:
+            return EntryId.EQUITY
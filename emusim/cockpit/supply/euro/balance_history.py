@@ -0,0 +1,781 @@
+from __future__ import annotations
+
+import os
+import struct
+
+from abc import ABC, abstractmethod
+from array import array
+from decimal import *
+from mmap import mmap, ACCESS_READ
+from typing import BinaryIO, Callable, Dict, List, Optional, Tuple, Union
+
+from .balance_entries import BalanceEntries
+from .numeric import NumericMode
+
+# context in which scaling a Decimal by a power of ten is exact
+_EXACT: Context = Context(prec=MAX_PREC, Emax=MAX_EMAX, Emin=MIN_EMIN)
+
+
+def _create_branch_file(path: str) -> Tuple[str, BinaryIO]:
+    """Create a new file next to a history file, named after it with the first free number.
+
+    :return the path of the new file and the file, opened for reading and writing."""
+    root, extension = os.path.splitext(path)
+    number: int = 1
+
+    while True:
+        branch_path: str = root + "-" + str(number) + extension
+
+        try:
+            return branch_path, open(branch_path, 'x+b')
+        except FileExistsError:
+            number += 1
+
+
+class BalanceHistory(ABC):
+    """Storage for the saved states of a balance sheet. States are indexed by the order in which they were saved.
+    Entries are addressed by their BalanceEntries id. A value of None means the entry was not on the balance sheet.
+    States are saved with the raw values of the balance sheet slots, int units in FIXED mode (see NumericMode.to_raw),
+    and read as money amounts of the numeric mode."""
+
+    def __init__(self):
+        self.__numeric_mode: NumericMode = NumericMode.DECIMAL
+        self._zero: Decimal = self.__numeric_mode.money(0.0)
+
+    @property
+    def numeric_mode(self) -> NumericMode:
+        """:return the mode of the numbers returned by the history. Set by the balance sheet owning the history."""
+        return self.__numeric_mode
+
+    @numeric_mode.setter
+    def numeric_mode(self, mode: NumericMode):
+        self.__numeric_mode = mode
+        self._zero = mode.money(0.0)
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """:return the number of saved states, including states which are no longer retained."""
+        pass
+
+    def _amount(self, value: Optional[Union[Decimal, int]]) -> Decimal:
+        """:return the money amount of a raw value, zero for None."""
+        return self._zero if value is None else self.__numeric_mode.from_raw(value)
+
+    def _amounts(self, values: Tuple[Optional[Union[Decimal, int]], ...]) -> List[Optional[Decimal]]:
+        """:return the money amounts of raw values, None for entries which were not on the balance sheet."""
+        return [self.__numeric_mode.from_raw(value) for value in values]
+
+    @property
+    def start(self) -> int:
+        """:return the index of the oldest retained state."""
+        return 0
+
+    @abstractmethod
+    def append(self, assets: List[Optional[Decimal]], liabilities: List[Optional[Decimal]]):
+        """Save a state.
+
+        :param assets the asset values of the state by entry id.
+        :param liabilities the liability values of the state by entry id."""
+        pass
+
+    def append_skipped(self, assets: List[Optional[Decimal]], liabilities: List[Optional[Decimal]], states: int):
+        """Save the state after cycles which were skipped in one step. The states of the skipped cycles were not
+        computed, so the history records the gap with the state after it. Backends which can store the gap at once
+        override this.
+
+        :param assets the asset values after the skip by entry id.
+        :param liabilities the liability values after the skip by entry id.
+        :param states the number of skipped cycles, including the last one."""
+        for state in range(states):
+            self.append(assets, liabilities)
+
+    def branch(self) -> BalanceHistory:
+        """:return an empty history of the same kind and size for the states saved after a fork, see ForkedHistory.
+        Defaults to a ColumnarHistory. Backends which bound their memory or storage override this."""
+        return ColumnarHistory()
+
+    @abstractmethod
+    def assets(self, index: int) -> List[Optional[Decimal]]:
+        pass
+
+    @abstractmethod
+    def liabilities(self, index: int) -> List[Optional[Decimal]]:
+        pass
+
+    @abstractmethod
+    def asset(self, entry_id: int, index: int) -> Decimal:
+        pass
+
+    @abstractmethod
+    def liability(self, entry_id: int, index: int) -> Decimal:
+        pass
+
+    @abstractmethod
+    def clear(self):
+        pass
+
+
+class DecimalColumn:
+    """Column of exact Decimals in typed arrays. Every value is stored as a scaled integer, its coefficient, in two
+    int64 halves, with its exponent, the quantum of the value, in an int16. Values which do not fit, like special values
+    or Decimals with more than 38 digits, are kept as they are in a dictionary by index."""
+
+    # exponent of the states in which the entry was not on the balance sheet
+    MISSING: int = -2 ** 15
+
+    __slots__ = ('__low', '__high', '__exponents', '__others')
+
+    def __init__(self, missing: int = 0):
+        """:param missing the number of states before the first value, in which the entry was not on the balance
+        sheet."""
+        self.__low: array = array('Q', [0]) * missing
+        self.__high: array = array('q', [0]) * missing
+        self.__exponents: array = array('h', [self.MISSING]) * missing
+        self.__others: Dict[int, Decimal] = {}
+
+    def __len__(self) -> int:
+        return len(self.__exponents)
+
+    @property
+    def nbytes(self) -> int:
+        """:return the number of bytes of the arrays, without the values which did not fit."""
+        return (len(self.__low) + len(self.__high)) * 8 + len(self.__exponents) * 2
+
+    def append(self, value: Optional[Decimal], states: int = 1):
+        """Add a value for a number of states."""
+        low, high, exponent = self.__scaled(value)
+
+        if exponent is None:
+            for index in range(len(self), len(self) + states):
+                self.__others[index] = value
+
+            low, high, exponent = 0, 0, self.MISSING
+
+        if states == 1:
+            self.__low.append(low)
+            self.__high.append(high)
+            self.__exponents.append(exponent)
+        else:
+            self.__low.extend(array('Q', [low]) * states)
+            self.__high.extend(array('q', [high]) * states)
+            self.__exponents.extend(array('h', [exponent]) * states)
+
+    def __getitem__(self, index: int) -> Optional[Decimal]:
+        exponent: int = self.__exponents[index]
+
+        if exponent == self.MISSING:
+            return self.__others.get(index if index >= 0 else index + len(self))
+
+        return Decimal((self.__high[index] << 64) | self.__low[index]).scaleb(exponent, _EXACT)
+
+    def __scaled(self, value: Optional[Decimal]) -> Tuple[int, int, Optional[int]]:
+        """:return the halves of the coefficient and the exponent of a value, or None for the exponent if it does not
+        fit."""
+        if value is None:
+            return 0, 0, self.MISSING
+
+        exponent = value.as_tuple().exponent
+
+        if not isinstance(exponent, int) or not self.MISSING < exponent < 2 ** 15 \
+                or value.is_signed() and value.is_zero():
+            return 0, 0, None
+
+        coefficient: int = int(value.scaleb(-exponent, _EXACT))
+
+        if not -2 ** 127 <= coefficient < 2 ** 127:
+            return 0, 0, None
+
+        return coefficient & 0xFFFFFFFFFFFFFFFF, coefficient >> 64, exponent
+
+
+class ColumnarHistory(BalanceHistory):
+    """Balance history with one growable column per balance entry, indexed by state. The columns are arrays of float64
+    values in the FLOAT numeric mode, or of int64 units in the FIXED numeric mode. An entry which was not on the
+    balance sheet when a state was saved is stored as NaN or numeric.FIXED_MISSING. In the DECIMAL numeric mode the
+    columns are DecimalColumns, which store the Decimals exactly as scaled integers."""
+
+    def __init__(self):
+        super().__init__()
+        self.__length: int = 0
+        self.__assets: List[Optional[Union[array, DecimalColumn]]] = [None] * BalanceEntries.COUNT
+        self.__liabilities: List[Optional[Union[array, DecimalColumn]]] = [None] * BalanceEntries.COUNT
+
+    def __len__(self) -> int:
+        return self.__length
+
+    @property
+    def nbytes(self) -> int:
+        """:return the number of bytes of the columns."""
+        return sum(column.nbytes if isinstance(column, DecimalColumn) else column.itemsize * len(column)
+                   for column in self.__assets + self.__liabilities if column is not None)
+
+    def append(self, assets: List[Optional[Decimal]], liabilities: List[Optional[Decimal]]):
+        self.__append(self.__assets, assets)
+        self.__append(self.__liabilities, liabilities)
+        self.__length += 1
+
+    def append_skipped(self, assets: List[Optional[Decimal]], liabilities: List[Optional[Decimal]], states: int):
+        self.__append(self.__assets, assets, states)
+        self.__append(self.__liabilities, liabilities, states)
+        self.__length += states
+
+    def assets(self, index: int) -> List[Optional[Decimal]]:
+        return [self.__value(column, index) for column in self.__assets]
+
+    def liabilities(self, index: int) -> List[Optional[Decimal]]:
+        return [self.__value(column, index) for column in self.__liabilities]
+
+    def asset(self, entry_id: int, index: int) -> Decimal:
+        value: Optional[Decimal] = self.__value(self.__assets[entry_id], index)
+        return self._zero if value is None else value
+
+    def liability(self, entry_id: int, index: int) -> Decimal:
+        value: Optional[Decimal] = self.__value(self.__liabilities[entry_id], index)
+        return self._zero if value is None else value
+
+    def clear(self):
+        self.__length = 0
+        self.__assets = [None] * BalanceEntries.COUNT
+        self.__liabilities = [None] * BalanceEntries.COUNT
+
+    def __append(self, columns: List[Optional[Union[array, DecimalColumn]]], values: List[Optional[Decimal]],
+                 states: int = 1):
+        exact: bool = self.numeric_mode == NumericMode.DECIMAL
+
+        for entry_id, value in enumerate(values):
+            column: Optional[Union[array, DecimalColumn]] = columns[entry_id]
+
+            if column is None:
+                if value is None:
+                    continue
+
+                # back fill the states in which the entry did not exist yet
+                if exact:
+                    column = DecimalColumn(self.__length)
+                else:
+                    column = array(self.numeric_mode.typecode, [self.numeric_mode.to_storage(None)]) * self.__length
+
+                columns[entry_id] = column
+
+            if exact:
+                column.append(value, states)
+            elif states == 1:
+                column.append(self.numeric_mode.to_storage(value))
+            else:
+                column.extend(array(self.numeric_mode.typecode, [self.numeric_mode.to_storage(value)]) * states)
+
+    def __value(self, column: Optional[Union[array, DecimalColumn]], index: int) -> Optional[Decimal]:
+        if column is None:
+            return None
+        elif isinstance(column, DecimalColumn):
+            return column[index]
+        else:
+            return self.numeric_mode.from_storage(column[index])
+
+
+class SparseHistory(BalanceHistory):
+    """Balance history which only stores the entries that changed since the previous state. Every keyframe_interval
+    states a full copy of the state is stored, from which the states up to the next keyframe are reconstructed."""
+
+    def __init__(self, keyframe_interval: int = 28):
+        super().__init__()
+        self.__keyframe_interval: int = max(1, keyframe_interval)
+        self.__length: int = 0
+        self.__keyframes: List[Tuple[Tuple[Optional[Decimal], ...], Tuple[Optional[Decimal], ...]]] = []
+
+        # changes per state as flat (entry_id, value, entry_id, value, ...) tuples
+        self.__asset_changes: List[Tuple] = []
+        self.__liability_changes: List[Tuple] = []
+
+        self.__last_assets: Tuple[Optional[Decimal], ...] = (None,) * BalanceEntries.COUNT
+        self.__last_liabilities: Tuple[Optional[Decimal], ...] = (None,) * BalanceEntries.COUNT
+
+    @property
+    def keyframe_interval(self) -> int:
+        return self.__keyframe_interval
+
+    def branch(self) -> SparseHistory:
+        return SparseHistory(self.__keyframe_interval)
+
+    def __len__(self) -> int:
+        return self.__length
+
+    def append(self, assets: List[Optional[Decimal]], liabilities: List[Optional[Decimal]]):
+        if self.__length % self.__keyframe_interval == 0:
+            self.__keyframes.append((tuple(assets), tuple(liabilities)))
+            self.__asset_changes.append(())
+            self.__liability_changes.append(())
+        else:
+            self.__asset_changes.append(self.__changes(self.__last_assets, assets))
+            self.__liability_changes.append(self.__changes(self.__last_liabilities, liabilities))
+
+        self.__last_assets = tuple(assets)
+        self.__last_liabilities = tuple(liabilities)
+        self.__length += 1
+
+    def assets(self, index: int) -> List[Optional[Decimal]]:
+        return self._amounts(self.__state(0, self.__asset_changes, index))
+
+    def liabilities(self, index: int) -> List[Optional[Decimal]]:
+        return self._amounts(self.__state(1, self.__liability_changes, index))
+
+    def asset(self, entry_id: int, index: int) -> Decimal:
+        return self._amount(self.__value(0, self.__asset_changes, entry_id, index))
+
+    def liability(self, entry_id: int, index: int) -> Decimal:
+        return self._amount(self.__value(1, self.__liability_changes, entry_id, index))
+
+    def clear(self):
+        self.__length = 0
+        self.__keyframes.clear()
+        self.__asset_changes.clear()
+        self.__liability_changes.clear()
+        self.__last_assets = (None,) * BalanceEntries.COUNT
+        self.__last_liabilities = (None,) * BalanceEntries.COUNT
+
+    def __changes(self, previous: Tuple[Optional[Decimal], ...], current: List[Optional[Decimal]]) -> Tuple:
+        changes: List = []
+
+        for entry_id, value in enumerate(current):
+            if value != previous[entry_id]:
+                changes.append(entry_id)
+                changes.append(value)
+
+        return tuple(changes)
+
+    def __state(self, side: int, changes: List[Tuple], index: int) -> List[Optional[Decimal]]:
+        index = self.__absolute(index)
+        keyframe: int = index // self.__keyframe_interval
+        state: List[Optional[Decimal]] = list(self.__keyframes[keyframe][side])
+
+        for state_changes in changes[keyframe * self.__keyframe_interval + 1:index + 1]:
+            for i in range(0, len(state_changes), 2):
+                state[state_changes[i]] = state_changes[i + 1]
+
+        return state
+
+    def __value(self, side: int, changes: List[Tuple], entry_id: int, index: int) -> Optional[Decimal]:
+        index = self.__absolute(index)
+        keyframe: int = index // self.__keyframe_interval
+
+        # search backwards for the last change of the entry since the keyframe
+        for state in range(index, keyframe * self.__keyframe_interval, -1):
+            state_changes: Tuple = changes[state]
+
+            for i in range(0, len(state_changes), 2):
+                if state_changes[i] == entry_id:
+                    return state_changes[i + 1]
+
+        return self.__keyframes[keyframe][side][entry_id]
+
+    def __absolute(self, index: int) -> int:
+        if index < 0:
+            index += self.__length
+
+        if not 0 <= index < self.__length:
+            raise IndexError("balance history index out of range")
+
+        return index
+
+
+class RingHistory(BalanceHistory):
+    """Balance history which only retains the last states in a fixed capacity ring buffer. Indexes keep counting all
+    saved states. Older states are dropped or handed to the sink when they are overwritten."""
+
+    def __init__(self, capacity: int, sink: Optional[Callable[[int, List[Optional[Decimal]],
+                                                                 List[Optional[Decimal]]], None]] = None):
+        """:param capacity the number of states to retain.
+        :param sink optional callable receiving the index, assets and liabilities of every state that is dropped."""
+        super().__init__()
+        self.__capacity: int = max(1, capacity)
+        self.__sink = sink
+        # the index of the first state, which the sink is given, for the branch of a fork
+        self.__offset: int = 0
+        self.__length: int = 0
+        self.__assets: List[Optional[Tuple[Optional[Decimal], ...]]] = [None] * self.__capacity
+        self.__liabilities: List[Optional[Tuple[Optional[Decimal], ...]]] = [None] * self.__capacity
+
+    @property
+    def capacity(self) -> int:
+        return self.__capacity
+
+    @property
+    def start(self) -> int:
+        return max(0, self.__length - self.__capacity)
+
+    def __len__(self) -> int:
+        return self.__length
+
+    def branch(self) -> RingHistory:
+        history: RingHistory = RingHistory(self.__capacity, self.__sink)
+        history.__offset = self.__offset + self.__length
+
+        return history
+
+    def append(self, assets: List[Optional[Decimal]], liabilities: List[Optional[Decimal]]):
+        position: int = self.__length % self.__capacity
+
+        if self.__sink is not None and self.__length >= self.__capacity:
+            self.__sink(self.__offset + self.__length - self.__capacity, self._amounts(self.__assets[position]),
+                        self._amounts(self.__liabilities[position]))
+
+        self.__assets[position] = tuple(assets)
+        self.__liabilities[position] = tuple(liabilities)
+        self.__length += 1
+
+    def assets(self, index: int) -> List[Optional[Decimal]]:
+        return self._amounts(self.__assets[self.__position(index)])
+
+    def liabilities(self, index: int) -> List[Optional[Decimal]]:
+        return self._amounts(self.__liabilities[self.__position(index)])
+
+    def asset(self, entry_id: int, index: int) -> Decimal:
+        return self._amount(self.__assets[self.__position(index)][entry_id])
+
+    def liability(self, entry_id: int, index: int) -> Decimal:
+        return self._amount(self.__liabilities[self.__position(index)][entry_id])
+
+    def clear(self):
+        self.__length = 0
+        self.__assets = [None] * self.__capacity
+        self.__liabilities = [None] * self.__capacity
+
+    def __position(self, index: int) -> int:
+        if index < 0:
+            index += self.__length
+
+        if not self.start <= index < self.__length:
+            raise IndexError("balance history index out of range or no longer retained")
+
+        return index % self.__capacity
+
+
+class MappedHistory(BalanceHistory):
+    """Balance history which writes every state to a binary file and only keeps a hot tail of recent states in memory.
+    Older states are read from a memory map of the file, which can be shared by several processes.
+
+    The file starts with a header of HEADER_SIZE bytes: the magic bytes EMBH, the format version and the numeric mode
+    as little endian uint16, the number of entries per side as uint32 and the number of states as uint64. The state
+    count is updated when the file is flushed, e.g. when the history is pickled or closed. The header is followed by
+    fixed size records, one per state: the little endian float64 values of the assets, followed by those of the
+    liabilities, in the order of BalanceEntries.ALL. Entries which were not on the balance sheet are NaN. In the FIXED
+    numeric mode the values are little endian int64 units, with numeric.FIXED_MISSING for missing entries. A read only
+    history takes the numeric mode from the header. With numpy the whole history can be mapped with
+    numpy.memmap(path, dtype='<f8', mode='r', offset=MappedHistory.HEADER_SIZE).reshape(-1, 2, BalanceEntries.COUNT),
+    or dtype='<i8' for FIXED mode.
+
+    An unpickled history, like one loaded from a checkpoint or a deep copy, continues in a copy of the file, so the
+    original file is never truncated."""
+
+    MAGIC: bytes = b'EMBH'
+    VERSION: int = 1
+    HEADER_FORMAT: str = '<4sHHIQ'
+    HEADER_SIZE: int = struct.calcsize(HEADER_FORMAT)
+    RECORD_FORMAT: str = '<' + str(2 * BalanceEntries.COUNT) + 'd'
+    FIXED_RECORD_FORMAT: str = '<' + str(2 * BalanceEntries.COUNT) + 'q'
+    RECORD_SIZE: int = struct.calcsize(RECORD_FORMAT)
+
+    def __init__(self, path: str, tail: int = 28, writable: bool = True):
+        """:param path the file to write the history to, or to read it from when not writable.
+        :param tail the number of recent states to keep in memory.
+        :param writable when False, an existing history file is opened read only."""
+        super().__init__()
+        self.__path: str = path
+        self.__writable: bool = writable
+        self.__tail: RingHistory = RingHistory(tail)
+        self.__file: BinaryIO = open(path, 'w+b' if writable else 'rb')
+        self.__map: Optional[mmap] = None
+        self.__mapped_length: int = 0
+        self.__length: int = 0
+
+        if writable:
+            self.__write_header()
+        else:
+            BalanceHistory.numeric_mode.fset(self, self.__read_header())
+            self.__length = (os.path.getsize(path) - self.HEADER_SIZE) // self.RECORD_SIZE
+
+    @BalanceHistory.numeric_mode.setter
+    def numeric_mode(self, mode: NumericMode):
+        if mode != self.numeric_mode and (not self.__writable or self.__length > 0):
+            raise ValueError("balance history " + self.__path + " is stored in numeric mode " + self.numeric_mode.name)
+
+        BalanceHistory.numeric_mode.fset(self, mode)
+        self.__tail.numeric_mode = mode
+
+        if self.__writable:
+            self.__write_header()
+
+    @property
+    def path(self) -> str:
+        return self.__path
+
+    def __len__(self) -> int:
+        return self.__length
+
+    def branch(self) -> MappedHistory:
+        """:return a history in a new file next to this one, with the same number of states kept in memory."""
+        path, file = _create_branch_file(self.__path)
+        file.close()
+
+        return MappedHistory(path, self.__tail.capacity)
+
+    def append(self, assets: List[Optional[Decimal]], liabilities: List[Optional[Decimal]]):
+        if not self.__writable:
+            raise IOError("balance history " + self.__path + " is read only")
+
+        self.__file.write(struct.pack(self.__record_format(),
+                                      *[self.numeric_mode.to_storage(value) for value in assets],
+                                      *[self.numeric_mode.to_storage(value) for value in liabilities]))
+        self.__tail.append(assets, liabilities)
+        self.__length += 1
+
+    def assets(self, index: int) -> List[Optional[Decimal]]:
+        index = self.__absolute(index)
+
+        if self.__in_tail(index):
+            return self.__tail.assets(index)
+        else:
+            return self.__record(index)[:BalanceEntries.COUNT]
+
+    def liabilities(self, index: int) -> List[Optional[Decimal]]:
+        index = self.__absolute(index)
+
+        if self.__in_tail(index):
+            return self.__tail.liabilities(index)
+        else:
+            return self.__record(index)[BalanceEntries.COUNT:]
+
+    def asset(self, entry_id: int, index: int) -> Decimal:
+        index = self.__absolute(index)
+
+        if self.__in_tail(index):
+            return self.__tail.asset(entry_id, index)
+        else:
+            return self.__entry(index, entry_id)
+
+    def liability(self, entry_id: int, index: int) -> Decimal:
+        index = self.__absolute(index)
+
+        if self.__in_tail(index):
+            return self.__tail.liability(entry_id, index)
+        else:
+            return self.__entry(index, BalanceEntries.COUNT + entry_id)
+
+    def clear(self):
+        self.__unmap()
+
+        if self.__writable:
+            self.__file.seek(self.HEADER_SIZE)
+            self.__file.truncate()
+            self.__length = 0
+            self.__write_header()
+
+        self.__tail.clear()
+
+    def flush(self):
+        """Write the number of states to the header and flush the file."""
+        if self.__writable:
+            self.__write_header()
+            self.__file.flush()
+
+    def close(self):
+        self.__unmap()
+        self.flush()
+        self.__file.close()
+
+    def __getstate__(self) -> dict:
+        self.flush()
+
+        state: dict = self.__dict__.copy()
+        state['_MappedHistory__file'] = None
+        state['_MappedHistory__map'] = None
+        state['_MappedHistory__mapped_length'] = 0
+
+        return state
+
+    def __setstate__(self, state: dict):
+        self.__dict__.update(state)
+
+        if self.__writable:
+            # continue in a copy of the states saved when the history was pickled, the original file may still be
+            # written to
+            with open(self.__path, 'rb') as source:
+                self.__path, self.__file = _create_branch_file(self.__path)
+                size: int = self.HEADER_SIZE + self.__length * self.RECORD_SIZE
+
+                while self.__file.tell() < size:
+                    data: bytes = source.read(min(size - self.__file.tell(), 1 << 20))
+
+                    if not data:
+                        raise IOError("balance history " + source.name + " is shorter than when it was saved")
+
+                    self.__file.write(data)
+
+            self.__write_header()
+        else:
+            self.__file = open(self.__path, 'rb')
+
+    def __in_tail(self, index: int) -> bool:
+        # a read only history has no states in memory
+        return self.__writable and index >= self.__tail.start
+
+    def __record(self, index: int) -> List[Optional[Decimal]]:
+        values = struct.unpack_from(self.__record_format(), self.__mapped(index),
+                                    self.HEADER_SIZE + index * self.RECORD_SIZE)
+        return [self.numeric_mode.from_storage(value) for value in values]
+
+    def __entry(self, index: int, position: int) -> Decimal:
+        value: Optional[Decimal] = self.numeric_mode.from_storage(
+            struct.unpack_from('<' + self.numeric_mode.typecode, self.__mapped(index),
+                               self.HEADER_SIZE + index * self.RECORD_SIZE + 8 * position)[0])
+
+        return self._zero if value is None else value
+
+    def __record_format(self) -> str:
+        return self.RECORD_FORMAT if self.numeric_mode.typecode == 'd' else self.FIXED_RECORD_FORMAT
+
+    def __write_header(self):
+        position: int = self.__file.tell()
+        self.__file.seek(0)
+        self.__file.write(struct.pack(self.HEADER_FORMAT, self.MAGIC, self.VERSION, self.numeric_mode.value,
+                                      BalanceEntries.COUNT, self.__length))
+        self.__file.seek(max(position, self.HEADER_SIZE))
+
+    def __read_header(self) -> NumericMode:
+        """:return the numeric mode of the file, after checking its header."""
+        header: bytes = self.__file.read(self.HEADER_SIZE)
+
+        if len(header) < self.HEADER_SIZE:
+            raise IOError(self.__path + " is not a balance history")
+
+        magic, version, mode, entries, states = struct.unpack(self.HEADER_FORMAT, header)
+
+        if magic != self.MAGIC:
+            raise IOError(self.__path + " is not a balance history")
+        elif version != self.VERSION or entries != BalanceEntries.COUNT:
+            raise IOError("balance history " + self.__path + " has an unsupported format")
+
+        return NumericMode(mode)
+
+    def __mapped(self, index: int) -> mmap:
+        """:return a memory map of the file which includes the record at index."""
+        if self.__map is None or index >= self.__mapped_length:
+            self.__unmap()
+            self.__file.flush()
+            self.__map = mmap(self.__file.fileno(), 0, access=ACCESS_READ)
+            self.__mapped_length = (len(self.__map) - self.HEADER_SIZE) // self.RECORD_SIZE
+
+        return self.__map
+
+    def __unmap(self):
+        if self.__map is not None:
+            self.__map.close()
+            self.__map = None
+            self.__mapped_length = 0
+
+    def __absolute(self, index: int) -> int:
+        if index < 0:
+            index += self.__length
+
+        if not 0 <= index < self.__length:
+            raise IndexError("balance history index out of range")
+
+        return index
+
+
+class ForkedHistory(BalanceHistory):
+    """Balance history of a forked balance sheet. The states saved before the fork are read from the base history,
+    which is shared by all forks and must no longer be appended to. The states saved after the fork are stored in a
+    history of the fork's own, so forks only pay for the states in which they diverge."""
+
+    def __init__(self, base: BalanceHistory, history: Optional[BalanceHistory] = None):
+        """:param base the history up to the fork.
+        :param history the storage for the states saved after the fork. Defaults to a branch of the base, an empty
+        history of the same kind."""
+        super().__init__()
+        self.__base: Optional[BalanceHistory] = base
+        self.__fork: int = len(base)
+        self.__history: BalanceHistory = history if history is not None else base.branch()
+        self.numeric_mode = base.numeric_mode
+
+    @BalanceHistory.numeric_mode.setter
+    def numeric_mode(self, mode: NumericMode):
+        BalanceHistory.numeric_mode.fset(self, mode)
+        self.__history.numeric_mode = mode
+
+    @property
+    def base(self) -> Optional[BalanceHistory]:
+        return self.__base
+
+    @property
+    def history(self) -> BalanceHistory:
+        return self.__history
+
+    @property
+    def start(self) -> int:
+        if self.__fork == 0:
+            return self.__history.start
+        elif self.__history.start > 0:
+            # the states right after the fork were no longer retained
+            return self.__fork + self.__history.start
+        else:
+            return self.__base.start
+
+    def __len__(self) -> int:
+        return self.__fork + len(self.__history)
+
+    def branch(self) -> BalanceHistory:
+        return self.__history.branch()
+
+    def append(self, assets: List[Optional[Decimal]], liabilities: List[Optional[Decimal]]):
+        self.__history.append(assets, liabilities)
+
+    def append_skipped(self, assets: List[Optional[Decimal]], liabilities: List[Optional[Decimal]], states: int):
+        self.__history.append_skipped(assets, liabilities, states)
+
+    def assets(self, index: int) -> List[Optional[Decimal]]:
+        index = self.__absolute(index)
+
+        if index < self.__fork:
+            return self.__base.assets(index)
+        else:
+            return self.__history.assets(index - self.__fork)
+
+    def liabilities(self, index: int) -> List[Optional[Decimal]]:
+        index = self.__absolute(index)
+
+        if index < self.__fork:
+            return self.__base.liabilities(index)
+        else:
+            return self.__history.liabilities(index - self.__fork)
+
+    def asset(self, entry_id: int, index: int) -> Decimal:
+        index = self.__absolute(index)
+
+        if index < self.__fork:
+            return self.__base.asset(entry_id, index)
+        else:
+            return self.__history.asset(entry_id, index - self.__fork)
+
+    def liability(self, entry_id: int, index: int) -> Decimal:
+        index = self.__absolute(index)
+
+        if index < self.__fork:
+            return self.__base.liability(entry_id, index)
+        else:
+            return self.__history.liability(entry_id, index - self.__fork)
+
+    def clear(self):
+        # the base is shared with the other forks, so it is only let go of
+        self.__base = None
+        self.__fork = 0
+        self.__history.clear()
+
+    def __absolute(self, index: int) -> int:
+        if index < 0:
+            index += len(self)
+
+        if not 0 <= index < len(self):
+            raise IndexError("balance history index out of range")
+
+        return index
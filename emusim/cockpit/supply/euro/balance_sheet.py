@@ -1,103 +1,251 @@
 from __future__ import annotations
 
 from decimal import Decimal
-from typing import List, Dict, Set, Optional
+from typing import List, Dict, Optional
+
+from .balance_entries import BalanceEntries
+from .balance_history import BalanceHistory, ColumnarHistory, ForkedHistory
+from .numeric import NumericMode, Fixed
 
 
 class BalanceSheet:
-    """Balance sheet"""
+    """Balance sheet. Entries are stored in fixed size arrays, indexed by the ids of BalanceEntries. The methods taking
+    entry names are a compatibility layer on top of the indexed methods.
+
+    The slots and running totals hold raw values (see NumericMode.to_raw): int units in FIXED mode, so bookings are
+    plain integer additions. Amounts are converted when they are booked and when they are read."""
+
+    # Maximum relative difference between the running totals and a full sum of the entries.
+    DRIFT_TOLERANCE: Decimal = Decimal('1e-9')
 
-    def __init__(self, balance_sheet: Optional[BalanceSheet] = None):
-        self.__assets: Dict[str, Decimal] = {}
-        self.__liabilities: Dict[str, Decimal] = {}
+    __slots__ = ('__assets', '__liabilities', '__assets_value', '__liabilities_value', '__numeric_mode', '__zero',
+                 '__raw_zero', '__units')
+
+    def __init__(self, balance_sheet: Optional[BalanceSheet] = None, numeric_mode: NumericMode = NumericMode.DECIMAL):
+        """:param balance_sheet optional balance sheet to copy, including its numeric mode.
+        :param numeric_mode the type of numbers on the balance sheet if no balance sheet is copied."""
+        self.__set_mode(numeric_mode if balance_sheet is None else balance_sheet.numeric_mode)
 
         if balance_sheet is not None:
-            for name in balance_sheet.assets.keys():
-                self.book_asset(name, balance_sheet.asset(name))
+            self.__assets: List[Optional[Decimal]] = list(balance_sheet.asset_slots)
+            self.__liabilities: List[Optional[Decimal]] = list(balance_sheet.liability_slots)
+            self.__assets_value: Decimal = balance_sheet.__assets_value
+            self.__liabilities_value: Decimal = balance_sheet.__liabilities_value
+        else:
+            self.__assets: List[Optional[Decimal]] = [None] * BalanceEntries.COUNT
+            self.__liabilities: List[Optional[Decimal]] = [None] * BalanceEntries.COUNT
+            self.__assets_value: Decimal = self.__raw_zero
+            self.__liabilities_value: Decimal = self.__raw_zero
 
-            for name in balance_sheet.liabilities.keys():
-                self.book_liability(name, balance_sheet.liability(name))
+    @property
+    def numeric_mode(self) -> NumericMode:
+        return self.__numeric_mode
+
+    @numeric_mode.setter
+    def numeric_mode(self, mode: NumericMode):
+        """Convert all entries to another numeric mode."""
+        previous: NumericMode = self.__numeric_mode
+        self.__set_mode(mode)
+        self.__assets = [mode.to_raw(mode.convert_money(previous.from_raw(value))) for value in self.__assets]
+        self.__liabilities = [mode.to_raw(mode.convert_money(previous.from_raw(value))) for value in self.__liabilities]
+        self.__assets_value = mode.to_raw(mode.convert_money(previous.from_raw(self.__assets_value)))
+        self.__liabilities_value = mode.to_raw(mode.convert_money(previous.from_raw(self.__liabilities_value)))
 
     @property
     def assets(self) -> Dict[str, Decimal]:
-        return self.__assets
+        return self.__entries(self.__assets)
 
     @property
     def liabilities(self) -> Dict[str, Decimal]:
+        return self.__entries(self.__liabilities)
+
+    @property
+    def asset_slots(self) -> List[Optional[Decimal]]:
+        """:return the raw asset values by entry id, int units in FIXED mode. None for entries which are not on the
+        balance sheet."""
+        return self.__assets
+
+    @property
+    def liability_slots(self) -> List[Optional[Decimal]]:
+        """:return the raw liability values by entry id, int units in FIXED mode. None for entries which are not on
+        the balance sheet."""
         return self.__liabilities
 
     @property
     def assets_value(self) -> Decimal:
-        return self.__value(self.assets)
+        """:return the running total of the assets."""
+        return Fixed.from_units(self.__assets_value) if self.__units else self.__assets_value
 
     @property
     def liabilities_value(self) -> Decimal:
-        return self.__value(self.liabilities)
+        """:return the running total of the liabilities."""
+        return Fixed.from_units(self.__liabilities_value) if self.__units else self.__liabilities_value
 
     @property
     def total_balance(self) -> Decimal:
         """:return The total balance if the balance sheet validates (assets == liabilities). -1.0 otherwise."""
         if self.validate():
-            return self.__value(self.assets)
+            return self.assets_value
         else:
-            return Decimal(-1.0)
+            return self.__numeric_mode.money(-1.0)
 
     def clear(self):
-        self.assets.clear()
-        self.liabilities.clear()
+        self.__assets = [None] * BalanceEntries.COUNT
+        self.__liabilities = [None] * BalanceEntries.COUNT
+        self.__assets_value = self.__raw_zero
+        self.__liabilities_value = self.__raw_zero
 
     def book_asset(self, asset_name: str, amount: Decimal):
-        if asset_name in self.assets:
-            self.__assets[asset_name] += Decimal(amount)
-        else:
-            self.__assets[asset_name] = Decimal(amount)
+        self.book_asset_at(BalanceEntries.IDS[asset_name], self.__numeric_mode.money(amount))
 
     def book_liability(self, liability_name: str, amount: Decimal):
-        if liability_name in self.__liabilities:
-            self.__liabilities[liability_name] += Decimal(amount)
-        else:
-            self.__liabilities[liability_name] = Decimal(amount)
+        self.book_liability_at(BalanceEntries.IDS[liability_name], self.__numeric_mode.money(amount))
 
     def set_asset(self, asset_name: str, amount: Decimal):
-            self.__assets[asset_name] = Decimal(amount)
+        self.set_asset_at(BalanceEntries.IDS[asset_name], self.__numeric_mode.money(amount))
 
     def set_liability(self, liability_name: str, amount: Decimal):
-            self.__liabilities[liability_name] = Decimal(amount)
+        self.set_liability_at(BalanceEntries.IDS[liability_name], self.__numeric_mode.money(amount))
+
+    def book_asset_at(self, entry_id: int, amount: Decimal):
+        value: Decimal = amount.units if self.__units else amount
+        slot: Optional[Decimal] = self.__assets[entry_id]
+        self.__assets[entry_id] = value if slot is None else slot + value
+        self.__assets_value += value
+
+    def book_liability_at(self, entry_id: int, amount: Decimal):
+        value: Decimal = amount.units if self.__units else amount
+        slot: Optional[Decimal] = self.__liabilities[entry_id]
+        self.__liabilities[entry_id] = value if slot is None else slot + value
+        self.__liabilities_value += value
+
+    def book_raw_asset_at(self, entry_id: int, value: Decimal):
+        """Book a raw amount, see NumericMode.to_raw, on an asset."""
+        slot: Optional[Decimal] = self.__assets[entry_id]
+        self.__assets[entry_id] = value if slot is None else slot + value
+        self.__assets_value += value
+
+    def book_raw_liability_at(self, entry_id: int, value: Decimal):
+        """Book a raw amount, see NumericMode.to_raw, on a liability."""
+        slot: Optional[Decimal] = self.__liabilities[entry_id]
+        self.__liabilities[entry_id] = value if slot is None else slot + value
+        self.__liabilities_value += value
+
+    def set_asset_at(self, entry_id: int, amount: Optional[Decimal]):
+        value: Optional[Decimal] = self.__numeric_mode.to_raw(amount)
+        slot: Optional[Decimal] = self.__assets[entry_id]
+        self.__assets[entry_id] = value
+        self.__assets_value += (self.__raw_zero if value is None else value)\
+                               - (self.__raw_zero if slot is None else slot)
+
+    def set_liability_at(self, entry_id: int, amount: Optional[Decimal]):
+        value: Optional[Decimal] = self.__numeric_mode.to_raw(amount)
+        slot: Optional[Decimal] = self.__liabilities[entry_id]
+        self.__liabilities[entry_id] = value
+        self.__liabilities_value += (self.__raw_zero if value is None else value)\
+                                    - (self.__raw_zero if slot is None else slot)
 
     def validate(self) -> bool:
-        return self.__value(self.assets) - self.__value(self.liabilities), 2 < Decimal(0.0001) * self.__value(
-            self.assets)
+        """:return True if assets and liabilities are equal within 0.01% of the assets. Exactly equal when the numeric
+        mode is exact."""
+        if self.__numeric_mode.exact:
+            return self.__assets_value == self.__liabilities_value
+
+        return round(abs(self.__assets_value - self.__liabilities_value), 2)\
+               <= self.__numeric_mode.number(0.0001) * abs(self.__assets_value)
+
+    def resum(self) -> bool:
+        """Replace the running totals by a full sum of the entries.
+
+        :return False if the running totals had drifted more than DRIFT_TOLERANCE from the full sums."""
+        assets_value: Decimal = self.__value(self.__assets)
+        liabilities_value: Decimal = self.__value(self.__liabilities)
+        valid: bool = self.__within_drift(self.__assets_value, assets_value)\
+                      and self.__within_drift(self.__liabilities_value, liabilities_value)
+
+        self.__assets_value = assets_value
+        self.__liabilities_value = liabilities_value
+
+        return valid
 
     def asset(self, name: str) -> Decimal:
-        if name in self.assets:
-            return self.assets[name]
-        else:
-            return Decimal(0.0)
+        entry_id: Optional[int] = BalanceEntries.IDS.get(name)
+        return self.__zero if entry_id is None else self.asset_at(entry_id)
 
     def liability(self, name: str) -> Decimal:
-        if name in self.liabilities:
-            return self.liabilities[name]
-        else:
-            return Decimal(0.0)
+        entry_id: Optional[int] = BalanceEntries.IDS.get(name)
+        return self.__zero if entry_id is None else self.liability_at(entry_id)
+
+    def asset_at(self, entry_id: int) -> Decimal:
+        value: Optional[Decimal] = self.__assets[entry_id]
+
+        if value is None:
+            return self.__zero
+
+        return Fixed.from_units(value) if self.__units else value
+
+    def liability_at(self, entry_id: int) -> Decimal:
+        value: Optional[Decimal] = self.__liabilities[entry_id]
+
+        if value is None:
+            return self.__zero
+
+        return Fixed.from_units(value) if self.__units else value
+
+    def raw_asset_at(self, entry_id: int) -> Decimal:
+        """:return the raw value of an asset, see NumericMode.to_raw. Zero if the asset is not on the balance sheet."""
+        value: Optional[Decimal] = self.__assets[entry_id]
+        return self.__raw_zero if value is None else value
+
+    def raw_liability_at(self, entry_id: int) -> Decimal:
+        """:return the raw value of a liability, see NumericMode.to_raw. Zero if the liability is not on the balance
+        sheet."""
+        value: Optional[Decimal] = self.__liabilities[entry_id]
+        return self.__raw_zero if value is None else value
+
+    def __set_mode(self, mode: NumericMode):
+        self.__numeric_mode = mode
+        self.__zero = mode.money(0.0)
+        self.__raw_zero = mode.to_raw(self.__zero)
+        self.__units = mode.raw_units
+
+    def __entries(self, slots: List[Optional[Decimal]]) -> Dict[str, Decimal]:
+        entries: Dict[str, Decimal] = {}
+
+        for entry_id, value in enumerate(slots):
+            if value is not None:
+                entries[BalanceEntries.ALL[entry_id]] = self.__numeric_mode.from_raw(value)
+
+        return entries
+
+    def __within_drift(self, running_total: Decimal, full_sum: Decimal) -> bool:
+        if self.__units:
+            # sums of units are exact
+            return running_total == full_sum
 
-    def __value(self, entries: Dict[str, Decimal]) -> Decimal:
-        total_value: Decimal = Decimal(0.0)
+        tolerance: Decimal = self.__numeric_mode.number(self.DRIFT_TOLERANCE)
 
-        for value in entries.values():
-            total_value += value
+        return abs(running_total - full_sum) <= max(abs(full_sum), self.__numeric_mode.money(1.0)) * tolerance
+
+    def __value(self, slots: List[Optional[Decimal]]) -> Decimal:
+        total_value: Decimal = self.__raw_zero
+
+        for value in slots:
+            if value is not None:
+                total_value += value
 
         return total_value
 
     def __str__(self):
         string: str = "== Assets ==\n"
 
-        for name in self.assets.keys():
-            string += name + ": " + str(self.asset(name)) + "\n"
+        for name, value in self.assets.items():
+            string += name + ": " + str(value) + "\n"
 
         string += "== Liabilities ==\n"
 
-        for name in self.liabilities.keys():
-            string += name + ": " + str(self.liability(name)) + "\n"
+        for name, value in self.liabilities.items():
+            string += name + ": " + str(value) + "\n"
 
         return string + "\n"
 
@@ -105,21 +253,91 @@ class BalanceSheet:
 class BalanceSheetTimeline(BalanceSheet):
     """Balance sheet with history"""
 
-    def __init__(self):
-        super().__init__()
-        self.__history: List[BalanceSheet] = []
+    __slots__ = ('__history', 'resum_interval')
+
+    def __init__(self, history: Optional[BalanceHistory] = None, resum_interval: int = 0,
+                 numeric_mode: NumericMode = NumericMode.DECIMAL):
+        """:param history the storage for saved states. Defaults to a ColumnarHistory.
+        :param resum_interval every how many saved states the running totals are checked against a full sum of the
+        entries. 0 disables the check.
+        :param numeric_mode the type of numbers on the balance sheet."""
+        super().__init__(numeric_mode=numeric_mode)
+        self.__history: BalanceHistory = history if history is not None else ColumnarHistory()
+        self.__history.numeric_mode = numeric_mode
+        self.resum_interval: int = resum_interval
+
+    @BalanceSheet.numeric_mode.setter
+    def numeric_mode(self, mode: NumericMode):
+        """Convert all entries, including the retained history, to another numeric mode."""
+        BalanceSheet.numeric_mode.fset(self, mode)
+
+        states = [(self.__history.assets(index), self.__history.liabilities(index))
+                  for index in range(self.__history.start, len(self.__history))]
+
+        self.__history.clear()
+        self.__history.numeric_mode = mode
+
+        for assets, liabilities in states:
+            self.__history.append(self.__raw(mode, assets), self.__raw(mode, liabilities))
+
+    @property
+    def history(self) -> BalanceHistory:
+        return self.__history
+
+    @history.setter
+    def history(self, history: BalanceHistory):
+        """Replace the history storage. Retained states are copied to the new storage."""
+        history.clear()
+        history.numeric_mode = self.numeric_mode
+
+        for index in range(self.__history.start, len(self.__history)):
+            history.append(self.__raw(self.numeric_mode, self.__history.assets(index)),
+                           self.__raw(self.numeric_mode, self.__history.liabilities(index)))
+
+        self.__history = history
+
+    def fork_history(self) -> BalanceHistory:
+        """Continue the history in a ForkedHistory, so copies of the balance sheet share the states saved so far
+        instead of copying them.
+
+        :return the history up to the fork, which copies need to share."""
+        if isinstance(self.__history, ForkedHistory) and self.__history.base is not None \
+                and len(self.__history.history) == 0:
+            # nothing was saved since the last fork
+            return self.__history.base
+
+        base: BalanceHistory = self.__history
+        self.__history = ForkedHistory(base)
+
+        return base
 
     def clear(self):
         super().clear()
         self.__history.clear()
 
-    def save_state(self) -> bool:
-        if self.validate():
-            self.__history.append(BalanceSheet(self))
+    def save_state(self, check: bool = True, cycles: int = 1) -> bool:
+        """Save the current state to the history.
+
+        :param check whether the balance sheet needs to be validated first.
+        :param cycles the number of cycles the state concludes. More than one if idle cycles were skipped in one step,
+        in which case the history records them as a gap.
+        :return False if the balance sheet was checked and did not validate. The state is not saved in that case."""
+        if check:
+            saved: int = len(self.__history)
+
+            if self.resum_interval > 0 and (saved + cycles) // self.resum_interval > saved // self.resum_interval \
+                    and not self.resum():
+                return False
+
+            if not self.validate():
+                return False
 
-            return True
+        if cycles == 1:
+            self.__history.append(self.asset_slots, self.liability_slots)
         else:
-            return False
+            self.__history.append_skipped(self.asset_slots, self.liability_slots, cycles)
+
+        return True
     
     def balance_history(self, time_delta: int) -> BalanceSheet:
         """Get a balance sheet from the history.
@@ -129,51 +347,61 @@ class BalanceSheetTimeline(BalanceSheet):
         if time_delta == 0:
             return BalanceSheet(self)
         else:
-            return self.__history[len(self.__history) - abs(time_delta)]
+            index: int = self.__index(time_delta)
+            balance: BalanceSheet = BalanceSheet(numeric_mode=self.numeric_mode)
+
+            for entry_id, value in enumerate(self.__history.assets(index)):
+                balance.set_asset_at(entry_id, value)
+
+            for entry_id, value in enumerate(self.__history.liabilities(index)):
+                balance.set_liability_at(entry_id, value)
+
+            return balance
     
     def asset_history(self, name: str, time_delta: int) -> Decimal:
-        return self.balance_history(time_delta).asset(name)
+        if time_delta == 0:
+            return self.asset(name)
+        else:
+            return self.__history.asset(BalanceEntries.IDS[name], self.__index(time_delta))
     
     def liability_history(self, name: str, time_delta: int) -> Decimal:
-        return self.balance_history(time_delta).liability(name)
+        if time_delta == 0:
+            return self.liability(name)
+        else:
+            return self.__history.liability(BalanceEntries.IDS[name], self.__index(time_delta))
     
     def delta_history(self, time_delta: int = 0) -> BalanceSheet:
         if time_delta == 0:
             return self.__calculate_delta(self, self)
         elif len(self.__history) != 0:
-            return self.__calculate_delta(self, self.__history[len(self.__history) - abs(time_delta)])
+            return self.__calculate_delta(self, self.balance_history(time_delta))
         else:
-            return BalanceSheet()
-    
-    def __calculate_delta(self, current: BalanceSheet, previous: BalanceSheet) -> BalanceSheet:
-            delta: BalanceSheet = BalanceSheet()
-            asset_names: Set = set(current.assets.keys())
-            liability_names: Set = set(current.liabilities.keys())
+            return BalanceSheet(numeric_mode=self.numeric_mode)
 
-            previous_assets: Dict[str, Decimal] = previous.assets
-            asset_names.update(previous_assets.keys()) # collect all names
+    def __index(self, time_delta: int) -> int:
+        return len(self.__history) - abs(time_delta)
 
-            for name in asset_names:
-                if name in previous_assets:
-                    delta.book_asset(name, current.assets[name] - previous_assets[name])
-                else:
-                    delta.book_asset(name, current.assets[name])
+    @staticmethod
+    def __raw(mode: NumericMode, amounts: List[Optional[Decimal]]) -> List[Optional[Decimal]]:
+        """:return the raw values of amounts in a numeric mode, for the history."""
+        return [mode.to_raw(amount) for amount in mode.convert_money(amounts)]
+    
+    def __calculate_delta(self, current: BalanceSheet, previous: BalanceSheet) -> BalanceSheet:
+            delta: BalanceSheet = BalanceSheet(numeric_mode=current.numeric_mode)
 
-            previous_liabilities: Dict[str, Decimal] = previous.liabilities
-            liability_names.update(previous_liabilities.keys()) # collect all names
+            for entry_id in range(BalanceEntries.COUNT):
+                if current.asset_slots[entry_id] is not None or previous.asset_slots[entry_id] is not None:
+                    delta.set_asset_at(entry_id, current.asset_at(entry_id) - previous.asset_at(entry_id))
 
-            for name in liability_names:
-                if name in previous_liabilities:
-                    delta.book_liability(name, current.liabilities[name] - previous_liabilities[name])
-                else:
-                    delta.book_liability(name, current.liabilities[name])
+                if current.liability_slots[entry_id] is not None or previous.liability_slots[entry_id] is not None:
+                    delta.set_liability_at(entry_id, current.liability_at(entry_id) - previous.liability_at(entry_id))
 
             return delta
 
     def __str__(self):
         string: str = super().__str__() + "History\n"
 
-        for balance in self.__history:
-            string += balance.__str__()
+        for index in range(len(self.__history)):
+            string += self.balance_history(len(self.__history) - index).__str__()
 
         return string
\ No newline at end of file
@@ -9,7 +9,7 @@ from typing import TYPE_CHECKING, Tuple, List
 
 from ordered_set import OrderedSet
 
-from . import EconomicActor, BalanceEntries
+from . import EconomicActor, BalanceEntries, EntryId, NumericMode
 
 if TYPE_CHECKING:
     from . import CentralBank, PrivateActor
@@ -24,15 +24,17 @@ class SpendingMode(Enum):
 
 class DebtPayment():
 
-    def __init__(self, interest_rate: Decimal):
-        self.__interest_rate: Decimal = Decimal(interest_rate)
-        self.__debt: Decimal = Decimal(0.0)
-        self.__adjusted_debt: Decimal = Decimal(0.0)
-        self.__full_installment: Decimal = Decimal(0.0)
-        self.__full_interest: Decimal = Decimal(0.0)
-        self.__adjusted_interest: Decimal = Decimal(0.0)
-        self.__installment_paid: Decimal = Decimal(0.0)
-        self.__interest_paid: Decimal = Decimal(0.0)
+    def __init__(self, interest_rate: Decimal, numeric_mode: NumericMode = NumericMode.DECIMAL):
+        self.__number = numeric_mode.number
+        self.__money = numeric_mode.money
+        self.__interest_rate: Decimal = self.__number(interest_rate)
+        self.__debt: Decimal = self.__money(0.0)
+        self.__adjusted_debt: Decimal = self.__money(0.0)
+        self.__full_installment: Decimal = self.__money(0.0)
+        self.__full_interest: Decimal = self.__money(0.0)
+        self.__adjusted_interest: Decimal = self.__money(0.0)
+        self.__installment_paid: Decimal = self.__money(0.0)
+        self.__interest_paid: Decimal = self.__money(0.0)
 
     @property
     def debt(self) -> Decimal:
@@ -40,7 +42,7 @@ class DebtPayment():
 
     @debt.setter
     def debt(self, amount: Decimal):
-        self.__debt = Decimal(amount)
+        self.__debt = self.__money(amount)
         self.__adjusted_debt = self.debt
         self.__full_interest = self.debt * self.__interest_rate
         self.__adjusted_interest = self.full_interest
@@ -55,7 +57,7 @@ class DebtPayment():
 
     @full_installment.setter
     def full_installment(self, amount: Decimal):
-        self.__full_installment = Decimal(amount)
+        self.__full_installment = self.__money(amount)
 
     @property
     def full_interest(self) -> Decimal:
@@ -71,13 +73,13 @@ class DebtPayment():
 
     @installment_paid.setter
     def installment_paid(self, paid: Decimal):
-        self.__installment_paid = Decimal(paid)
+        self.__installment_paid = self.__money(paid)
 
         # No interest is charged on unpaid installments. In the context of the simulation, additional unpaid
         # installments are treated as surplus systemic defaults and thus the adjusted debt, installment and interest
         # might need to be updated.
         self.__adjusted_debt -= self.full_installment - paid
-        self.__adjusted_interest = Decimal(self.__adjusted_debt * self.__interest_rate)
+        self.__adjusted_interest = self.__money(self.__adjusted_debt * self.__interest_rate)
 
     @property
     def interest_paid(self) -> Decimal:
@@ -85,7 +87,7 @@ class DebtPayment():
 
     @interest_paid.setter
     def interest_paid(self, paid: Decimal):
-        self.__interest_paid = Decimal(paid)
+        self.__interest_paid = self.__money(paid)
 
 
 class Bank(EconomicActor):
@@ -97,34 +99,34 @@ class Bank(EconomicActor):
                         BalanceEntries.MBS_EQUITY]))
         self.__central_bank: CentralBank = central_bank
         self.central_bank.bank = self
-        self.__installments: List[Decimal] = [Decimal(0.0)]
+        self.__installments: List[Decimal] = [self._raw(self._money(0.0))] # raw values
 
         self.reserves_interval: Period = Period(1, Interval.MONTH) # Interval when reserves are updated
         self.__min_reserve: Decimal = central_bank.min_reserve
 
         self.risk_assets_interval: Period = Period(1, Interval.MONTH)
-        self.__min_risk_assets: Decimal = Decimal(0.0)
-        self.__max_risk_assets: Decimal = Decimal(1.0) # Maximum % of assets being MBS and/or Securities
+        self.__min_risk_assets: Decimal = self._number(0.0)
+        self.__max_risk_assets: Decimal = self._number(1.0) # Maximum % of assets being MBS and/or Securities
 
         # The sum of the two following parameters must always be >= 1.0
-        self.__max_mbs_assets: Decimal = Decimal(1.0) # Max % of risk assets
-        self.__max_security_assets: Decimal = Decimal(1.0) # Max % of risk assets
+        self.__max_mbs_assets: Decimal = self._number(1.0) # Max % of risk assets
+        self.__max_security_assets: Decimal = self._number(1.0) # Max % of risk assets
 
         self.client_interaction_interval: Period = Period(1, Interval.MONTH)
 
-        self.__savings_ir: Decimal = Decimal(0.02)
-        self.__loan_ir: Decimal = Decimal(0.025)
+        self.__savings_ir: Decimal = self._number(0.02)
+        self.__loan_ir: Decimal = self._number(0.025)
         self.loan_duration: Period = Period(20, Interval.YEAR)
 
         self.no_loss: bool = True
-        self.__income_from_interest: Decimal = Decimal(0.8)
-        self.__retain_profit_percentage: Decimal = Decimal(0.2)
+        self.__income_from_interest: Decimal = self._number(0.8)
+        self.__retain_profit_percentage: Decimal = self._number(0.2)
 
         self.spending_mode: SpendingMode = SpendingMode.PROFIT
-        self.__fixed_spending: Decimal = Decimal(0.0)
-        self.__profit_spending: Decimal = Decimal(0.8)
-        self.__equity_spending: Decimal = Decimal(0.0)
-        self.__capital_spending: Decimal = Decimal(0.0)
+        self.__fixed_spending: Decimal = self._money(0.0)
+        self.__profit_spending: Decimal = self._number(0.8)
+        self.__equity_spending: Decimal = self._number(0.0)
+        self.__capital_spending: Decimal = self._number(0.0)
 
         # Cycle flags. Some actions can only be executed once per cycle.
         self.__risk_assets_updated: bool = False
@@ -134,12 +136,12 @@ class Bank(EconomicActor):
         self.__reserves_updated: bool = False
 
         # Cycle attributes
-        self.__installment = Decimal(0.0)
-        self.__client_installment: Decimal = Decimal(0.0)
-        self.__client_installment_shortage: Decimal = Decimal(0.0)
-        self.__expected_income: Decimal = Decimal(0.0)
-        self.__income: Decimal = Decimal(0.0)
-        self.__costs: Decimal = Decimal(0.0)
+        self.__installment = self._money(0.0)
+        self.__client_installment: Decimal = self._money(0.0)
+        self.__client_installment_shortage: Decimal = self._money(0.0)
+        self.__expected_income: Decimal = self._money(0.0)
+        self.__income: Decimal = self._money(0.0)
+        self.__costs: Decimal = self._money(0.0)
 
     @property
     def central_bank(self) -> CentralBank:
@@ -151,7 +153,7 @@ class Bank(EconomicActor):
 
     @min_reserve.setter
     def min_reserve(self, percentage: Decimal):
-        self.__min_reserve = Decimal(max(self.central_bank.min_reserve, percentage))
+        self.__min_reserve = self._number(max(self.central_bank.min_reserve, percentage))
 
     @property
     def savings_ir(self) -> Decimal:
@@ -159,7 +161,7 @@ class Bank(EconomicActor):
 
     @savings_ir.setter
     def savings_ir(self, ir: Decimal):
-        self.__savings_ir = Decimal(ir)
+        self.__savings_ir = self._number(ir)
 
     @property
     def loan_ir(self) -> Decimal:
@@ -167,7 +169,7 @@ class Bank(EconomicActor):
 
     @loan_ir.setter
     def loan_ir(self, ir: Decimal):
-        self.__loan_ir = Decimal(ir)
+        self.__loan_ir = self._number(ir)
 
     @property
     def income_from_interest(self) -> Decimal:
@@ -175,7 +177,7 @@ class Bank(EconomicActor):
 
     @income_from_interest.setter
     def income_from_interest(self, percentage: Decimal):
-        self.__income_from_interest = Decimal(percentage)
+        self.__income_from_interest = self._number(percentage)
 
     @property
     def retain_profit_percentage(self) -> Decimal:
@@ -183,7 +185,7 @@ class Bank(EconomicActor):
 
     @retain_profit_percentage.setter
     def retain_profit_percentage(self, percentage: Decimal):
-        self.__retain_profit_percentage = Decimal(percentage)
+        self.__retain_profit_percentage = self._number(percentage)
 
     @property
     def fixed_spending(self) -> Decimal:
@@ -191,7 +193,7 @@ class Bank(EconomicActor):
 
     @fixed_spending.setter
     def fixed_spending(self, amount: Decimal):
-        self.__fixed_spending = Decimal(amount)
+        self.__fixed_spending = self._money(amount)
 
     @property
     def profit_spending(self) -> Decimal:
@@ -199,7 +201,7 @@ class Bank(EconomicActor):
 
     @profit_spending.setter
     def profit_spending(self, amount: Decimal):
-        self.__profit_spending = Decimal(amount)
+        self.__profit_spending = self._number(amount)
 
     @property
     def capital_spending(self) -> Decimal:
@@ -207,7 +209,7 @@ class Bank(EconomicActor):
 
     @capital_spending.setter
     def capital_spending(self, amount: Decimal):
-        self.__capital_spending = Decimal(amount)
+        self.__capital_spending = self._number(amount)
 
     @property
     def equity_spending(self) -> Decimal:
@@ -215,7 +217,7 @@ class Bank(EconomicActor):
 
     @equity_spending.setter
     def equity_spending(self, amount: Decimal):
-        self.__equity_spending = Decimal(amount)
+        self.__equity_spending = self._number(amount)
 
     @property
     def client(self) -> PrivateActor:
@@ -229,6 +231,11 @@ class Bank(EconomicActor):
     def loan_installments(self) -> int:
         return int(self.loan_duration.days / self.client_interaction_interval.days)
 
+    @property
+    def installments(self) -> List[Decimal]:
+        """:return the installments of the central bank loans, starting with the next one."""
+        return [self._from_raw(installment) for installment in self.__installments]
+
     @property
     def installment(self) -> Decimal:
         return self.__installment
@@ -261,19 +268,19 @@ class Bank(EconomicActor):
 
     @property
     def client_liabilities(self) -> Decimal:
-        return self.liability(BalanceEntries.DEPOSITS) + self.liability(BalanceEntries.SAVINGS)
+        return self.liability_at(EntryId.DEPOSITS) + self.liability_at(EntryId.SAVINGS)
 
     @property
     def total_equity(self) -> Decimal:
-        return self.liability(BalanceEntries.EQUITY) + self.liability(BalanceEntries.MBS_EQUITY)
+        return self.liability_at(EntryId.EQUITY) + self.liability_at(EntryId.MBS_EQUITY)
 
     @property
     def safe_assets(self) -> Decimal:
-        return self.asset(BalanceEntries.RESERVES) + self.asset(BalanceEntries.LOANS)
+        return self.asset_at(EntryId.RESERVES) + self.asset_at(EntryId.LOANS)
 
     @property
     def risk_assets(self) -> Decimal:
-        return self.asset(BalanceEntries.MBS) + self.asset(BalanceEntries.SECURITIES)
+        return self.asset_at(EntryId.MBS) + self.asset_at(EntryId.SECURITIES)
 
     @property
     def min_risk_assets(self) -> Decimal:
@@ -281,7 +288,7 @@ class Bank(EconomicActor):
 
     @min_risk_assets.setter
     def min_risk_assets(self, min_percentage: Decimal):
-        min_percentage = Decimal(min_percentage)
+        min_percentage = self._number(min_percentage)
 
         self.__min_risk_assets = min_percentage
 
@@ -294,7 +301,7 @@ class Bank(EconomicActor):
 
     @max_risk_assets.setter
     def max_risk_assets(self, max_percentage: Decimal):
-        max_percentage = Decimal(max_percentage)
+        max_percentage = self._number(max_percentage)
 
         self.__max_risk_assets = max_percentage
 
@@ -307,7 +314,7 @@ class Bank(EconomicActor):
 
     @max_mbs_assets.setter
     def max_mbs_assets(self, max_percentage: Decimal):
-        max_percentage = Decimal(max_percentage)
+        max_percentage = self._number(max_percentage)
 
         self.__max_mbs_assets = max_percentage
 
@@ -320,7 +327,7 @@ class Bank(EconomicActor):
 
     @max_security_assets.setter
     def max_security_assets(self, max_percentage):
-        max_percentage = Decimal(max_percentage)
+        max_percentage = self._number(max_percentage)
 
         self.__max_security_assets = max_percentage
 
@@ -331,15 +338,15 @@ class Bank(EconomicActor):
     def lcr(self) -> Decimal:
         """Return the Liquidity Coverage Ratio of the bank. Must be called before transactions are started or after
         transactions are ended. Results during transactions are not accurate."""
-        return Decimal(1.0) # TODO
+        return self._number(1.0) # TODO
 
     def start_transactions(self, cycle):
         super().start_transactions(cycle)
-        self.__client_installment: Decimal = Decimal(0.0)
-        self.__client_installment_shortage: Decimal = Decimal(0.0)
-        self.__expected_income = Decimal(0.0)
-        self.__income: Decimal = Decimal(0.0)
-        self.__costs: Decimal = Decimal(0.0)
+        self.__client_installment: Decimal = self._money(0.0)
+        self.__client_installment_shortage: Decimal = self._money(0.0)
+        self.__expected_income = self._money(0.0)
+        self.__income: Decimal = self._money(0.0)
+        self.__costs: Decimal = self._money(0.0)
 
         self.__risk_assets_updated = False
         self.__income_and_spending_processed = False
@@ -349,11 +356,11 @@ class Bank(EconomicActor):
 
         self.client.start_transactions(cycle)
 
-    def end_transactions(self) -> bool:
-        return super().end_transactions() and self.client.end_transactions()
+    def end_transactions(self, cycles: int = 1) -> bool:
+        return super().end_transactions(cycles) and self.client.end_transactions(cycles)
 
     def inflate(self, inflation: Decimal):
-        inflation = Decimal(inflation)
+        inflation = self._number(inflation)
 
         self.fixed_spending += self.fixed_spending * inflation
 
@@ -371,17 +378,17 @@ class Bank(EconomicActor):
 
     def book_savings(self, amount: Decimal):
         """Transfer deposits to savings. This should only be called by the client."""
-        self.book_liability(BalanceEntries.SAVINGS, amount)
-        self.book_liability(BalanceEntries.DEPOSITS, -amount)
+        self.book_liability_at(EntryId.SAVINGS, amount)
+        self.book_liability_at(EntryId.DEPOSITS, -amount)
 
-    def pay_bank(self, amount: Decimal, source: str):
+    def pay_bank(self, amount: Decimal, source: int):
         """Pay the bank an amount of money. Must only be called by clients of the bank.
 
         :param: amount paid to the bank.
-        :param source: indicate whether it comes from DEPOSITS or SAVINGS."""
+        :param source: entry id indicating whether it comes from DEPOSITS or SAVINGS."""
 
-        self.book_liability(source, -amount)
-        self.book_liability(BalanceEntries.EQUITY, amount)
+        self.book_liability_at(source, -amount)
+        self.book_liability_at(EntryId.EQUITY, amount)
 
     def process_client_savings(self):
         """Pay interest on client savings."""
@@ -394,26 +401,26 @@ class Bank(EconomicActor):
 
             self.client.process_savings()
 
-            interest: Decimal = Decimal(self.liability(BalanceEntries.SAVINGS) * interest_rate)
-            self.book_liability(BalanceEntries.SAVINGS, interest)
-            self.book_liability(BalanceEntries.EQUITY, -interest)
-            self.client.book_asset(BalanceEntries.SAVINGS, interest)
-            self.client.book_liability(BalanceEntries.EQUITY, interest)
+            interest: Decimal = self._money(self.liability_at(EntryId.SAVINGS) * interest_rate)
+            self.book_liability_at(EntryId.SAVINGS, interest)
+            self.book_liability_at(EntryId.EQUITY, -interest)
+            self.client.book_asset_at(EntryId.SAVINGS, interest)
+            self.client.book_liability_at(EntryId.EQUITY, interest)
 
             self.__costs += interest
             self.__savings_processed = True
 
     def book_loan(self, amount: Decimal):
-        self.book_asset(BalanceEntries.LOANS, amount)
-        self.book_liability(BalanceEntries.DEPOSITS, amount)
+        self.book_asset_at(EntryId.LOANS, amount)
+        self.book_liability_at(EntryId.DEPOSITS, amount)
 
     def process_interest(self, interest: Decimal):
         # It is possible that interest is negative
-        if self.asset(BalanceEntries.RESERVES) + interest < 0.0:
-            self.borrow(abs(self.asset(BalanceEntries.RESERVES) + interest))
+        if self.asset_at(EntryId.RESERVES) + interest < 0.0:
+            self.borrow(abs(self.asset_at(EntryId.RESERVES) + interest))
 
-        self.book_asset(BalanceEntries.RESERVES, interest)
-        self.book_liability(BalanceEntries.EQUITY, interest)
+        self.book_asset_at(EntryId.RESERVES, interest)
+        self.book_liability_at(EntryId.EQUITY, interest)
 
         if interest > 0.0:
             self.__income += interest
@@ -423,11 +430,11 @@ class Bank(EconomicActor):
     def distribute_interest(self, interest: Decimal):
         """Distribute interest from central bank to clients"""
 
-        self.book_asset(BalanceEntries.RESERVES, interest)
-        self.book_liability(BalanceEntries.DEPOSITS, interest)
+        self.book_asset_at(EntryId.RESERVES, interest)
+        self.book_liability_at(EntryId.DEPOSITS, interest)
 
-        self.client.book_asset(BalanceEntries.DEPOSITS, interest)
-        self.client.book_liability(BalanceEntries.EQUITY, interest)
+        self.client.book_asset_at(EntryId.DEPOSITS, interest)
+        self.client.book_liability_at(EntryId.EQUITY, interest)
 
     def process_income_and_spending(self):
         """Collect interest, installments and other income. Spend net expenses."""
@@ -436,8 +443,8 @@ class Bank(EconomicActor):
                 and not self.__income_and_spending_processed\
                 and self.client_interaction_interval.period_complete(self.cycle):
 
-            debt_payment: DebtPayment = DebtPayment(Decimal(self.loan_ir * self.client_interaction_interval.days
-                                                            / Period.YEAR_DAYS))
+            debt_payment: DebtPayment = DebtPayment(self._number(self.loan_ir * self.client_interaction_interval.days
+                                                                 / Period.YEAR_DAYS), self.numeric_mode)
 
             self.client.pay_debt(debt_payment)
             self.__expected_income = debt_payment.full_interest / self.income_from_interest
@@ -452,32 +459,32 @@ class Bank(EconomicActor):
             # bank costs do not decrease due to defaulted loans
             bank_costs: Decimal = self.__expected_income - debt_payment.full_interest
             profit: Decimal = self.income + bank_costs - self.__costs
-            bank_spending: Decimal = Decimal(0.0)
+            bank_spending: Decimal = self._money(0.0)
 
             # calculate spending
             if self.spending_mode == SpendingMode.FIXED:
                 bank_spending = self.fixed_spending
             elif self.spending_mode == SpendingMode.PROFIT:
-                bank_spending = Decimal(max(Decimal(0.0), profit * self.profit_spending))
+                bank_spending = self._money(max(self._money(0.0), profit * self.profit_spending))
             elif self.spending_mode == SpendingMode.EQUITY:
-                bank_spending = self.liability(BalanceEntries.EQUITY) * self.equity_spending
+                bank_spending = self.liability_at(EntryId.EQUITY) * self.equity_spending
             elif self.spending_mode == SpendingMode.CAPITAL:
-                bank_spending = (self.liability(BalanceEntries.EQUITY) + self.liability(BalanceEntries.MBS_EQUITY))\
+                bank_spending = (self.liability_at(EntryId.EQUITY) + self.liability_at(EntryId.MBS_EQUITY))\
                            * self.capital_spending
 
-                if bank_spending > self.liability(BalanceEntries.EQUITY):
-                    available_deposits: Decimal = self.liability(BalanceEntries.DEPOSITS) + self.liability(BalanceEntries.SAVINGS)
-                    mbs_to_sell: Decimal = min(available_deposits, bank_spending - self.liability(BalanceEntries.EQUITY))
+                if bank_spending > self.liability_at(EntryId.EQUITY):
+                    available_deposits: Decimal = self.liability_at(EntryId.DEPOSITS) + self.liability_at(EntryId.SAVINGS)
+                    mbs_to_sell: Decimal = min(available_deposits, bank_spending - self.liability_at(EntryId.EQUITY))
 
                     # TODO review and implement correct sale of MBS
                     self.client.pay_bank(mbs_to_sell)
 
-                    self.book_liability(BalanceEntries.DEPOSITS, -mbs_to_sell)
-                    self.book_asset(BalanceEntries.MBS, -mbs_to_sell)
-                    self.book_liability(BalanceEntries.MBS_EQUITY, -mbs_to_sell)
-                    self.book_liability(BalanceEntries.EQUITY, mbs_to_sell)
+                    self.book_liability_at(EntryId.DEPOSITS, -mbs_to_sell)
+                    self.book_asset_at(EntryId.MBS, -mbs_to_sell)
+                    self.book_liability_at(EntryId.MBS_EQUITY, -mbs_to_sell)
+                    self.book_liability_at(EntryId.EQUITY, mbs_to_sell)
 
-            bank_spending = min(bank_spending, max(Decimal(0.0), profit - profit * self.retain_profit_percentage))
+            bank_spending = min(bank_spending, max(self._money(0.0), profit - profit * self.retain_profit_percentage))
 
             if self.no_loss and profit - bank_spending < 0:
                 bank_spending = min(bank_spending, profit)
@@ -488,12 +495,12 @@ class Bank(EconomicActor):
             bank_spending -= bank_costs
 
             # Only collect when bank spending is negative. Add bank costs.
-            self.__income += self.client.pay_bank(max(Decimal(0.0), -bank_spending)) + bank_costs
+            self.__income += self.client.pay_bank(max(self._money(0.0), -bank_spending)) + bank_costs
 
-            self.book_liability(BalanceEntries.DEPOSITS, bank_spending)
-            self.client.book_asset(BalanceEntries.DEPOSITS, bank_spending)
-            self.book_liability(BalanceEntries.EQUITY, -bank_spending)
-            self.client.book_liability(BalanceEntries.EQUITY, bank_spending)
+            self.book_liability_at(EntryId.DEPOSITS, bank_spending)
+            self.client.book_asset_at(EntryId.DEPOSITS, bank_spending)
+            self.book_liability_at(EntryId.EQUITY, -bank_spending)
+            self.client.book_liability_at(EntryId.EQUITY, bank_spending)
 
             self.__income_and_spending_processed = True
 
@@ -502,32 +509,38 @@ class Bank(EconomicActor):
             self.__client_installment_shortage = debt_payment.full_installment - debt_payment.installment_paid
 
             # subtract expected installment proportionally from loans and mbs
-            loans: Decimal = self.asset(BalanceEntries.LOANS)
-            mbs: Decimal = self.asset(BalanceEntries.MBS)
-            mbs_equity: Decimal = self.liability(BalanceEntries.MBS_EQUITY)
+            loans: Decimal = self.asset_at(EntryId.LOANS)
+            mbs: Decimal = self.asset_at(EntryId.MBS)
+            mbs_equity: Decimal = self.liability_at(EntryId.MBS_EQUITY)
             total: Decimal = loans + mbs - mbs_equity # take market changes in MBS into account.
 
-            self.book_asset(BalanceEntries.LOANS, -self.client_installment * loans / total)
-            self.book_asset(BalanceEntries.MBS, -self.client_installment * mbs / total)
-            self.book_liability(BalanceEntries.MBS_EQUITY, -self.client_installment * mbs_equity / total)
+            loans_installment: Decimal = self.client_installment * (loans / total)
+            mbs_equity_installment: Decimal = self.client_installment * (mbs_equity / total)
+
+            # the MBS part is the remainder, so the bookings balance exactly when amounts are rounded
+            mbs_installment: Decimal = self.client_installment + mbs_equity_installment - loans_installment
 
-            self.book_liability(BalanceEntries.EQUITY, -self.client_installment)
+            self.book_asset_at(EntryId.LOANS, -loans_installment)
+            self.book_asset_at(EntryId.MBS, -mbs_installment)
+            self.book_liability_at(EntryId.MBS_EQUITY, -mbs_equity_installment)
+
+            self.book_liability_at(EntryId.EQUITY, -self.client_installment)
 
     def __trade_client_securities(self, amount: Decimal, security_type: str) -> Decimal:
         """Trade securities proportionally with each client, if possible.
         A positive amount indicates a buy, a negative amount indicates a sell."""
 
         if security_type == BalanceEntries.SECURITIES and amount < 0:
-            amount = -min(-amount, self.asset(BalanceEntries.SECURITIES))
+            amount = -min(-amount, self.asset_at(EntryId.SECURITIES))
 
         return self.client.trade_securities_with_bank(amount, security_type)
 
     def borrow(self, amount: Decimal):
         self.central_bank.book_loan(amount)
-        self.book_asset(BalanceEntries.RESERVES, amount)
-        self.book_liability(BalanceEntries.DEBT, amount)
+        self.book_asset_at(EntryId.RESERVES, amount)
+        self.book_liability_at(EntryId.DEBT, amount)
 
-        installment: Decimal = amount / self.__central_bank.loan_installments
+        installment: Decimal = self._raw(amount / self.__central_bank.loan_installments)
 
         for i in range(self.__central_bank.loan_installments):
             if len(self.__installments) < i + 1:
@@ -536,15 +549,15 @@ class Bank(EconomicActor):
                 self.__installments[i] += installment
 
     def pay_debt(self, ir: Decimal) -> Tuple[Decimal, Decimal]:
-        interest: Decimal = self.liability(BalanceEntries.DEBT) * ir
-        self.__installment = self.__installments.pop(0)
+        interest: Decimal = self.liability_at(EntryId.DEBT) * ir
+        self.__installment = self._from_raw(self.__installments.pop(0))
         total: Decimal = interest + self.installment
 
-        to_borrow: Decimal = max(Decimal(0.0), total - self.asset(BalanceEntries.RESERVES))
+        to_borrow: Decimal = max(self._money(0.0), total - self.asset_at(EntryId.RESERVES))
         self.borrow(to_borrow)
-        self.book_asset(BalanceEntries.RESERVES, -total)
-        self.book_liability(BalanceEntries.DEBT, -self.installment)
-        self.book_liability(BalanceEntries.EQUITY, -interest)
+        self.book_asset_at(EntryId.RESERVES, -total)
+        self.book_liability_at(EntryId.DEBT, -self.installment)
+        self.book_liability_at(EntryId.EQUITY, -interest)
 
         return tuple((self.installment, interest))
 
@@ -560,28 +573,28 @@ class Bank(EconomicActor):
             target_securities: Decimal = self.central_bank.securities_relative_reserve * min_composite_reserve
             target_reserve: Decimal = min_composite_reserve - target_mbs - target_securities
 
-            cur_reserve: Decimal = self.asset(BalanceEntries.RESERVES)
-            cur_mbs = min(target_mbs, self.asset(BalanceEntries.MBS))
-            cur_securities = min(target_securities, self.asset(BalanceEntries.SECURITIES))
+            cur_reserve: Decimal = self.asset_at(EntryId.RESERVES)
+            cur_mbs = min(target_mbs, self.asset_at(EntryId.MBS))
+            cur_securities = min(target_securities, self.asset_at(EntryId.SECURITIES))
 
             if cur_reserve + cur_mbs + cur_securities < min_composite_reserve:
-                if target_mbs > self.asset(BalanceEntries.MBS):
-                    new_mbs: Decimal = target_mbs - self.asset(BalanceEntries.MBS)
+                if target_mbs > self.asset_at(EntryId.MBS):
+                    new_mbs: Decimal = target_mbs - self.asset_at(EntryId.MBS)
 
-                    if self.asset(BalanceEntries.LOANS) < new_mbs:
-                        target_reserve += new_mbs - self.asset(BalanceEntries.LOANS)
-                        new_mbs = self.asset(BalanceEntries.LOANS)
+                    if self.asset_at(EntryId.LOANS) < new_mbs:
+                        target_reserve += new_mbs - self.asset_at(EntryId.LOANS)
+                        new_mbs = self.asset_at(EntryId.LOANS)
 
-                    self.book_asset(BalanceEntries.LOANS, -new_mbs)
-                    self.book_asset(BalanceEntries.MBS, new_mbs)
-                    self.book_liability(BalanceEntries.EQUITY, -new_mbs)
-                    self.book_liability(BalanceEntries.MBS_EQUITY, new_mbs)
+                    self.book_asset_at(EntryId.LOANS, -new_mbs)
+                    self.book_asset_at(EntryId.MBS, new_mbs)
+                    self.book_liability_at(EntryId.EQUITY, -new_mbs)
+                    self.book_liability_at(EntryId.MBS_EQUITY, new_mbs)
 
-                if target_securities > self.asset(BalanceEntries.SECURITIES):
-                    target_reserve += target_securities - self.asset(BalanceEntries.SECURITIES)
+                if target_securities > self.asset_at(EntryId.SECURITIES):
+                    target_reserve += target_securities - self.asset_at(EntryId.SECURITIES)
 
-                if self.asset(BalanceEntries.RESERVES) < target_reserve:
-                    self.borrow(target_reserve - self.asset(BalanceEntries.RESERVES))
+                if self.asset_at(EntryId.RESERVES) < target_reserve:
+                    self.borrow(target_reserve - self.asset_at(EntryId.RESERVES))
 
             self.__reserves_updated = True
 
@@ -596,7 +609,7 @@ class Bank(EconomicActor):
                 new_risk: Decimal = target_risk - self.risk_assets
                 self.__trade_client_securities(new_risk, risk_asset)
 
-                if risk_asset == BalanceEntries.MBS and self.asset(BalanceEntries.MBS) < target_risk:
+                if risk_asset == BalanceEntries.MBS and self.asset_at(EntryId.MBS) < target_risk:
                     c = [1, 0]  # (to maximize)
 
                     # inequalities, number of rows equal to number of equations
@@ -609,9 +622,10 @@ class Bank(EconomicActor):
                     a = [[1 - self.min_risk_assets, -self.min_risk_assets],
                          [1 - self.max_risk_assets, -self.max_risk_assets],
                          [1, 1]]
-                    b = [self.min_risk_assets * self.asset(BalanceEntries.RESERVES),
-                         self.max_risk_assets * self.asset(BalanceEntries.RESERVES),
-                         self.asset(BalanceEntries.MBS) + self.asset(BalanceEntries.LOANS)]
+                    # the simplex works on numbers, not on money amounts
+                    b = [self._number(self.min_risk_assets * self.asset_at(EntryId.RESERVES)),
+                         self._number(self.max_risk_assets * self.asset_at(EntryId.RESERVES)),
+                         self._number(self.asset_at(EntryId.MBS) + self.asset_at(EntryId.LOANS))]
 
                     # # add slack variables by hand
                     a[0] += [-1, 0]
@@ -622,13 +636,13 @@ class Bank(EconomicActor):
 
                     t, s, v = simplex(c, a, b)
 
-                    new_mbs: Decimal = round(s[0][1], 8) - self.asset(BalanceEntries.MBS)
+                    new_mbs: Decimal = round(s[0][1], 8) - self.asset_at(EntryId.MBS)
 
-                    self.book_asset(BalanceEntries.MBS, new_mbs)
-                    self.book_asset(BalanceEntries.LOANS, -new_mbs)
+                    self.book_asset_at(EntryId.MBS, new_mbs)
+                    self.book_asset_at(EntryId.LOANS, -new_mbs)
             else:
-                cur_loans: Decimal = self.asset(BalanceEntries.LOANS)
-                cur_mbs: Decimal = self.asset(BalanceEntries.MBS)
+                cur_loans: Decimal = self.asset_at(EntryId.LOANS)
+                cur_mbs: Decimal = self.asset_at(EntryId.MBS)
                 c = [1, 1, 0]  # (to maximize)
 
                 # inequalities, number of rows equal to number of equations
@@ -645,11 +659,12 @@ class Bank(EconomicActor):
                      [1 - self.max_mbs_assets, -self.max_mbs_assets, 0],
                      [-self.max_security_assets, 1 - self.max_security_assets, 0],
                      [1, 0, 1]]
-                b = [self.min_risk_assets * self.asset(BalanceEntries.RESERVES),
-                     self.max_risk_assets * self.asset(BalanceEntries.RESERVES),
+                # the simplex works on numbers, not on money amounts
+                b = [self._number(self.min_risk_assets * self.asset_at(EntryId.RESERVES)),
+                     self._number(self.max_risk_assets * self.asset_at(EntryId.RESERVES)),
                      0,
                      0,
-                     cur_mbs + cur_loans]
+                     self._number(cur_mbs + cur_loans)]
 
                 # # add slack variables by hand
                 a[0] += [-1, 0, 0, 0]
@@ -662,12 +677,12 @@ class Bank(EconomicActor):
 
                 t, s, v = simplex(c, a, b)
 
-                new_mbs: Decimal = s[0][1] - self.asset(BalanceEntries.MBS)
-                new_securities: Decimal = s[1][1] - self.asset(BalanceEntries.SECURITIES)
+                new_mbs: Decimal = s[0][1] - self.asset_at(EntryId.MBS)
+                new_securities: Decimal = s[1][1] - self.asset_at(EntryId.SECURITIES)
 
                 self.__trade_client_securities(new_securities, BalanceEntries.SECURITIES)
-                self.book_asset(BalanceEntries.MBS, new_mbs)
-                self.book_asset(BalanceEntries.LOANS, -new_mbs)
+                self.book_asset_at(EntryId.MBS, new_mbs)
+                self.book_asset_at(EntryId.LOANS, -new_mbs)
 
             self.__risk_assets_updated = True
 
@@ -675,10 +690,10 @@ class Bank(EconomicActor):
         """Trade securities with the central bank. A positive amount indicates a sell to the central bank.
         Returns the actual number of securities traded."""
 
-        traded_securities: Decimal = min(amount, self.asset(BalanceEntries.SECURITIES))
+        traded_securities: Decimal = min(amount, self.asset_at(EntryId.SECURITIES))
 
-        self.book_asset(BalanceEntries.SECURITIES, -traded_securities)
-        self.book_asset(BalanceEntries.RESERVES, traded_securities)
+        self.book_asset_at(EntryId.SECURITIES, -traded_securities)
+        self.book_asset_at(EntryId.RESERVES, traded_securities)
 
         return traded_securities
 
@@ -692,16 +707,29 @@ class Bank(EconomicActor):
 
         :return the actual value of the securities that were exchanged."""
 
-        if amount < 0 and security_type == BalanceEntries.SECURITIES:
-            amount = -min(-amount, self.asset(BalanceEntries.SECURITIES))
+        security_id: int = BalanceEntries.IDS[security_type]
+
+        if amount < 0 and security_id == EntryId.SECURITIES:
+            amount = -min(-amount, self.asset_at(EntryId.SECURITIES))
 
-        self.book_asset(security_type, amount)
-        self.book_liability(BalanceEntries.equity_type(security_type), amount)
+        self.book_asset_at(security_id, amount)
+        self.book_liability_at(EntryId.equity_type(security_id), amount)
 
         return amount
 
+    def _convert_money(self, mode: NumericMode):
+        self.__installments = [mode.to_raw(mode.convert_money(self._from_raw(installment)))
+                               for installment in self.__installments]
+        self.__fixed_spending = mode.convert_money(self.__fixed_spending)
+        self.__installment = mode.convert_money(self.__installment)
+        self.__client_installment = mode.convert_money(self.__client_installment)
+        self.__client_installment_shortage = mode.convert_money(self.__client_installment_shortage)
+        self.__expected_income = mode.convert_money(self.__expected_income)
+        self.__income = mode.convert_money(self.__income)
+        self.__costs = mode.convert_money(self.__costs)
+
     def clear(self):
         super().clear()
-        self.__installments = [Decimal(0.0)]
+        self.__installments = [self._raw(self._money(0.0))]
 
         self.client.clear()
\ No newline at end of file
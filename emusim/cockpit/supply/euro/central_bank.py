@@ -7,7 +7,7 @@ from decimal import *
 from ordered_set import OrderedSet
 
 from emusim.cockpit.utilities.cycles import Interval, Period
-from . import BalanceEntries, EconomicActor
+from . import BalanceEntries, EntryId, EconomicActor, NumericMode
 
 if TYPE_CHECKING:
     from . import Bank
@@ -31,26 +31,26 @@ class CentralBank(EconomicActor):
         super().__init__(OrderedSet([BalanceEntries.LOANS, BalanceEntries.SECURITIES, BalanceEntries.HELICOPTER_MONEY,
                                      BalanceEntries.INTEREST]),
                          OrderedSet([BalanceEntries.RESERVES, BalanceEntries.EQUITY]))
-        self.__min_reserve = Decimal(min_reserve)
-        self.__mbs_reserve: Decimal = Decimal(0.0)                # max % of 'reserve' in the form of MBS
-        self.__securities_reserve: Decimal = Decimal(0.0)         # max % of 'reserve' in the form of securities
+        self.__min_reserve = self._number(min_reserve)
+        self.__mbs_reserve: Decimal = self._number(0.0)                # max % of 'reserve' in the form of MBS
+        self.__securities_reserve: Decimal = self._number(0.0)         # max % of 'reserve' in the form of securities
 
-        self.__reserve_ir: Decimal = Decimal(0.0)
-        self.__surplus_reserve_ir: Decimal = Decimal(-0.005)
+        self.__reserve_ir: Decimal = self._number(0.0)
+        self.__surplus_reserve_ir: Decimal = self._number(-0.005)
         self.reserve_interest_interval: Period = Period(1, Interval.DAY)
 
-        self.__loan_ir: Decimal = Decimal(0.01)
+        self.__loan_ir: Decimal = self._number(0.01)
         self.loan_duration: Period = Period(3, Interval.DAY)
         self.loan_interval: Period = Period(3, Interval.DAY)
 
         self.qe_mode: QEMode = QEMode.NONE
-        self.__qe_fixed: Decimal = Decimal(0.0)
-        self.__qe_debt_related = Decimal(0.0)
+        self.__qe_fixed: Decimal = self._money(0.0)
+        self.__qe_debt_related = self._number(0.0)
         self.qe_interval: Period = Period(1, Interval.MONTH)
 
         self.helicopter_mode: HelicopterMode = HelicopterMode.NONE
-        self.__helicopter_fixed: Decimal = Decimal(0.0)
-        self.__helicopter_debt_related: Decimal = Decimal(0.0)
+        self.__helicopter_fixed: Decimal = self._money(0.0)
+        self.__helicopter_debt_related: Decimal = self._number(0.0)
         self.helicopter_interval: Period = Period(1, Interval.MONTH)
 
         # Cycle parameters
@@ -68,7 +68,7 @@ class CentralBank(EconomicActor):
 
     @min_reserve.setter
     def min_reserve(self, percentage: Decimal):
-        self.__min_reserve = Decimal(percentage)
+        self.__min_reserve = self._number(percentage)
 
     @property
     def real_min_reserve(self) -> Decimal:
@@ -76,14 +76,14 @@ class CentralBank(EconomicActor):
 
     @property
     def mbs_relative_reserve(self) -> Decimal:
-        if self.min_reserve != Decimal(0):
+        if self.min_reserve != self._number(0):
             return self.__mbs_reserve / self.min_reserve
         else:
-            return Decimal(0)
+            return self._number(0)
 
     @mbs_relative_reserve.setter
     def mbs_relative_reserve(self, percentage: Decimal):
-        self.__mbs_reserve = Decimal(percentage) * self.min_reserve
+        self.__mbs_reserve = self._number(percentage) * self.min_reserve
 
     @property
     def mbs_real_reserve(self) -> Decimal:
@@ -91,14 +91,14 @@ class CentralBank(EconomicActor):
 
     @property
     def securities_relative_reserve(self) -> Decimal:
-        if self.min_reserve != Decimal(0):
+        if self.min_reserve != self._number(0):
             return self.__securities_reserve / self.min_reserve
         else:
-            return Decimal(0)
+            return self._number(0)
 
     @securities_relative_reserve.setter
     def securities_relative_reserve(self, percentage: Decimal):
-        self.__securities_reserve = Decimal(percentage) * self.min_reserve
+        self.__securities_reserve = self._number(percentage) * self.min_reserve
 
     @property
     def securities_real_reserve(self) -> Decimal:
@@ -110,7 +110,7 @@ class CentralBank(EconomicActor):
 
     @reserve_ir.setter
     def reserve_ir(self, ir: Decimal):
-        self.__reserve_ir = Decimal(ir)
+        self.__reserve_ir = self._number(ir)
 
     @property
     def surplus_reserve_ir(self) -> Decimal:
@@ -118,7 +118,7 @@ class CentralBank(EconomicActor):
 
     @surplus_reserve_ir.setter
     def surplus_reserve_ir(self, ir: Decimal):
-        self.__surplus_reserve_ir = Decimal(ir)
+        self.__surplus_reserve_ir = self._number(ir)
 
     @property
     def loan_ir(self) -> Decimal:
@@ -126,7 +126,7 @@ class CentralBank(EconomicActor):
 
     @loan_ir.setter
     def loan_ir(self, ir: Decimal):
-        self.__loan_ir = Decimal(ir)
+        self.__loan_ir = self._number(ir)
 
     @property
     def qe_fixed(self) -> Decimal:
@@ -134,7 +134,7 @@ class CentralBank(EconomicActor):
 
     @qe_fixed.setter
     def qe_fixed(self, qe: Decimal):
-        self.__qe_fixed = Decimal(qe)
+        self.__qe_fixed = self._money(qe)
 
     @property
     def qe_debt_related(self) -> Decimal:
@@ -142,7 +142,7 @@ class CentralBank(EconomicActor):
 
     @qe_debt_related.setter
     def qe_debt_related(self, relative_qe: Decimal):
-        self.__qe_debt_related = Decimal(relative_qe)
+        self.__qe_debt_related = self._number(relative_qe)
 
     @property
     def helicopter_fixed(self) -> Decimal:
@@ -150,7 +150,7 @@ class CentralBank(EconomicActor):
 
     @helicopter_fixed.setter
     def helicopter_fixed(self, qe: Decimal):
-        self.__helicopter_fixed = Decimal(qe)
+        self.__helicopter_fixed = self._money(qe)
 
     @property
     def helicopter_debt_related(self) -> Decimal:
@@ -158,7 +158,7 @@ class CentralBank(EconomicActor):
 
     @helicopter_debt_related.setter
     def helicopter_debt_related(self, relative_helicopter: Decimal):
-        self.__helicopter_debt_related = Decimal(relative_helicopter)
+        self.__helicopter_debt_related = self._number(relative_helicopter)
 
     @property
     def bank(self) -> Bank:
@@ -185,13 +185,13 @@ class CentralBank(EconomicActor):
 
         self.bank.start_transactions(cycle)
 
-    def end_transactions(self) -> bool:
+    def end_transactions(self, cycles: int = 1) -> bool:
         # if there are interest assets on the books, spend them to the economy
-        return super().end_transactions() and self.bank.end_transactions()
+        return super().end_transactions(cycles) and self.bank.end_transactions(cycles)
 
     def inflate(self, inflation: Decimal):
         if not self.__inflation_processed:
-            inflation = Decimal(inflation)
+            inflation = self._number(inflation)
             self.qe_fixed += self.qe_fixed * inflation
             self.helicopter_fixed += self.helicopter_fixed * inflation
 
@@ -222,9 +222,9 @@ class CentralBank(EconomicActor):
             # Those reserves will always meet the minimum reserves due to the implementation of the Bank class.
             reserve_interest_rate = self.reserve_ir * self.reserve_interest_interval.days / Period.YEAR_DAYS
             surplus_interest_rate = self.surplus_reserve_ir * self.reserve_interest_interval.days / Period.YEAR_DAYS
-            reserves: Decimal = self.bank.asset(BalanceEntries.RESERVES)
+            reserves: Decimal = self.bank.asset_at(EntryId.RESERVES)
             reserve_limit: Decimal = self.bank.client_liabilities * self.min_reserve
-            surplus_reserve: Decimal = max(Decimal(0.0), reserves - reserve_limit)
+            surplus_reserve: Decimal = max(self._money(0.0), reserves - reserve_limit)
             interest: Decimal = reserve_limit * reserve_interest_rate + surplus_reserve * surplus_interest_rate
             self.bank.process_interest(interest)
 
@@ -232,17 +232,17 @@ class CentralBank(EconomicActor):
                 # interest earned from banks is redistributed to the private sector
                 self.bank.distribute_interest(-interest)
             else:
-                self.book_asset(BalanceEntries.INTEREST, -interest)
-                self.book_liability(BalanceEntries.EQUITY, -interest)
+                self.book_asset_at(EntryId.INTEREST, -interest)
+                self.book_liability_at(EntryId.EQUITY, -interest)
 
             self.__reserves_processed = True
 
     def book_loan(self, amount: Decimal):
-        self.book_asset(BalanceEntries.LOANS, amount)
-        self.book_liability(BalanceEntries.RESERVES, amount)
+        self.book_asset_at(EntryId.LOANS, amount)
+        self.book_liability_at(EntryId.RESERVES, amount)
 
     def process_bank_loans(self):
-        installment: Decimal = Decimal(0.0)
+        installment: Decimal = self._money(0.0)
 
         if not self.__loans_processed and self.loan_interval.period_complete(self.cycle):
             payment: Tuple[Decimal, Decimal] = self.bank.pay_debt(self.loan_ir * self.loan_interval.days / Period.YEAR_DAYS)
@@ -250,22 +250,22 @@ class CentralBank(EconomicActor):
             interest: Decimal = payment[1]
             self.bank.distribute_interest(interest)
 
-            self.book_asset(BalanceEntries.LOANS, -installment)
-            self.book_liability(BalanceEntries.RESERVES, -installment)
+            self.book_asset_at(EntryId.LOANS, -installment)
+            self.book_liability_at(EntryId.RESERVES, -installment)
 
             self.__loans_processed = True
 
     def process_qe(self): # TODO: work with qe per year for fixed
         if not self.__qe_processed and self.qe_interval.period_complete(self.cycle):
-            qe_amount: Decimal = Decimal(0.0)
+            qe_amount: Decimal = self._money(0.0)
 
             if self.qe_mode == QEMode.FIXED:
                 qe_amount = self.qe_fixed
             elif self.qe_mode == QEMode.DEBT_RELATED:
                 qe_amount = self.__calculate_private_debt() * self.qe_debt_related
 
-            self.book_asset(BalanceEntries.SECURITIES, qe_amount)
-            self.book_liability(BalanceEntries.RESERVES, qe_amount)
+            self.book_asset_at(EntryId.SECURITIES, qe_amount)
+            self.book_liability_at(EntryId.RESERVES, qe_amount)
 
             # first buy securities from bank
             qe_amount -= self.bank.trade_central_bank_securities(qe_amount)
@@ -278,25 +278,29 @@ class CentralBank(EconomicActor):
 
     def process_helicopter_money(self):# TODO: work with helicopter per year for fixed
         if not self.__helicopter_money_processed and self.helicopter_interval.period_complete(self.cycle):
-            helicopter_money: Decimal = Decimal(0.0)
+            helicopter_money: Decimal = self._money(0.0)
 
             if self.helicopter_mode == HelicopterMode.FIXED:
                 helicopter_money = self.helicopter_fixed
             elif self.helicopter_mode == HelicopterMode.DEBT_RELATED:
                 helicopter_money = self.__calculate_private_debt() * self.helicopter_debt_related
 
-            self.book_asset(BalanceEntries.HELICOPTER_MONEY, helicopter_money)
-            self.book_liability(BalanceEntries.RESERVES, helicopter_money)
+            self.book_asset_at(EntryId.HELICOPTER_MONEY, helicopter_money)
+            self.book_liability_at(EntryId.RESERVES, helicopter_money)
 
-            self.bank.client.book_asset(BalanceEntries.DEPOSITS, helicopter_money)
-            self.bank.client.book_liability(BalanceEntries.EQUITY, helicopter_money)
-            self.bank.book_asset(BalanceEntries.RESERVES, helicopter_money)
-            self.bank.book_liability(BalanceEntries.DEPOSITS, helicopter_money)
+            self.bank.client.book_asset_at(EntryId.DEPOSITS, helicopter_money)
+            self.bank.client.book_liability_at(EntryId.EQUITY, helicopter_money)
+            self.bank.book_asset_at(EntryId.RESERVES, helicopter_money)
+            self.bank.book_liability_at(EntryId.DEPOSITS, helicopter_money)
 
             self.__helicopter_money_processed = True
 
     def __calculate_private_debt(self) -> Decimal:
-        return self.bank.asset(BalanceEntries.LOANS) + self.bank.asset(BalanceEntries.MBS)
+        return self.bank.asset_at(EntryId.LOANS) + self.bank.asset_at(EntryId.MBS)
+
+    def _convert_money(self, mode: NumericMode):
+        self.__qe_fixed = mode.convert_money(self.__qe_fixed)
+        self.__helicopter_fixed = mode.convert_money(self.__helicopter_fixed)
 
     def clear(self):
         super().clear()
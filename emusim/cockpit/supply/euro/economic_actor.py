@@ -1,21 +1,43 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
+from enum import Enum
 
 from decimal import *
+from typing import Callable, List, Optional
 from ordered_set import OrderedSet
 
-from . import BalanceSheetTimeline, BalanceEntries
+from . import BalanceSheetTimeline, BalanceEntries, EntryId, RingHistory, MappedHistory, BookingJournal, NumericMode
+
+
+class CheckLevel(Enum):
+    OFF = 0 # balance sheets are never validated
+    SAMPLED = 1 # balance sheets are validated every check interval
+    FULL = 2 # balance sheets are validated every cycle
 
 
 class EconomicActor(ABC):
 
     def __init__(self, asset_names: OrderedSet[str], liability_names: OrderedSet[str]):
+        self.__numeric_mode: NumericMode = NumericMode.DECIMAL
+        self._number = self.__numeric_mode.number # constructs numbers of the numeric mode, like rates
+        self._money = self.__numeric_mode.money # constructs money amounts of the numeric mode
+        self._raw = self.__numeric_mode.to_raw # converts money amounts to the raw values kept in lists, see to_raw
+        self._from_raw = self.__numeric_mode.from_raw # converts raw values back to money amounts
+        self.__raw_units: bool = self.__numeric_mode.raw_units # whether journaled amounts are int units
+
         self.__cycle: int = 0
 
         self.__asset_names: OrderedSet[str] = asset_names
         self.__liability_names: OrderedSet[str] = liability_names
+        self.__asset_ids: List[bool] = BalanceEntries.id_mask(asset_names)
+        self.__liability_ids: List[bool] = BalanceEntries.id_mask(liability_names)
         self.__balance: BalanceSheetTimeline = BalanceSheetTimeline()
+        self.__journal: Optional[BookingJournal] = None
+
+        self.check_level: CheckLevel = CheckLevel.FULL
+        self.check_interval: int = 1 # cycles between validations when the check level is SAMPLED
+        self.__state_saved: bool = True
 
         # Cycle flags. Operations can not be executed before transactiosn have started. Some operations can only be
         # executed once per cycle.
@@ -31,6 +53,55 @@ class EconomicActor(ABC):
     def balance(self):
         return self.__balance
 
+    @property
+    def numeric_mode(self) -> NumericMode:
+        return self.__numeric_mode
+
+    @numeric_mode.setter
+    def numeric_mode(self, mode: NumericMode):
+        """Convert the balance sheet and all number attributes to another numeric mode. Pending bookings are committed
+        first."""
+        if self.__journal is not None:
+            self.__journal.commit()
+
+        mode.convert_attributes(self)
+        self._convert_money(mode)
+        self.__numeric_mode = mode
+        self._number = mode.number
+        self._money = mode.money
+        self._raw = mode.to_raw
+        self._from_raw = mode.from_raw
+        self.__raw_units = mode.raw_units
+        self.__balance.numeric_mode = mode
+
+    @property
+    def journal(self) -> Optional[BookingJournal]:
+        return self.__journal
+
+    @journal.setter
+    def journal(self, journal: Optional[BookingJournal]):
+        """Defer bookings to a journal which is committed at the end of the transactions. None books directly on the
+        balance sheet."""
+        if self.__journal is not None:
+            self.__journal.commit()
+
+        self.__journal = journal
+
+    @property
+    def assets_value(self) -> Decimal:
+        if self.__journal is None:
+            return self.__balance.assets_value
+        else:
+            return self.__balance.assets_value + self.__numeric_mode.from_raw(self.__journal.pending_assets_value(self))
+
+    @property
+    def liabilities_value(self) -> Decimal:
+        if self.__journal is None:
+            return self.__balance.liabilities_value
+        else:
+            return self.__balance.liabilities_value \
+                   + self.__numeric_mode.from_raw(self.__journal.pending_liabilities_value(self))
+
     @property
     def asset_names(self) -> OrderedSet[str]:
         """Returns the possible asset_names for this entity. Needs to be overridden by subclasses."""
@@ -41,61 +112,148 @@ class EconomicActor(ABC):
         """Returns the possible liability_names for this entity. Needs to be overridden by subclasses."""
         return self.__liability_names
 
+    @property
+    def state_saved(self) -> bool:
+        """:return False if the balance sheet did not pass the checks at the end of the last transactions."""
+        return self.__state_saved
+
     @property
     def _transactions_started(self) -> bool:
         return self.__transactions_started
 
     def grow_securities(self, growth: Decimal):
         if self._transactions_started and not self.__security_growth_processed:
-            security_growth = self.asset(BalanceEntries.SECURITIES) * Decimal(growth)
-            self.book_asset(BalanceEntries.SECURITIES, security_growth)
-            self.book_liability(BalanceEntries.EQUITY, security_growth)
+            security_growth = self.asset_at(EntryId.SECURITIES) * self._number(growth)
+            self.book_asset_at(EntryId.SECURITIES, security_growth)
+            self.book_liability_at(EntryId.EQUITY, security_growth)
             self.__security_growth_processed = True
 
     def grow_mbs(self, growth: Decimal):
         if self._transactions_started and not self.__mbs_growth_processed:
-            mbs_growth = self.asset(BalanceEntries.MBS) * Decimal(growth)
-            self.book_asset(BalanceEntries.MBS, mbs_growth)
-            self.book_liability(BalanceEntries.MBS_EQUITY, mbs_growth)
+            mbs_growth = self.asset_at(EntryId.MBS) * self._number(growth)
+            self.book_asset_at(EntryId.MBS, mbs_growth)
+            self.book_liability_at(EntryId.MBS_EQUITY, mbs_growth)
             self.__mbs_growth_processed = True
 
     def book_asset(self, name: str, amount: Decimal) -> bool:
-        if name in self.asset_names:
-            self.balance.book_asset(name, amount)
+        entry_id: Optional[int] = BalanceEntries.IDS.get(name)
+        return entry_id is not None and self.book_asset_at(entry_id, self._money(amount))
+
+    def set_asset(self, name: str, amount: Decimal) -> bool:
+        entry_id: Optional[int] = BalanceEntries.IDS.get(name)
+        return entry_id is not None and self.set_asset_at(entry_id, self._money(amount))
+
+    def book_liability(self, name: str, amount: Decimal) -> bool:
+        entry_id: Optional[int] = BalanceEntries.IDS.get(name)
+        return entry_id is not None and self.book_liability_at(entry_id, self._money(amount))
+
+    def set_liability(self, name: str, amount: Decimal) -> bool:
+        entry_id: Optional[int] = BalanceEntries.IDS.get(name)
+        return entry_id is not None and self.set_liability_at(entry_id, self._money(amount))
+
+    def asset(self, name: str) -> Decimal:
+        entry_id: Optional[int] = BalanceEntries.IDS.get(name)
+        return self._money(0.0) if entry_id is None else self.asset_at(entry_id)
+
+    def liability(self, name: str) -> Decimal:
+        entry_id: Optional[int] = BalanceEntries.IDS.get(name)
+        return self._money(0.0) if entry_id is None else self.liability_at(entry_id)
+
+    def book_asset_at(self, entry_id: int, amount: Decimal) -> bool:
+        """Book an asset by entry id. The amount is not converted and needs to be of the type used by the balance
+        sheet."""
+        if self.__asset_ids[entry_id]:
+            if self.__journal is None:
+                self.__balance.book_asset_at(entry_id, amount)
+            else:
+                self.__journal.book_asset(self, entry_id, amount.units if self.__raw_units else amount)
+
             return True
         else:
             return False
 
-    def set_asset(self, name: str, amount: Decimal) -> bool:
-        if name in self.asset_names:
-            self.balance.set_asset(name, amount)
+    def set_asset_at(self, entry_id: int, amount: Decimal) -> bool:
+        if self.__asset_ids[entry_id]:
+            if self.__journal is None:
+                self.__balance.set_asset_at(entry_id, amount)
+            else:
+                self.__journal.book_asset(self, entry_id, self.__numeric_mode.to_raw(amount - self.asset_at(entry_id)))
+
             return True
         else:
             return False
 
-    def book_liability(self, name: str, amount: Decimal) -> bool:
-        if name in self.liability_names:
-            self.balance.book_liability(name, amount)
+    def book_liability_at(self, entry_id: int, amount: Decimal) -> bool:
+        """Book a liability by entry id. The amount is not converted and needs to be of the type used by the balance
+        sheet."""
+        if self.__liability_ids[entry_id]:
+            if self.__journal is None:
+                self.__balance.book_liability_at(entry_id, amount)
+            else:
+                self.__journal.book_liability(self, entry_id, amount.units if self.__raw_units else amount)
+
             return True
         else:
             return False
 
-    def set_liability(self, name: str, amount: Decimal) -> bool:
-        if name in self.liability_names:
-            self.balance.set_liability(name, amount)
+    def set_liability_at(self, entry_id: int, amount: Decimal) -> bool:
+        if self.__liability_ids[entry_id]:
+            if self.__journal is None:
+                self.__balance.set_liability_at(entry_id, amount)
+            else:
+                self.__journal.book_liability(self, entry_id,
+                                              self.__numeric_mode.to_raw(amount - self.liability_at(entry_id)))
+
             return True
         else:
             return False
 
-    def asset(self, name: str) -> Decimal:
-        return self.balance.asset(name)
+    def asset_at(self, entry_id: int) -> Decimal:
+        if self.__journal is None:
+            return self.__balance.asset_at(entry_id)
+        else:
+            pending: Optional[Decimal] = self.__journal.pending_asset(self, entry_id)
 
-    def liability(self, name: str) -> Decimal:
-        return self.balance.liability(name)
+            if pending is None:
+                return self.__balance.asset_at(entry_id)
+
+            return self.__numeric_mode.from_raw(self.__balance.raw_asset_at(entry_id) + pending)
+
+    def liability_at(self, entry_id: int) -> Decimal:
+        if self.__journal is None:
+            return self.__balance.liability_at(entry_id)
+        else:
+            pending: Optional[Decimal] = self.__journal.pending_liability(self, entry_id)
+
+            if pending is None:
+                return self.__balance.liability_at(entry_id)
+
+            return self.__numeric_mode.from_raw(self.__balance.raw_liability_at(entry_id) + pending)
 
     def validate_balance(self) -> bool:
         return self.balance.validate()
 
+    def retain_history(self, states: int,
+                       sink: Optional[Callable[[int, List[Optional[Decimal]], List[Optional[Decimal]]], None]] = None):
+        """Only retain the last states of the balance sheet history.
+
+        :param states the number of states to retain.
+        :param sink optional callable receiving the index, assets and liabilities of every state that is dropped."""
+        self.balance.history = RingHistory(states, sink)
+
+    def map_history(self, path: str, tail: int = 28):
+        """Write the balance sheet history to a memory mapped file and only keep the most recent states in memory.
+
+        :param path the file to write the history to.
+        :param tail the number of recent states to keep in memory."""
+        self.balance.history = MappedHistory(path, tail)
+
+    def _convert_money(self, mode: NumericMode):
+        """Convert the attributes which are money amounts to the numeric mode. Called after all number attributes have
+        been converted with NumericMode.convert_attributes. Needs to be overridden by subclasses with money
+        attributes."""
+        pass
+
     @abstractmethod
     def inflate(self, inflation: Decimal):
         pass
@@ -109,14 +267,31 @@ class EconomicActor(ABC):
         self.__security_growth_processed = False
         self.__mbs_growth_processed = False
 
-    def end_transactions(self) -> bool:
+    def end_transactions(self, cycles: int = 1) -> bool:
         """Call after all transactions have been concluded.
+        :param cycles the number of cycles the transactions conclude. More than one for idle cycles which were skipped
+        in one step.
         :return True if the state of the economic actor is validated."""
 
         self.__transactions_started = False
-        self.__cycle += 1
-        return self.balance.save_state()
+        self.__cycle += cycles
+
+        if self.__journal is not None:
+            self.__journal.commit()
+
+        check: bool = self.check_level == CheckLevel.FULL\
+                      or (self.check_level == CheckLevel.SAMPLED
+                          and self.__cycle // self.check_interval > (self.__cycle - cycles) // self.check_interval)
+
+        self.__state_saved = self.balance.save_state(check, cycles)
+
+        return self.__state_saved
 
     def clear(self):
         self.__cycle = 0
+        self.__state_saved = True
+
+        if self.__journal is not None:
+            self.__journal.clear()
+
         self.balance.clear()
\ No newline at end of file
@@ -0,0 +1,894 @@
+from __future__ import annotations
+
+from collections import OrderedDict as OrdDict
+from typing import Dict, KeysView, List, Optional, OrderedDict, Union
+
+import numpy as np
+
+from emusim.cockpit.utilities.cycles import Period
+from . import AggregateSimulator, SimpleDataGenerator, BalanceEntries, EntryId, CheckLevel, QEMode, HelicopterMode,\
+    SpendingMode, DefaultingMode
+from .aggregate_simulator import SYSTEM, CYCLE, GROWTH_TARGET, INFLATION, IM, IM_TARGET, NOMINAL_GROWTH, REAL_GROWTH,\
+    MBS_GROWTH, SECURITY_GROWTH, LENDING_SATISFACTION, LENDING, REQUIRED_LENDING, REQUIRED_LENDING_RATE, LENDING_RATE,\
+    DEBT_RATIO, SECURITIES_RATIO, BANK, INCOME, COSTS, PROFIT, INSTALLMENT_RATIO, PRIVATE_SECTOR, CENTRAL_BANK_BS,\
+    BANK_BS, PRIVATE_SECTOR_BS, BALANCE_SHEET_CATEGORIES, DEFLATABLE_FIELDS
+
+# Row of the economic actors in the balance sheet arrays
+_CENTRAL_BANK: int = 0
+_BANK: int = 1
+_CLIENT: int = 2
+
+_ACTOR_ROWS: Dict[str, int] = {CENTRAL_BANK_BS: _CENTRAL_BANK, BANK_BS: _BANK, PRIVATE_SECTOR_BS: _CLIENT}
+
+
+def _simplex(c: np.ndarray, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Solve one linear program in standard form per replication, with the pivot rules of simplex.simplex:
+    max <c,x> s.t. ax = b, x >= 0 with the last rows of a being the slack variables.
+
+    :param c the objective, shared by all linear programs.
+    :param a the constraints as [row, column, replication].
+    :param b the constraint values as [row, replication].
+    :return the values of the pivot columns of the optimal tableaus in column order, as [pivot column, replication],
+    like the solution returned by simplex.simplex. NaN for unbounded linear programs."""
+    rows, columns, replications = a.shape
+    tableau: np.ndarray = np.empty((replications, rows + 1, columns + 1))
+    tableau[:, :rows, :columns] = a.transpose((2, 0, 1))
+    tableau[:, :rows, columns] = b.T
+    tableau[:, rows, :columns] = c
+    tableau[:, rows, columns] = 0.0
+    indices: np.ndarray = np.arange(replications)
+    bounded: np.ndarray = np.ones(replications, dtype=bool)
+
+    while True:
+        objective: np.ndarray = tableau[:, rows, :columns]
+        improve: np.ndarray = bounded & (objective > 0.0).any(axis=1)
+
+        if not improve.any():
+            break
+
+        # minimum positive entry of the objective row, then the minimum quotient
+        column: np.ndarray = np.argmin(np.where(objective > 0.0, objective, np.inf), axis=1)
+        pivot_column: np.ndarray = tableau[indices, :rows, column]
+        positive: np.ndarray = pivot_column > 0.0
+        bounded &= ~improve | positive.any(axis=1)
+        improve &= bounded
+        row: np.ndarray = np.argmin(np.where(positive, tableau[:, :rows, columns] / pivot_column, np.inf), axis=1)
+
+        pivot: np.ndarray = np.flatnonzero(improve)
+        pivot_row: np.ndarray = tableau[pivot, row[pivot]] / tableau[pivot, row[pivot], column[pivot]][:, None]
+        factors: np.ndarray = tableau[pivot, :, column[pivot]]
+        tableau[pivot] -= factors[:, :, None] * pivot_row[:, None, :]
+        tableau[pivot, row[pivot]] = pivot_row
+
+    body: np.ndarray = tableau[:, :, :columns]
+    is_pivot: np.ndarray = ((body == 0.0).sum(axis=1) == rows) & (body.sum(axis=1) == 1.0)
+    values: np.ndarray = tableau[indices[:, None], np.argmax(body == 1.0, axis=1), columns]
+    order: np.ndarray = np.argsort(~is_pivot, axis=1, kind='stable')
+    solution: np.ndarray = np.where(np.take_along_axis(is_pivot, order, axis=1),
+                                    np.take_along_axis(values, order, axis=1), np.nan)
+    solution[~bounded] = np.nan
+
+    return solution.T
+
+
+class EnsembleSimulator:
+    """Run replications of an AggregateSimulator in lockstep. The balance sheets of all replications are held in float64
+    arrays with one column per replication, so every booking of a cycle is a single vectorized operation for all
+    replications. Parameters can differ per replication for parameter grids.
+
+    The template simulator is only read. Periods, modes, check levels and the collected data fields are shared by all
+    replications. Every run starts from the initial state, the balance sheets and parameters of the template simulator
+    with the changes made by set_parameter and balance_entry, so runs do not depend on each other.
+
+    Replications stop independently when their balance sheets do not validate or their IM is not positive, like
+    AggregateSimulator.run_simulation does. Bookings and parameter updates are masked from then on, so their balance
+    sheets are left as they were in the failing cycle. Their data series end with the collection of the failing cycle
+    and are NaN afterwards.
+
+    Random draws for probabilistic defaulting come from a numpy Generator which is seeded at the start of every run, so
+    individual replications do not reproduce the draws of sequential runs."""
+
+    # Parameters which can differ per replication, as '<object>.<attribute>' of the template simulator
+    PARAMETERS: List[str] = ['economy.growth_rate', 'economy.inflation', 'economy.mbs_growth',
+                             'economy.security_growth', 'economy.lending_satisfaction_rate',
+                             'central_bank.min_reserve', 'central_bank.mbs_relative_reserve',
+                             'central_bank.securities_relative_reserve', 'central_bank.reserve_ir',
+                             'central_bank.surplus_reserve_ir', 'central_bank.loan_ir', 'central_bank.qe_fixed',
+                             'central_bank.qe_debt_related', 'central_bank.helicopter_fixed',
+                             'central_bank.helicopter_debt_related',
+                             'bank.min_reserve', 'bank.savings_ir', 'bank.loan_ir', 'bank.income_from_interest',
+                             'bank.retain_profit_percentage', 'bank.fixed_spending', 'bank.profit_spending',
+                             'bank.equity_spending', 'bank.capital_spending', 'bank.min_risk_assets',
+                             'bank.max_risk_assets', 'bank.max_mbs_assets', 'bank.max_security_assets',
+                             'client.savings_rate', 'client.borrow_for_securities', 'client.fixed_defaulting_rate',
+                             'client.defaulting_probability', 'client.defaulting_min', 'client.defaulting_max',
+                             'client.defaults_bought_by_debt_collectors', 'client.unresolved_debt_growth',
+                             'generator.growth_influence_rate']
+
+    def __init__(self, simulator: AggregateSimulator, replications: int, seed: Optional[int] = None):
+        """:param simulator the template simulator. Its economy provides the parameters and the initial balance sheets
+        of all replications. Only a SimpleDataGenerator is supported.
+        :param replications the number of replications.
+        :param seed the seed of the random draws."""
+        if not isinstance(simulator.generator, SimpleDataGenerator):
+            raise ValueError("Ensembles only support the SimpleDataGenerator")
+
+        economy = simulator.economy
+        self.__simulator: AggregateSimulator = simulator
+        self.__replications: int = replications
+        self.__seed: Optional[int] = seed
+
+        # initial state of every run
+        objects = {'economy': economy, 'central_bank': economy.central_bank, 'bank': economy.bank,
+                   'client': economy.client, 'generator': simulator.generator}
+        self.__initial_parameters: Dict[str, np.ndarray] = {}
+
+        for name in self.PARAMETERS:
+            object_name, attribute = name.split('.')
+            self.__initial_parameters[name] = np.full(replications, float(getattr(objects[object_name], attribute)))
+
+        # balance sheets as [actor, entry, replication]
+        self.__initial_assets: np.ndarray = np.zeros((3, BalanceEntries.COUNT, replications))
+        self.__initial_liabilities: np.ndarray = np.zeros((3, BalanceEntries.COUNT, replications))
+
+        for row, actor in enumerate(economy.actors):
+            for entry_id in range(BalanceEntries.COUNT):
+                asset = actor.asset_at(entry_id)
+                liability = actor.liability_at(entry_id)
+                self.__initial_assets[row, entry_id] = 0.0 if asset is None else float(asset)
+                self.__initial_liabilities[row, entry_id] = 0.0 if liability is None else float(liability)
+
+        # installment schedules as ring buffers of [installment, replication]
+        self.__initial_bank_installments: np.ndarray = self.__schedule(economy.bank.installments,
+                                                                       economy.central_bank.loan_installments)
+        self.__initial_client_installments: np.ndarray = self.__schedule(economy.client.installments,
+                                                                         economy.bank.loan_installments)
+
+        self.__reset()
+        self.__data: OrderedDict[str, OrderedDict[str, np.ndarray]] = OrdDict()
+
+    @property
+    def simulator(self) -> AggregateSimulator:
+        return self.__simulator
+
+    @property
+    def replications(self) -> int:
+        return self.__replications
+
+    @property
+    def active(self) -> np.ndarray:
+        """:return a boolean per replication, False for replications which stopped during the last run."""
+        return self.__active
+
+    def parameter(self, name: str) -> np.ndarray:
+        """:return the initial values of a parameter for all replications. See PARAMETERS."""
+        return self.__initial_parameters[name]
+
+    def set_parameter(self, name: str, values: Union[float, List[float], np.ndarray]):
+        """Set a parameter for all replications.
+
+        :param name the name of the parameter. See PARAMETERS.
+        :param values one value for all replications or one value per replication."""
+        if name not in self.__initial_parameters:
+            raise KeyError("Unknown parameter: " + name)
+
+        self.__initial_parameters[name] = np.broadcast_to(np.asarray(values, dtype=np.float64),
+                                                          (self.replications,)).copy()
+
+    def balance_entry(self, category: str, name: str) -> np.ndarray:
+        """:return the initial value of a balance sheet entry for all replications, as a view which can be changed. The
+        values at the end of a run are collected in the data series.
+
+        :param category one of the balance sheet categories.
+        :param name the name of the asset or liability."""
+        return self.__entry(self.__initial_assets, self.__initial_liabilities, category, name)
+
+    def get_categories(self) -> KeysView[str]:
+        return self.__data.keys()
+
+    def get_data_fields(self, category: str) -> KeysView[str]:
+        return self.__data[category].keys()
+
+    def get_data_series(self, category: str, data_field: str) -> np.ndarray:
+        """:return the collected data as an array of [collection, replication]."""
+        if category in self.__data and data_field in self.__data[category]:
+            return self.__data[category][data_field]
+        else:
+            return np.empty((0, self.replications))
+
+    def run_simulation(self, cycles: int):
+        """Run all replications for a number of cycles, collecting the data fields of the template simulator."""
+        simulator: AggregateSimulator = self.simulator
+        economy = simulator.economy
+        collect_interval: Period = simulator.collect_interval
+        client_interval: Period = economy.bank.client_interaction_interval
+        replications: int = self.replications
+
+        self.__reset()
+        active: np.ndarray = self.__active
+        p: Dict[str, np.ndarray] = self.__parameters
+        a: np.ndarray = self.__assets
+        l: np.ndarray = self.__liabilities
+
+        fields: List[tuple] = [(category, data_field)
+                               for category, data_fields in simulator.collector.data_structure.items()
+                               for data_field, collect in data_fields.items() if collect]
+        rows: int = sum(1 for cycle in range(cycles) if cycle == 0 or collect_interval.period_complete(cycle)) + 1
+        data: Dict[tuple, np.ndarray] = {field: np.full((rows, replications), np.nan) for field in fields}
+        row: int = 0
+        used_rows: int = 0
+
+        deflator: np.ndarray = np.ones(replications)
+        real_growth: np.ndarray = np.zeros(replications)
+        last_real_growth: np.ndarray = np.zeros(replications)
+        nominal_growth: np.ndarray = np.zeros(replications)
+        start_im: np.ndarray = np.zeros(replications)
+        desired_im: np.ndarray = np.zeros(replications)
+        target_im: np.ndarray = np.zeros(replications)
+        required_lending: np.ndarray = np.zeros(replications)
+        lending: np.ndarray = np.zeros(replications)
+        required_lending_rate: np.ndarray = np.zeros(replications)
+        lending_rate: np.ndarray = np.zeros(replications)
+        debt_ratio: np.ndarray = np.zeros(replications)
+        securities_ratio: np.ndarray = np.zeros(replications)
+
+        with np.errstate(all='ignore'):
+            for cycle in range(cycles):
+                if not active.any():
+                    break
+
+                actor_cycle: int = self.__cycle
+
+                # start transactions
+                self.__income = np.zeros(replications)
+                self.__costs = np.zeros(replications)
+                self.__client_installment = np.zeros(replications)
+                self.__borrowed_money = np.zeros(replications)
+                self.__full_installment = np.zeros(replications)
+
+                if client_interval.period_complete(cycle):
+                    self.__full_installment = self.__pop_client_installment()
+
+                im: np.ndarray = l[_BANK, EntryId.DEPOSITS] + l[_BANK, EntryId.SAVINGS]
+
+                if cycle == 0:
+                    start_im = im.copy()
+                    desired_im = start_im.copy()
+
+                if client_interval.period_complete(cycle):
+                    growth: np.ndarray = p['economy.growth_rate'] * client_interval.days / Period.YEAR_DAYS
+                    desired_im = desired_im + desired_im * growth
+                    target_im = start_im + start_im * growth
+                    self.__inflate()
+                    target_im = np.minimum(desired_im, target_im)
+
+                self.__update_reserves(actor_cycle)
+                self.__grow(EntryId.SECURITIES, p['economy.security_growth'], (_CENTRAL_BANK, _BANK, _CLIENT))
+                self.__grow(EntryId.MBS, p['economy.mbs_growth'], (_BANK, _CLIENT))
+                self.__update_risk_assets(actor_cycle)
+                self.__process_qe(actor_cycle)
+                self.__process_helicopter_money(actor_cycle)
+                self.__process_bank_loans(actor_cycle)
+                self.__process_reserve_interests(actor_cycle)
+                self.__process_client_savings(actor_cycle)
+                self.__process_income_and_spending(actor_cycle)
+
+                if client_interval.period_complete(cycle):
+                    im = l[_BANK, EntryId.DEPOSITS] + l[_BANK, EntryId.SAVINGS]
+                    required_lending = np.maximum(target_im - im, 0.0)
+                    multiplier: float = Period.YEAR_DAYS / client_interval.days
+                    self.__borrow(required_lending * p['economy.lending_satisfaction_rate'])
+                    lending = self.__borrowed_money.copy()
+
+                    im = l[_BANK, EntryId.DEPOSITS] + l[_BANK, EntryId.SAVINGS]
+                    positive: np.ndarray = im > 0.0
+                    required_lending_rate = np.where(positive, required_lending / im * multiplier, np.inf)
+                    lending_rate = np.where(positive, lending / im * multiplier, np.inf)
+                    nominal_growth = np.round((im - start_im) / start_im * multiplier, 8)
+
+                    inflation: np.ndarray = p['economy.inflation'] * client_interval.days / Period.YEAR_DAYS
+                    real_growth = (im / (1 + inflation) - start_im) / start_im * multiplier
+                    start_im = im
+
+                im = l[_BANK, EntryId.DEPOSITS] + l[_BANK, EntryId.SAVINGS]
+                debt_ratio = l[_CLIENT, EntryId.DEBT] / im
+                securities: np.ndarray = a[_CLIENT, EntryId.SECURITIES]
+                securities_ratio = np.where(securities > 0.0, securities / a[_CLIENT].sum(axis=0), securities_ratio)
+
+                # end transactions
+                self.__cycle += 1
+                success: np.ndarray = self.__validate() & (im > 0.0)
+
+                regular: bool = cycle == 0 or collect_interval.period_complete(cycle)
+                collect: np.ndarray = active & (regular | ~success)
+
+                if collect.any():
+                    system: Dict[str, np.ndarray] = {
+                        CYCLE: np.full(replications, float(self.__cycle)),
+                        GROWTH_TARGET: p['economy.growth_rate'],
+                        REAL_GROWTH: real_growth,
+                        NOMINAL_GROWTH: nominal_growth,
+                        MBS_GROWTH: p['economy.mbs_growth'],
+                        SECURITY_GROWTH: p['economy.security_growth'],
+                        INFLATION: p['economy.inflation'],
+                        IM: im,
+                        IM_TARGET: target_im,
+                        LENDING_SATISFACTION: p['economy.lending_satisfaction_rate'],
+                        REQUIRED_LENDING: required_lending,
+                        LENDING: lending,
+                        REQUIRED_LENDING_RATE: required_lending_rate,
+                        LENDING_RATE: lending_rate,
+                        DEBT_RATIO: debt_ratio,
+                        SECURITIES_RATIO: securities_ratio}
+
+                    for field in fields:
+                        category, data_field = field
+                        value: np.ndarray = self.__field_data(category, data_field, system)
+
+                        if data_field in DEFLATABLE_FIELDS or category in BALANCE_SHEET_CATEGORIES:
+                            value = value / deflator
+
+                        data[field][row] = np.where(collect, value, data[field][row])
+
+                        if category == SYSTEM and data_field == INFLATION:
+                            deflator = np.where(collect, deflator * (1 + value), deflator)
+
+                    last_real_growth = np.where(collect, real_growth, last_real_growth)
+                    used_rows = row + 1
+
+                if (active & ~success).any():
+                    active &= success
+                    self.__all_active = False
+
+                if regular:
+                    row += 1
+
+                # SimpleDataGenerator
+                self.__update_parameter('economy.inflation',
+                                        p['economy.inflation'] + p['economy.inflation'] * last_real_growth
+                                        * p['generator.growth_influence_rate'])
+
+        self.__data = OrdDict()
+
+        for (category, data_field), values in data.items():
+            if category not in self.__data:
+                self.__data[category] = OrdDict()
+
+            self.__data[category][data_field] = values[:used_rows]
+
+    def __field_data(self, category: str, data_field: str, system: Dict[str, np.ndarray]) -> np.ndarray:
+        a: np.ndarray = self.__assets
+        data: Optional[np.ndarray] = None
+
+        if category == SYSTEM:
+            data = system.get(data_field)
+        elif category == BANK:
+            if data_field == INCOME:
+                data = self.__income
+            elif data_field == COSTS:
+                data = self.__costs
+            elif data_field == PROFIT:
+                data = self.__income - self.__costs
+            elif data_field == INSTALLMENT_RATIO:
+                data = self.__installment / a[_BANK].sum(axis=0)
+        elif category == PRIVATE_SECTOR:
+            if data_field == INSTALLMENT_RATIO:
+                data = self.__client_installment / a[_CLIENT].sum(axis=0)
+        elif category in BALANCE_SHEET_CATEGORIES:
+            data = self.__entry(self.__assets, self.__liabilities, category, data_field)
+
+        return np.zeros(self.replications) if data is None else data
+
+    def __reset(self):
+        """Set the state of a run to the initial state."""
+        replications: int = self.replications
+        economy = self.simulator.economy
+        self.__random: np.random.Generator = np.random.default_rng(self.__seed)
+        self.__cycle: int = economy.central_bank.cycle
+        self.__parameters: Dict[str, np.ndarray] = {name: values.copy()
+                                                    for name, values in self.__initial_parameters.items()}
+        self.__assets: np.ndarray = self.__initial_assets.copy()
+        self.__liabilities: np.ndarray = self.__initial_liabilities.copy()
+        self.__bank_installments: np.ndarray = self.__initial_bank_installments.copy()
+        self.__bank_head: int = 0
+        self.__client_installments: np.ndarray = self.__initial_client_installments.copy()
+        self.__client_head: int = 0
+        self.__installment: np.ndarray = np.full(replications, float(economy.bank.installment))
+
+        # cycle attributes
+        self.__full_installment: np.ndarray = np.zeros(replications)
+        self.__client_installment: np.ndarray = np.zeros(replications)
+        self.__borrowed_money: np.ndarray = np.zeros(replications)
+        self.__income: np.ndarray = np.zeros(replications)
+        self.__costs: np.ndarray = np.zeros(replications)
+
+        self.__active: np.ndarray = np.ones(replications, dtype=bool)
+        self.__all_active: bool = True
+
+    def __entry(self, assets: np.ndarray, liabilities: np.ndarray, category: str, name: str) -> np.ndarray:
+        row: int = _ACTOR_ROWS[category]
+
+        if name in self.simulator.economy.actors[row].asset_names:
+            return assets[row, BalanceEntries.IDS[name]]
+        else:
+            return liabilities[row, BalanceEntries.IDS[name]]
+
+    def __masked(self, amount: np.ndarray) -> np.ndarray:
+        """:return the amount for active replications and 0 for stopped ones."""
+        return amount if self.__all_active else np.where(self.__active, amount, 0.0)
+
+    def __book_asset_at(self, row: int, entry_id: int, amount: np.ndarray):
+        self.__assets[row, entry_id] += self.__masked(amount)
+
+    def __book_liability_at(self, row: int, entry_id: int, amount: np.ndarray):
+        self.__liabilities[row, entry_id] += self.__masked(amount)
+
+    def __update_parameter(self, name: str, values: np.ndarray):
+        """Update a parameter during a run, keeping the values of stopped replications."""
+        if not self.__all_active:
+            values = np.where(self.__active, values, self.__parameters[name])
+
+        self.__parameters[name] = values
+
+    def __schedule(self, installments: List, length: int) -> np.ndarray:
+        schedule: np.ndarray = np.zeros((max(1, length, len(installments)), self.replications))
+
+        for index, installment in enumerate(installments):
+            schedule[index] = float(installment)
+
+        return schedule
+
+    def __pop_client_installment(self) -> np.ndarray:
+        installment: np.ndarray = self.__client_installments[self.__client_head].copy()
+        self.__client_installments[self.__client_head] = 0.0
+        self.__client_head = (self.__client_head + 1) % len(self.__client_installments)
+
+        return installment
+
+    def __pop_bank_installment(self) -> np.ndarray:
+        installment: np.ndarray = self.__bank_installments[self.__bank_head].copy()
+        self.__bank_installments[self.__bank_head] = 0.0
+        self.__bank_head = (self.__bank_head + 1) % len(self.__bank_installments)
+
+        return installment
+
+    def __add_installments(self, schedule: np.ndarray, head: int, installments: int, amount: np.ndarray):
+        """Add an installment to the next installments of a schedule, like the installment lists of the actors."""
+        schedule[(head + np.arange(installments)) % len(schedule)] += self.__masked(amount) / installments
+
+    def __validate(self) -> np.ndarray:
+        check_level: CheckLevel = self.simulator.check_level
+        valid: np.ndarray = np.ones(self.replications, dtype=bool)
+
+        if check_level == CheckLevel.FULL or \
+                (check_level == CheckLevel.SAMPLED and self.__cycle % max(1, self.simulator.check_interval) == 0):
+            for row in range(3):
+                assets_value: np.ndarray = self.__assets[row].sum(axis=0)
+                liabilities_value: np.ndarray = self.__liabilities[row].sum(axis=0)
+                valid &= np.round(np.abs(assets_value - liabilities_value), 2) <= 0.0001 * np.abs(assets_value)
+
+        return valid
+
+    def __inflate(self):
+        p: Dict[str, np.ndarray] = self.__parameters
+        inflation: np.ndarray = p['economy.inflation'] \
+                                * self.simulator.economy.bank.client_interaction_interval.days / Period.YEAR_DAYS
+
+        for name in ['central_bank.qe_fixed', 'central_bank.helicopter_fixed', 'bank.fixed_spending']:
+            self.__update_parameter(name, p[name] + p[name] * inflation)
+
+    def __grow(self, entry_id: int, growth: np.ndarray, rows: tuple):
+        equity_id: int = EntryId.equity_type(entry_id)
+
+        for row in rows:
+            amount: np.ndarray = self.__assets[row, entry_id] * growth
+            self.__book_asset_at(row, entry_id, amount)
+            self.__book_liability_at(row, equity_id, amount)
+
+    # Bank
+
+    def __bank_borrow(self, amount: np.ndarray):
+        self.__book_asset_at(_CENTRAL_BANK, EntryId.LOANS, amount)
+        self.__book_liability_at(_CENTRAL_BANK, EntryId.RESERVES, amount)
+        self.__book_asset_at(_BANK, EntryId.RESERVES, amount)
+        self.__book_liability_at(_BANK, EntryId.DEBT, amount)
+        self.__add_installments(self.__bank_installments, self.__bank_head,
+                                self.simulator.economy.central_bank.loan_installments, amount)
+
+    def __distribute_interest(self, interest: np.ndarray):
+        self.__book_asset_at(_BANK, EntryId.RESERVES, interest)
+        self.__book_liability_at(_BANK, EntryId.DEPOSITS, interest)
+        self.__book_asset_at(_CLIENT, EntryId.DEPOSITS, interest)
+        self.__book_liability_at(_CLIENT, EntryId.EQUITY, interest)
+
+    def __trade_central_bank_securities(self, amount: np.ndarray) -> np.ndarray:
+        a = self.__assets
+        traded: np.ndarray = np.minimum(amount, a[_BANK, EntryId.SECURITIES])
+        self.__book_asset_at(_BANK, EntryId.SECURITIES, -traded)
+        self.__book_asset_at(_BANK, EntryId.RESERVES, traded)
+
+        return traded
+
+    def __trade_client_securities(self, amount: np.ndarray, security_id: int, mask: np.ndarray) -> np.ndarray:
+        """Bank and client side of a securities trade, see PrivateActor.trade_securities_with_bank. Replications outside
+        the mask do not trade."""
+        a = self.__assets
+        equity_id: int = EntryId.equity_type(security_id)
+
+        if security_id == EntryId.SECURITIES:
+            amount = np.where(amount < 0.0, -np.minimum(-amount, a[_BANK, EntryId.SECURITIES]), amount)
+        else:
+            amount = np.minimum(amount, a[_CLIENT, EntryId.MBS])
+            amount = np.where(amount < 0.0, -np.minimum(-amount, a[_BANK, EntryId.SECURITIES]), amount)
+
+        amount = -self.__pay_bank(-amount, EntryId.EQUITY, self.__parameters['client.borrow_for_securities'], mask)
+
+        if security_id == EntryId.SECURITIES:
+            amount = np.where(amount < 0.0, -np.minimum(-amount, a[_BANK, EntryId.SECURITIES]), amount)
+
+        amount = np.where(mask, amount, 0.0)
+        self.__book_asset_at(_BANK, security_id, amount)
+        self.__book_liability_at(_BANK, equity_id, amount)
+
+        delta: np.ndarray = np.minimum(a[_CLIENT, security_id], amount)
+        self.__book_asset_at(_CLIENT, security_id, -delta)
+        self.__book_liability_at(_CLIENT, equity_id, -delta)
+
+        return amount
+
+    def __update_reserves(self, actor_cycle: int):
+        economy = self.simulator.economy
+
+        if not economy.bank.reserves_interval.period_complete(actor_cycle):
+            return
+
+        a, l, p = self.__assets, self.__liabilities, self.__parameters
+        min_composite_reserve: np.ndarray = (l[_BANK, EntryId.DEPOSITS] + l[_BANK, EntryId.SAVINGS]) \
+                                            * p['bank.min_reserve']
+        target_mbs: np.ndarray = p['central_bank.mbs_relative_reserve'] * min_composite_reserve
+        target_securities: np.ndarray = p['central_bank.securities_relative_reserve'] * min_composite_reserve
+        target_reserve: np.ndarray = min_composite_reserve - target_mbs - target_securities
+
+        current: np.ndarray = a[_BANK, EntryId.RESERVES] + np.minimum(target_mbs, a[_BANK, EntryId.MBS]) \
+                              + np.minimum(target_securities, a[_BANK, EntryId.SECURITIES])
+        update: np.ndarray = current < min_composite_reserve
+
+        new_mbs: np.ndarray = np.where(update & (target_mbs > a[_BANK, EntryId.MBS]),
+                                       target_mbs - a[_BANK, EntryId.MBS], 0.0)
+        short: np.ndarray = a[_BANK, EntryId.LOANS] < new_mbs
+        target_reserve = np.where(short, target_reserve + new_mbs - a[_BANK, EntryId.LOANS], target_reserve)
+        new_mbs = np.where(short, a[_BANK, EntryId.LOANS], new_mbs)
+        self.__book_asset_at(_BANK, EntryId.LOANS, -new_mbs)
+        self.__book_asset_at(_BANK, EntryId.MBS, new_mbs)
+        self.__book_liability_at(_BANK, EntryId.EQUITY, -new_mbs)
+        self.__book_liability_at(_BANK, EntryId.MBS_EQUITY, new_mbs)
+
+        target_reserve = np.where(update & (target_securities > a[_BANK, EntryId.SECURITIES]),
+                                  target_reserve + target_securities - a[_BANK, EntryId.SECURITIES], target_reserve)
+        self.__bank_borrow(np.where(update & (a[_BANK, EntryId.RESERVES] < target_reserve),
+                                    target_reserve - a[_BANK, EntryId.RESERVES], 0.0))
+
+    def __update_risk_assets(self, actor_cycle: int):
+        if not self.simulator.economy.bank.risk_assets_interval.period_complete(actor_cycle):
+            return
+
+        a, p = self.__assets, self.__parameters
+        update: np.ndarray = self.__active & (p['bank.min_risk_assets'] > 0.0)
+
+        if not update.any():
+            return
+
+        min_risk, max_risk = p['bank.min_risk_assets'], p['bank.max_risk_assets']
+        max_mbs, max_securities = p['bank.max_mbs_assets'], p['bank.max_security_assets']
+        single: np.ndarray = update & ((max_mbs == 0.0) | (max_securities == 0.0))
+        mixed: np.ndarray = update & ~single
+
+        for security_id, select in ((EntryId.MBS, single & (max_securities == 0.0)),
+                                    (EntryId.SECURITIES, single & (max_securities != 0.0))):
+            if not select.any():
+                continue
+
+            safe_assets: np.ndarray = a[_BANK, EntryId.RESERVES] + a[_BANK, EntryId.LOANS]
+            target_risk: np.ndarray = max_risk * safe_assets / (1 - max_risk)
+            new_risk: np.ndarray = target_risk - a[_BANK, EntryId.MBS] - a[_BANK, EntryId.SECURITIES]
+            self.__trade_client_securities(np.where(select, new_risk, 0.0), security_id, select)
+
+            if security_id == EntryId.MBS:
+                select = select & (a[_BANK, EntryId.MBS] < target_risk)
+
+                if select.any():
+                    # Sequence: [MBS LOANS], see Bank.update_risk_assets
+                    ones: np.ndarray = np.ones(self.replications)
+                    zeros: np.ndarray = np.zeros(self.replications)
+                    solution: np.ndarray = _simplex(np.array([1.0, 0.0, 0.0, 0.0]),
+                                                    np.stack([np.stack([1 - min_risk, -min_risk, -ones, zeros]),
+                                                              np.stack([1 - max_risk, -max_risk, zeros, ones]),
+                                                              np.stack([ones, ones, zeros, zeros])])[:, :, select],
+                                                    np.stack([min_risk * a[_BANK, EntryId.RESERVES],
+                                                              max_risk * a[_BANK, EntryId.RESERVES],
+                                                              a[_BANK, EntryId.MBS] + a[_BANK, EntryId.LOANS]])
+                                                    [:, select])
+                    new_mbs: np.ndarray = np.zeros(self.replications)
+                    new_mbs[select] = np.round(solution[0], 8) - a[_BANK, EntryId.MBS, select]
+                    self.__book_asset_at(_BANK, EntryId.MBS, new_mbs)
+                    self.__book_asset_at(_BANK, EntryId.LOANS, -new_mbs)
+
+        if mixed.any():
+            # Sequence: [MBS SEC LOANS], see Bank.update_risk_assets
+            ones: np.ndarray = np.ones(self.replications)
+            zeros: np.ndarray = np.zeros(self.replications)
+            solution: np.ndarray = _simplex(np.array([1.0, 1.0, 0.0, 0.0, 0.0, 0.0, 0.0]),
+                                            np.stack([np.stack([1 - min_risk, 1 - min_risk, -min_risk,
+                                                                -ones, zeros, zeros, zeros]),
+                                                      np.stack([1 - max_risk, 1 - max_risk, -max_risk,
+                                                                zeros, ones, zeros, zeros]),
+                                                      np.stack([1 - max_mbs, -max_mbs, zeros,
+                                                                zeros, zeros, ones, zeros]),
+                                                      np.stack([-max_securities, 1 - max_securities, zeros,
+                                                                zeros, zeros, zeros, ones]),
+                                                      np.stack([ones, zeros, ones, zeros, zeros, zeros, zeros])])
+                                            [:, :, mixed],
+                                            np.stack([min_risk * a[_BANK, EntryId.RESERVES],
+                                                      max_risk * a[_BANK, EntryId.RESERVES],
+                                                      zeros,
+                                                      zeros,
+                                                      a[_BANK, EntryId.MBS] + a[_BANK, EntryId.LOANS]])[:, mixed])
+            new_mbs: np.ndarray = np.zeros(self.replications)
+            new_securities: np.ndarray = np.zeros(self.replications)
+            new_mbs[mixed] = solution[0] - a[_BANK, EntryId.MBS, mixed]
+            new_securities[mixed] = solution[1] - a[_BANK, EntryId.SECURITIES, mixed]
+
+            self.__trade_client_securities(new_securities, EntryId.SECURITIES, mixed)
+            self.__book_asset_at(_BANK, EntryId.MBS, new_mbs)
+            self.__book_asset_at(_BANK, EntryId.LOANS, -new_mbs)
+
+    def __process_qe(self, actor_cycle: int):
+        central_bank = self.simulator.economy.central_bank
+
+        if central_bank.qe_mode == QEMode.NONE or not central_bank.qe_interval.period_complete(actor_cycle):
+            return
+
+        a, p = self.__assets, self.__parameters
+
+        if central_bank.qe_mode == QEMode.FIXED:
+            qe: np.ndarray = p['central_bank.qe_fixed'].copy()
+        else:
+            qe: np.ndarray = (a[_BANK, EntryId.LOANS] + a[_BANK, EntryId.MBS]) * p['central_bank.qe_debt_related']
+
+        self.__book_asset_at(_CENTRAL_BANK, EntryId.SECURITIES, qe)
+        self.__book_liability_at(_CENTRAL_BANK, EntryId.RESERVES, qe)
+        qe = qe - self.__trade_central_bank_securities(qe)
+        self.__trade_client_securities(qe, EntryId.SECURITIES, self.__active)
+        self.__trade_central_bank_securities(qe)
+
+    def __process_helicopter_money(self, actor_cycle: int):
+        central_bank = self.simulator.economy.central_bank
+
+        if central_bank.helicopter_mode == HelicopterMode.NONE\
+                or not central_bank.helicopter_interval.period_complete(actor_cycle):
+            return
+
+        a, p = self.__assets, self.__parameters
+
+        if central_bank.helicopter_mode == HelicopterMode.FIXED:
+            money: np.ndarray = p['central_bank.helicopter_fixed'].copy()
+        else:
+            money: np.ndarray = (a[_BANK, EntryId.LOANS] + a[_BANK, EntryId.MBS]) \
+                                * p['central_bank.helicopter_debt_related']
+
+        self.__book_asset_at(_CENTRAL_BANK, EntryId.HELICOPTER_MONEY, money)
+        self.__book_liability_at(_CENTRAL_BANK, EntryId.RESERVES, money)
+        self.__book_asset_at(_CLIENT, EntryId.DEPOSITS, money)
+        self.__book_liability_at(_CLIENT, EntryId.EQUITY, money)
+        self.__book_asset_at(_BANK, EntryId.RESERVES, money)
+        self.__book_liability_at(_BANK, EntryId.DEPOSITS, money)
+
+    def __process_bank_loans(self, actor_cycle: int):
+        central_bank = self.simulator.economy.central_bank
+
+        if not central_bank.loan_interval.period_complete(actor_cycle):
+            return
+
+        a, l = self.__assets, self.__liabilities
+        interest: np.ndarray = l[_BANK, EntryId.DEBT] * self.__parameters['central_bank.loan_ir'] \
+                               * central_bank.loan_interval.days / Period.YEAR_DAYS
+        self.__installment = installment = self.__pop_bank_installment()
+        total: np.ndarray = interest + installment
+
+        self.__bank_borrow(np.maximum(0.0, total - a[_BANK, EntryId.RESERVES]))
+        self.__book_asset_at(_BANK, EntryId.RESERVES, -total)
+        self.__book_liability_at(_BANK, EntryId.DEBT, -installment)
+        self.__book_liability_at(_BANK, EntryId.EQUITY, -interest)
+
+        self.__distribute_interest(interest)
+        self.__book_asset_at(_CENTRAL_BANK, EntryId.LOANS, -installment)
+        self.__book_liability_at(_CENTRAL_BANK, EntryId.RESERVES, -installment)
+
+    def __process_reserve_interests(self, actor_cycle: int):
+        central_bank = self.simulator.economy.central_bank
+
+        if not central_bank.reserve_interest_interval.period_complete(actor_cycle):
+            return
+
+        a, l, p = self.__assets, self.__liabilities, self.__parameters
+        days: float = central_bank.reserve_interest_interval.days / Period.YEAR_DAYS
+        reserves: np.ndarray = a[_BANK, EntryId.RESERVES].copy()
+        reserve_limit: np.ndarray = (l[_BANK, EntryId.DEPOSITS] + l[_BANK, EntryId.SAVINGS]) \
+                                    * p['central_bank.min_reserve']
+        surplus_reserve: np.ndarray = np.maximum(0.0, reserves - reserve_limit)
+        interest: np.ndarray = reserve_limit * (p['central_bank.reserve_ir'] * days) \
+                               + surplus_reserve * (p['central_bank.surplus_reserve_ir'] * days)
+
+        # Bank.process_interest
+        shortage: np.ndarray = a[_BANK, EntryId.RESERVES] + interest
+        self.__bank_borrow(np.where(shortage < 0.0, np.abs(shortage), 0.0))
+        self.__book_asset_at(_BANK, EntryId.RESERVES, interest)
+        self.__book_liability_at(_BANK, EntryId.EQUITY, interest)
+        self.__income = self.__income + np.where(interest > 0.0, interest, 0.0)
+        self.__costs = self.__costs - np.where(interest > 0.0, 0.0, interest)
+
+        negative: np.ndarray = interest < 0.0
+        self.__distribute_interest(np.where(negative, -interest, 0.0))
+        interest = np.where(negative, 0.0, interest)
+        self.__book_asset_at(_CENTRAL_BANK, EntryId.INTEREST, -interest)
+        self.__book_liability_at(_CENTRAL_BANK, EntryId.EQUITY, -interest)
+
+    def __process_client_savings(self, actor_cycle: int):
+        bank = self.simulator.economy.bank
+
+        if not bank.client_interaction_interval.period_complete(actor_cycle):
+            return
+
+        a, l, p = self.__assets, self.__liabilities, self.__parameters
+        interest_rate: np.ndarray = p['bank.savings_ir'] * bank.client_interaction_interval.days / Period.YEAR_DAYS
+
+        savings_target: np.ndarray = p['client.savings_rate'] \
+                                     * (a[_CLIENT, EntryId.DEPOSITS] + a[_CLIENT, EntryId.SAVINGS])
+        savings_transfer: np.ndarray = savings_target - a[_CLIENT, EntryId.SAVINGS]
+        self.__book_asset_at(_CLIENT, EntryId.SAVINGS, savings_transfer)
+        self.__book_asset_at(_CLIENT, EntryId.DEPOSITS, -savings_transfer)
+        self.__book_liability_at(_BANK, EntryId.SAVINGS, savings_transfer)
+        self.__book_liability_at(_BANK, EntryId.DEPOSITS, -savings_transfer)
+
+        interest: np.ndarray = l[_BANK, EntryId.SAVINGS] * interest_rate
+        self.__book_liability_at(_BANK, EntryId.SAVINGS, interest)
+        self.__book_liability_at(_BANK, EntryId.EQUITY, -interest)
+        self.__book_asset_at(_CLIENT, EntryId.SAVINGS, interest)
+        self.__book_liability_at(_CLIENT, EntryId.EQUITY, interest)
+        self.__costs = self.__costs + interest
+
+    def __process_income_and_spending(self, actor_cycle: int):
+        economy = self.simulator.economy
+        bank, client = economy.bank, economy.client
+
+        if not bank.client_interaction_interval.period_complete(actor_cycle):
+            return
+
+        a, l, p = self.__assets, self.__liabilities, self.__parameters
+        replications: int = self.replications
+        interest_rate: np.ndarray = p['bank.loan_ir'] * bank.client_interaction_interval.days / Period.YEAR_DAYS
+
+        # PrivateActor.pay_debt
+        self.__book_asset_at(_CLIENT, EntryId.UNRESOLVED_DEBT,
+                             a[_CLIENT, EntryId.UNRESOLVED_DEBT] * p['client.unresolved_debt_growth'])
+        self.__book_liability_at(_CLIENT, EntryId.UNRESOLVED_DEBT,
+                                 l[_CLIENT, EntryId.UNRESOLVED_DEBT] * p['client.unresolved_debt_growth'])
+
+        debt: np.ndarray = l[_CLIENT, EntryId.DEBT].copy()
+        full_interest: np.ndarray = debt * interest_rate
+        full_installment: np.ndarray = self.__full_installment
+
+        if client.defaulting_mode == DefaultingMode.PROBABILISTIC:
+            defaulting: np.ndarray = self.__random.random(replications) < p['client.defaulting_probability']
+            unresolved_debt: np.ndarray = np.where(defaulting,
+                                                   self.__random.uniform(p['client.defaulting_min'] * full_installment,
+                                                                         p['client.defaulting_max'] * full_installment),
+                                                   0.0)
+        elif client.defaulting_mode == DefaultingMode.FIXED:
+            unresolved_debt: np.ndarray = full_installment * p['client.fixed_defaulting_rate']
+        else:
+            unresolved_debt: np.ndarray = np.zeros(replications)
+
+        installment_paid: np.ndarray = self.__pay_bank(full_installment - unresolved_debt, EntryId.DEBT)
+        adjusted_interest: np.ndarray = (debt - (full_installment - installment_paid)) * interest_rate
+        interest_paid: np.ndarray = self.__pay_bank(adjusted_interest, EntryId.EQUITY)
+
+        self.__book_liability_at(_CLIENT, EntryId.DEBT, -unresolved_debt)
+        self.__book_liability_at(_CLIENT, EntryId.EQUITY, unresolved_debt)
+        unresolved_debt = unresolved_debt * p['client.defaults_bought_by_debt_collectors']
+        self.__book_asset_at(_CLIENT, EntryId.UNRESOLVED_DEBT, unresolved_debt)
+        self.__book_liability_at(_CLIENT, EntryId.UNRESOLVED_DEBT, unresolved_debt)
+
+        expected_income: np.ndarray = full_interest / p['bank.income_from_interest']
+        self.__income = interest_paid.copy()
+
+        # Bank.__book_installment
+        self.__client_installment = installment_paid
+        total: np.ndarray = a[_BANK, EntryId.LOANS] + a[_BANK, EntryId.MBS] - l[_BANK, EntryId.MBS_EQUITY]
+        loans_installment: np.ndarray = installment_paid * (a[_BANK, EntryId.LOANS] / total)
+        mbs_equity_installment: np.ndarray = installment_paid * (l[_BANK, EntryId.MBS_EQUITY] / total)
+        mbs_installment: np.ndarray = installment_paid + mbs_equity_installment - loans_installment
+        self.__book_asset_at(_BANK, EntryId.LOANS, -loans_installment)
+        self.__book_asset_at(_BANK, EntryId.MBS, -mbs_installment)
+        self.__book_liability_at(_BANK, EntryId.MBS_EQUITY, -mbs_equity_installment)
+        self.__book_liability_at(_BANK, EntryId.EQUITY, -installment_paid)
+
+        self.__borrow(adjusted_interest - interest_paid)
+
+        bank_costs: np.ndarray = expected_income - full_interest
+        profit: np.ndarray = self.__income + bank_costs - self.__costs
+
+        if bank.spending_mode == SpendingMode.FIXED:
+            spending: np.ndarray = p['bank.fixed_spending'].copy()
+        elif bank.spending_mode == SpendingMode.PROFIT:
+            spending: np.ndarray = np.maximum(0.0, profit * p['bank.profit_spending'])
+        elif bank.spending_mode == SpendingMode.EQUITY:
+            spending: np.ndarray = l[_BANK, EntryId.EQUITY] * p['bank.equity_spending']
+        else:
+            spending: np.ndarray = (l[_BANK, EntryId.EQUITY] + l[_BANK, EntryId.MBS_EQUITY]) \
+                                   * p['bank.capital_spending']
+            sell: np.ndarray = spending > l[_BANK, EntryId.EQUITY]
+            mbs_to_sell: np.ndarray = np.where(sell,
+                                               np.minimum(l[_BANK, EntryId.DEPOSITS] + l[_BANK, EntryId.SAVINGS],
+                                                          spending - l[_BANK, EntryId.EQUITY]), 0.0)
+            self.__pay_bank(mbs_to_sell, EntryId.EQUITY, mask=sell)
+            self.__book_liability_at(_BANK, EntryId.DEPOSITS, -mbs_to_sell)
+            self.__book_asset_at(_BANK, EntryId.MBS, -mbs_to_sell)
+            self.__book_liability_at(_BANK, EntryId.MBS_EQUITY, -mbs_to_sell)
+            self.__book_liability_at(_BANK, EntryId.EQUITY, mbs_to_sell)
+
+        spending = np.minimum(spending, np.maximum(0.0, profit - profit * p['bank.retain_profit_percentage']))
+
+        if bank.no_loss:
+            spending = np.where(profit - spending < 0.0, np.minimum(spending, profit), spending)
+
+        self.__costs = self.__costs + spending
+        spending = spending - bank_costs
+        self.__income = self.__income + self.__pay_bank(np.maximum(0.0, -spending), EntryId.EQUITY) + bank_costs
+
+        self.__book_liability_at(_BANK, EntryId.DEPOSITS, spending)
+        self.__book_asset_at(_CLIENT, EntryId.DEPOSITS, spending)
+        self.__book_liability_at(_BANK, EntryId.EQUITY, -spending)
+        self.__book_liability_at(_CLIENT, EntryId.EQUITY, spending)
+
+    # Private sector
+
+    def __borrow(self, amount: np.ndarray):
+        amount = np.maximum(amount, 0.0)
+        self.__borrowed_money = self.__borrowed_money + amount
+        self.__book_asset_at(_CLIENT, EntryId.DEPOSITS, amount)
+        self.__book_liability_at(_CLIENT, EntryId.DEBT, amount)
+        self.__add_installments(self.__client_installments, self.__client_head,
+                                self.simulator.economy.bank.loan_installments, amount)
+        self.__book_asset_at(_BANK, EntryId.LOANS, amount)
+        self.__book_liability_at(_BANK, EntryId.DEPOSITS, amount)
+
+    def __pay_bank(self, amount: np.ndarray, liability_id: int, borrow: Optional[np.ndarray] = None,
+                   mask: Optional[np.ndarray] = None) -> np.ndarray:
+        """See PrivateActor.__pay_bank. Replications outside the mask do not pay."""
+        a = self.__assets
+
+        pay_from_deposits: np.ndarray = np.minimum(amount, a[_CLIENT, EntryId.DEPOSITS])
+        pay_from_savings: np.ndarray = np.minimum(a[_CLIENT, EntryId.SAVINGS], amount - pay_from_deposits)
+        to_borrow: np.ndarray = np.maximum(amount - pay_from_deposits - pay_from_savings, 0.0)
+
+        if borrow is not None:
+            to_borrow = to_borrow * borrow
+
+        if mask is not None:
+            pay_from_deposits = np.where(mask, pay_from_deposits, 0.0)
+            pay_from_savings = np.where(mask, pay_from_savings, 0.0)
+            to_borrow = np.where(mask, to_borrow, 0.0)
+
+        self.__borrow(to_borrow)
+        pay_from_deposits = pay_from_deposits + to_borrow
+
+        self.__book_asset_at(_CLIENT, EntryId.DEPOSITS, -pay_from_deposits)
+        self.__book_asset_at(_CLIENT, EntryId.SAVINGS, -pay_from_savings)
+        self.__book_liability_at(_CLIENT, liability_id, -(pay_from_deposits + pay_from_savings))
+
+        self.__book_liability_at(_BANK, EntryId.DEPOSITS, -pay_from_deposits)
+        self.__book_liability_at(_BANK, EntryId.SAVINGS, -pay_from_savings)
+        self.__book_liability_at(_BANK, EntryId.EQUITY, pay_from_deposits + pay_from_savings)
+
+        return pay_from_deposits + pay_from_savings
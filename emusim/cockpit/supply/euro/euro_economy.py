@@ -1,21 +1,27 @@
+import os
+
 from decimal import *
+from typing import List, Optional
 
-from . import CentralBank, Bank, PrivateActor, BalanceEntries
-from emusim.cockpit.utilities.cycles import Period, Interval
+from . import EconomicActor, CheckLevel, CentralBank, Bank, PrivateActor, EntryId, BookingJournal, NumericMode, QEMode,\
+    HelicopterMode
+from emusim.cockpit.utilities.cycles import Period, Interval, EventCalendar
 
 
 class EuroEconomy():
 
     def __init__(self):
+        self.__numeric_mode: NumericMode = NumericMode.DECIMAL
+        self.__number = self.__numeric_mode.number
         self.__central_bank: CentralBank = CentralBank()
         PrivateActor(Bank(self.central_bank))
 
         self.cycle_length: Period = Period(1, Interval.DAY)
-        self.__growth_rate: Decimal = Decimal(0.014)
-        self.__inflation: Decimal = Decimal(0.019)
-        self.__mbs_growth: Decimal = Decimal(0.0)
-        self.__security_growth: Decimal = Decimal(0.0)
-        self.__lending_satisfaction_rate = Decimal(1.0)
+        self.__growth_rate: Decimal = self.__number(0.014)
+        self.__inflation: Decimal = self.__number(0.019)
+        self.__mbs_growth: Decimal = self.__number(0.0)
+        self.__security_growth: Decimal = self.__number(0.0)
+        self.__lending_satisfaction_rate = self.__number(1.0)
 
     @property
     def central_bank(self) -> CentralBank:
@@ -29,13 +35,31 @@ class EuroEconomy():
     def client(self) -> PrivateActor:
         return self.bank.client
 
+    @property
+    def actors(self) -> List[EconomicActor]:
+        return [self.central_bank, self.bank, self.client]
+
+    @property
+    def numeric_mode(self) -> NumericMode:
+        return self.__numeric_mode
+
+    @numeric_mode.setter
+    def numeric_mode(self, mode: NumericMode):
+        """Convert the parameters and all economic actors to another numeric mode."""
+        mode.convert_attributes(self)
+        self.__numeric_mode = mode
+        self.__number = mode.number
+
+        for actor in self.actors:
+            actor.numeric_mode = mode
+
     @property
     def growth_rate(self) -> Decimal:
         return self.__growth_rate
 
     @growth_rate.setter
     def growth_rate(self, rate: Decimal):
-        self.__growth_rate = Decimal(rate)
+        self.__growth_rate = self.__number(rate)
 
     @property
     def inflation(self) -> Decimal:
@@ -43,7 +67,7 @@ class EuroEconomy():
 
     @inflation.setter
     def inflation(self, percentage: Decimal):
-        self.__inflation = Decimal(percentage)
+        self.__inflation = self.__number(percentage)
 
     @property
     def mbs_growth(self) -> Decimal:
@@ -51,7 +75,7 @@ class EuroEconomy():
 
     @mbs_growth.setter
     def mbs_growth(self, percentage: Decimal):
-        self.__mbs_growth = Decimal(percentage)
+        self.__mbs_growth = self.__number(percentage)
 
     @property
     def security_growth(self) -> Decimal:
@@ -59,7 +83,7 @@ class EuroEconomy():
 
     @security_growth.setter
     def security_growth(self, percentage: Decimal):
-        self.__security_growth = Decimal(percentage)
+        self.__security_growth = self.__number(percentage)
 
     @property
     def lending_satisfaction_rate(self) -> Decimal:
@@ -67,7 +91,7 @@ class EuroEconomy():
 
     @lending_satisfaction_rate.setter
     def lending_satisfaction_rate(self, rate: Decimal):
-        self.__lending_satisfaction_rate = Decimal(rate)
+        self.__lending_satisfaction_rate = self.__number(rate)
 
     @property
     def client_interval_growth_rate(self) -> Decimal:
@@ -77,11 +101,81 @@ class EuroEconomy():
     def client_interval_inflation_rate(self) -> Decimal:
         return self.inflation * self.bank.client_interaction_interval.days / Period.YEAR_DAYS
 
+    def retain_history(self, states: int):
+        """Only retain the last states of the balance sheet history of all economic actors."""
+        self.central_bank.retain_history(states)
+        self.bank.retain_history(states)
+        self.client.retain_history(states)
+
+    def map_history(self, directory: str, tail: int = Period.MONTH_DAYS):
+        """Write the balance sheet history of all economic actors to memory mapped files in a directory."""
+        self.central_bank.map_history(os.path.join(directory, "central_bank.history"), tail)
+        self.bank.map_history(os.path.join(directory, "bank.history"), tail)
+        self.client.map_history(os.path.join(directory, "private_sector.history"), tail)
+
+    def use_journal(self, journal: Optional[BookingJournal]):
+        """Defer the bookings of all economic actors to a journal which is applied at the end of each cycle. None books
+        directly on the balance sheets again."""
+        self.central_bank.journal = journal
+        self.bank.journal = journal
+        self.client.journal = journal
+
+    def set_check_level(self, level: CheckLevel, interval: int = 1):
+        """Set how often the balance sheets of all economic actors are validated at the end of a cycle.
+
+        :param level the check level.
+        :param interval the number of cycles between validations for CheckLevel.SAMPLED."""
+        for actor in self.actors:
+            actor.check_level = level
+            actor.check_interval = max(1, interval)
+
+    def event_calendar(self) -> EventCalendar:
+        """:return the calendar of the cycles of the economic actors in which more happens than the growth of
+        securities and MBS."""
+        periods: List[Period] = [self.bank.client_interaction_interval, self.bank.reserves_interval,
+                                 self.central_bank.loan_interval, self.central_bank.reserve_interest_interval]
+
+        if self.bank.min_risk_assets > 0.0:
+            periods.append(self.bank.risk_assets_interval)
+
+        if self.central_bank.qe_mode != QEMode.NONE:
+            periods.append(self.central_bank.qe_interval)
+
+        if self.central_bank.helicopter_mode != HelicopterMode.NONE:
+            periods.append(self.central_bank.helicopter_interval)
+
+        return EventCalendar(periods)
+
+    def skip_cycles(self, cycle: int, cycles: int) -> int:
+        """Process cycles without events of the event calendar, in which only securities and MBS grow, in one step. The
+        growth over all cycles follows in closed form from the entries at the start, (1 + growth) ** n - 1, and the
+        balance sheets are checked and saved once. Their histories record the skipped cycles as a gap.
+
+        :param cycle the first cycle.
+        :param cycles the number of cycles.
+        :return the number of cycles after which all balance sheets validated. Less than cycles if the check after the
+        last cycle failed."""
+        self.start_transactions(cycle + cycles - 1)
+
+        for entry_id, growth in [(EntryId.SECURITIES, self.security_growth), (EntryId.MBS, self.mbs_growth)]:
+            if growth != 0.0:
+                factor: Decimal = (1 + growth) ** cycles - 1
+
+                for actor in self.actors:
+                    amount: Decimal = actor.asset_at(entry_id) * factor
+                    actor.book_asset_at(entry_id, amount)
+                    actor.book_liability_at(EntryId.equity_type(entry_id), amount)
+
+        if not self.end_transactions(cycles):
+            return cycles - 1
+
+        return cycles
+
     def start_transactions(self, cycle: int):
         self.central_bank.start_transactions(cycle)
 
-    def end_transactions(self) -> bool:
-        return self.central_bank.end_transactions()
+    def end_transactions(self, cycles: int = 1) -> bool:
+        return self.central_bank.end_transactions(cycles)
 
     def inflate(self):
         self.central_bank.inflate(self.client_interval_inflation_rate)
@@ -119,12 +213,12 @@ class EuroEconomy():
 
     @property
     def im(self) -> Decimal:
-        return self.bank.liability(BalanceEntries.DEPOSITS) + self.bank.liability(BalanceEntries.SAVINGS)
+        return self.bank.liability_at(EntryId.DEPOSITS) + self.bank.liability_at(EntryId.SAVINGS)
 
     @property
     def private_debt(self) -> Decimal:
-        return self.client.liability(BalanceEntries.DEBT)
+        return self.client.liability_at(EntryId.DEBT)
 
     @property
     def bank_debt(self) -> Decimal:
-        return self.bank.liability(BalanceEntries.DEBT)
+        return self.bank.liability_at(EntryId.DEBT)
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+from decimal import *
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple
+
+from .balance_entries import BalanceEntries
+
+if TYPE_CHECKING:
+    from . import EconomicActor
+
+
+class BookingJournal:
+    """Append-only journal of the bookings of one cycle. Economic actors using the journal do not book on their balance
+    sheets directly. Their reads add the pending amounts of the journal and commit() applies all pending amounts to the
+    balance sheets in one pass.
+
+    Records are (actor, entry, amount) with entry the id of an asset or BalanceEntries.COUNT + the id of a
+    liability. Amounts are booked, kept and summed as raw values of the actor's numeric mode, int units in FIXED mode
+    (see NumericMode.to_raw)."""
+
+    def __init__(self, sink: Optional[Callable[[BookingJournal], None]] = None):
+        """:param sink optional callable which receives the journal on every commit, before it is cleared. It can be
+        used to audit the records of a cycle."""
+        self.__sink = sink
+        self.__actors: List[EconomicActor] = []
+        self.__entries: List[int] = []
+        self.__amounts: List[Decimal] = []
+
+        # pending amount per actor, indexed by record entry. None for entries without bookings.
+        self.__pending: Dict[EconomicActor, List[Optional[Decimal]]] = {}
+
+    def __len__(self) -> int:
+        return len(self.__amounts)
+
+    @property
+    def records(self) -> List[Tuple[EconomicActor, int, Decimal]]:
+        """:return the records with the money amounts of the actors' numeric modes."""
+        return [(actor, entry, actor.numeric_mode.from_raw(value))
+                for actor, entry, value in zip(self.__actors, self.__entries, self.__amounts)]
+
+    def book_asset(self, actor: EconomicActor, entry_id: int, value: Decimal):
+        """Book a raw amount on an asset."""
+        self.__book(actor, entry_id, value)
+
+    def book_liability(self, actor: EconomicActor, entry_id: int, value: Decimal):
+        """Book a raw amount on a liability."""
+        self.__book(actor, BalanceEntries.COUNT + entry_id, value)
+
+    def pending_asset(self, actor: EconomicActor, entry_id: int) -> Optional[Decimal]:
+        """:return the raw amount booked on an asset since the last commit, None if nothing was booked."""
+        pending: Optional[List[Optional[Decimal]]] = self.__pending.get(actor)
+        return None if pending is None else pending[entry_id]
+
+    def pending_liability(self, actor: EconomicActor, entry_id: int) -> Optional[Decimal]:
+        """:return the raw amount booked on a liability since the last commit, None if nothing was booked."""
+        pending: Optional[List[Optional[Decimal]]] = self.__pending.get(actor)
+        return None if pending is None else pending[BalanceEntries.COUNT + entry_id]
+
+    def pending_assets_value(self, actor: EconomicActor) -> Decimal:
+        return self.__pending_value(actor, 0, BalanceEntries.COUNT)
+
+    def pending_liabilities_value(self, actor: EconomicActor) -> Decimal:
+        return self.__pending_value(actor, BalanceEntries.COUNT, 2 * BalanceEntries.COUNT)
+
+    def commit(self):
+        """Apply all pending amounts to the balance sheets of the actors and start a new journal."""
+        for actor, pending in self.__pending.items():
+            balance = actor.balance
+
+            for entry_id in range(BalanceEntries.COUNT):
+                if pending[entry_id] is not None:
+                    balance.book_raw_asset_at(entry_id, pending[entry_id])
+
+                if pending[BalanceEntries.COUNT + entry_id] is not None:
+                    balance.book_raw_liability_at(entry_id, pending[BalanceEntries.COUNT + entry_id])
+
+        if self.__sink is not None and len(self) > 0:
+            self.__sink(self)
+
+        self.clear()
+
+    def clear(self):
+        self.__actors.clear()
+        self.__entries.clear()
+        self.__amounts.clear()
+        self.__pending.clear()
+
+    def __book(self, actor: EconomicActor, entry: int, value: Decimal):
+        self.__actors.append(actor)
+        self.__entries.append(entry)
+        self.__amounts.append(value)
+
+        pending: Optional[List[Optional[Decimal]]] = self.__pending.get(actor)
+
+        if pending is None:
+            pending = [None] * (2 * BalanceEntries.COUNT)
+            self.__pending[actor] = pending
+
+        pending_value: Optional[Decimal] = pending[entry]
+        pending[entry] = value if pending_value is None else pending_value + value
+
+    def __pending_value(self, actor: EconomicActor, start: int, end: int) -> Decimal:
+        """:return the raw sum of the pending amounts of an actor in a range of record entries."""
+        total_value: Decimal = actor.numeric_mode.to_raw(actor.numeric_mode.money(0.0))
+        pending: Optional[List[Optional[Decimal]]] = self.__pending.get(actor)
+
+        if pending is not None:
+            for value in pending[start:end]:
+                if value is not None:
+                    total_value += value
+
+        return total_value
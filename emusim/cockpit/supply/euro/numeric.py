@@ -0,0 +1,300 @@
+from __future__ import annotations
+
+from decimal import *
+from enum import Enum
+from math import nan
+from typing import Any, Callable, Dict, List, Optional, Union
+
+
+class Fixed:
+    """Money amount stored as a whole number of units of 1 / SCALE euro (micro-euros), which fits a 64-bit integer for
+    amounts up to 9.2 trillion euros. Sums and differences of amounts are exact. Multiplications and divisions by
+    rates are rounded half to even to whole units, so results are deterministic. The quotient of two amounts is a
+    Decimal ratio."""
+
+    SCALE: int = 1000000
+
+    __slots__ = ('units',)
+
+    def __init__(self, value: Any = 0):
+        if isinstance(value, Fixed):
+            units: int = value.units
+        elif isinstance(value, int):
+            units: int = value * Fixed.SCALE
+        else:
+            units: int = _round(Decimal(value) * Fixed.SCALE)
+
+        self.units: int = units
+
+    @staticmethod
+    def from_units(units: int) -> Fixed:
+        fixed: Fixed = Fixed.__new__(Fixed)
+        fixed.units = units
+
+        return fixed
+
+    @property
+    def decimal(self) -> Decimal:
+        return Decimal(self.units).scaleb(-6)
+
+    def __add__(self, other: Any) -> Fixed:
+        if isinstance(other, Fixed):
+            return Fixed.from_units(self.units + other.units)
+        else:
+            return Fixed.from_units(self.units + Fixed(other).units)
+
+    __radd__ = __add__
+
+    def __sub__(self, other: Any) -> Fixed:
+        if isinstance(other, Fixed):
+            return Fixed.from_units(self.units - other.units)
+        else:
+            return Fixed.from_units(self.units - Fixed(other).units)
+
+    def __rsub__(self, other: Any) -> Fixed:
+        return Fixed.from_units(Fixed(other).units - self.units)
+
+    def __mul__(self, other: Any) -> Fixed:
+        if isinstance(other, int):
+            return Fixed.from_units(self.units * other)
+        elif isinstance(other, Fixed):
+            other = other.decimal
+
+        return Fixed.from_units(_round(self.units * other))
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other: Any) -> Union[Fixed, Decimal]:
+        if isinstance(other, Fixed):
+            return Decimal(self.units) / Decimal(other.units)
+        elif isinstance(other, float):
+            return Fixed.from_units(_round(self.units / other))
+        else:
+            return Fixed.from_units(_round(Decimal(self.units) / other))
+
+    def __rtruediv__(self, other: Any) -> Decimal:
+        return Decimal(other) / self.decimal
+
+    def __neg__(self) -> Fixed:
+        return Fixed.from_units(-self.units)
+
+    def __pos__(self) -> Fixed:
+        return self
+
+    def __abs__(self) -> Fixed:
+        return Fixed.from_units(abs(self.units))
+
+    def __round__(self, ndigits: Optional[int] = None) -> Union[Fixed, int]:
+        if ndigits is None:
+            return _round(self.decimal)
+        elif ndigits >= 6:
+            return self
+        else:
+            factor: int = 10 ** (6 - ndigits)
+            return Fixed.from_units(_round(Decimal(self.units) / factor) * factor)
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, Fixed):
+            return self.units == other.units
+        elif isinstance(other, (int, float, Decimal)):
+            return self.decimal == other
+        else:
+            return NotImplemented
+
+    def __lt__(self, other: Any) -> bool:
+        if isinstance(other, Fixed):
+            return self.units < other.units
+        else:
+            return self.decimal < other
+
+    def __le__(self, other: Any) -> bool:
+        if isinstance(other, Fixed):
+            return self.units <= other.units
+        else:
+            return self.decimal <= other
+
+    def __gt__(self, other: Any) -> bool:
+        if isinstance(other, Fixed):
+            return self.units > other.units
+        else:
+            return self.decimal > other
+
+    def __ge__(self, other: Any) -> bool:
+        if isinstance(other, Fixed):
+            return self.units >= other.units
+        else:
+            return self.decimal >= other
+
+    def __hash__(self) -> int:
+        return hash(self.decimal)
+
+    # amounts are immutable, so copies can share them
+    def __copy__(self) -> Fixed:
+        return self
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> Fixed:
+        return self
+
+    def __bool__(self) -> bool:
+        return self.units != 0
+
+    def __float__(self) -> float:
+        return self.units / Fixed.SCALE
+
+    def __int__(self) -> int:
+        return int(self.decimal)
+
+    def __format__(self, format_spec: str) -> str:
+        return format(self.decimal, format_spec)
+
+    def __str__(self) -> str:
+        return str(self.decimal)
+
+    def __repr__(self) -> str:
+        return "Fixed('" + str(self.decimal) + "')"
+
+
+Number = Union[Decimal, float, Fixed]
+
+
+class NumericMode(Enum):
+    DECIMAL = 0 # exact decimal arithmetic, for audit grade runs
+    FLOAT = 1 # float64 arithmetic, for fast exploratory runs
+    FIXED = 2 # money amounts as scaled integers (Fixed) and other numbers as Decimal, for exact balances
+
+    @property
+    def number(self) -> Callable[[Any], Number]:
+        """:return the type which needs to be used to construct numbers in this mode, like rates and percentages."""
+        return _NUMBER_TYPES[self]
+
+    @property
+    def money(self) -> Callable[[Any], Number]:
+        """:return the type which needs to be used to construct money amounts in this mode."""
+        return _MONEY_TYPES[self]
+
+    @property
+    def exact(self) -> bool:
+        """:return True if bookings of money amounts are exact and balance sheets can be compared for equality."""
+        return self == NumericMode.FIXED
+
+    @property
+    def typecode(self) -> str:
+        """:return the array typecode to store money amounts in this mode."""
+        return 'q' if self == NumericMode.FIXED else 'd'
+
+    @property
+    def raw_units(self) -> bool:
+        """:return True if money amounts are kept as int units (see Fixed) in balance sheet slots, journals and
+        installments, and only constructed as Fixed when they are read."""
+        return self == NumericMode.FIXED
+
+    def to_raw(self, amount: Optional[Number]) -> Optional[Union[Number, int]]:
+        """:return a money amount as it is kept in balance sheet slots, journals and installments: the int units in
+        FIXED mode, the amount itself in the other modes. None is returned unchanged."""
+        if self == NumericMode.FIXED and amount is not None:
+            return amount.units
+        else:
+            return amount
+
+    def from_raw(self, value: Optional[Union[Number, int]]) -> Optional[Number]:
+        """:return the money amount of a value returned by to_raw."""
+        if self == NumericMode.FIXED and value is not None:
+            return Fixed.from_units(value)
+        else:
+            return value
+
+    def to_storage(self, value: Optional[Union[Number, int]]) -> Union[float, int]:
+        """:return the value of a raw money amount, see to_raw, to store in an array of this mode's typecode. None for
+        missing entries is stored as NaN or, in FIXED mode, as the smallest 64-bit integer."""
+        if self == NumericMode.FIXED:
+            return FIXED_MISSING if value is None else value
+        else:
+            return nan if value is None else value
+
+    def from_storage(self, value: Union[float, int]) -> Optional[Number]:
+        """:return the money amount of a value stored by to_storage."""
+        if self == NumericMode.FIXED:
+            return None if value == FIXED_MISSING else Fixed.from_units(value)
+        else:
+            return self.money(value) if value == value else None # skip NaN
+
+    def convert(self, value: Any) -> Any:
+        """Convert a number, or a list of numbers, to this mode. Other values are returned unchanged.
+
+        :param value the value to convert.
+        :return the converted value."""
+        if isinstance(value, (Decimal, float, Fixed)):
+            return self.number(to_decimal(value) if isinstance(value, Fixed) else value)
+        elif isinstance(value, list):
+            return [self.convert(element) for element in value]
+        else:
+            return value
+
+    def convert_money(self, value: Any) -> Any:
+        """Convert a money amount, or a list of amounts, to this mode. Other values are returned unchanged."""
+        if isinstance(value, (Decimal, float, Fixed)):
+            return self.money(to_decimal(value) if isinstance(value, Fixed) else value)
+        elif isinstance(value, list):
+            return [self.convert_money(element) for element in value]
+        else:
+            return value
+
+    def convert_attributes(self, obj: Any):
+        """Convert all number attributes of an object to this mode. Integers and booleans are not converted. Money
+        amounts need to be converted with convert_money afterwards."""
+        attributes: Dict[str, Any] = vars(obj)
+
+        for name, value in attributes.items():
+            attributes[name] = self.convert(value)
+
+
+# value in FIXED mode storage of an entry which is not on the balance sheet
+FIXED_MISSING: int = -2 ** 63
+
+
+def to_decimal(value: Any) -> Decimal:
+    return value.decimal if isinstance(value, Fixed) else Decimal(value)
+
+
+def _round(value: Union[Decimal, float]) -> int:
+    """:return value rounded half to even to an integer."""
+    if isinstance(value, float):
+        return round(value)
+    else:
+        return int(value.to_integral_value(rounding=ROUND_HALF_EVEN))
+
+
+_NUMBER_TYPES: Dict[NumericMode, Callable[[Any], Number]] = {NumericMode.DECIMAL: Decimal,
+                                                             NumericMode.FLOAT: float,
+                                                             NumericMode.FIXED: to_decimal}
+_MONEY_TYPES: Dict[NumericMode, Callable[[Any], Number]] = {NumericMode.DECIMAL: Decimal,
+                                                            NumericMode.FLOAT: float,
+                                                            NumericMode.FIXED: Fixed}
+
+
+def max_divergence(reference: List[Number], series: List[Number]) -> Decimal:
+    """:return the maximum divergence between two series. The divergence is relative to the reference value, or
+    absolute when the reference value is 0. Infinite when only one of the values is not finite, or when the series have
+    a different length, as when one of the simulations stopped early."""
+    divergence: Decimal = Decimal(0.0)
+
+    if len(reference) != len(series):
+        return Decimal('Infinity')
+
+    for reference_value, value in zip(reference, series):
+        reference_value = to_decimal(reference_value)
+        value = to_decimal(value)
+
+        if value == reference_value:
+            continue
+        elif not value.is_finite() or not reference_value.is_finite():
+            return Decimal('Infinity')
+
+        difference: Decimal = abs(value - reference_value)
+
+        if reference_value != 0:
+            difference /= abs(reference_value)
+
+        divergence = max(divergence, difference)
+
+    return divergence
@@ -1,13 +1,13 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, List
+from typing import TYPE_CHECKING, List, Optional
 from enum import Enum
 
 from decimal import *
 from ordered_set import OrderedSet
 from random import random, uniform
 
-from . import EconomicActor, DebtPayment, BalanceEntries
+from . import EconomicActor, DebtPayment, BalanceEntries, EntryId, NumericMode
 
 if TYPE_CHECKING:
     from . import Bank
@@ -30,24 +30,24 @@ class PrivateActor(EconomicActor):
         self.__bank: Bank = bank
         self.__bank.client = self
 
-        self.__savings_rate: Decimal = Decimal(0.02)
+        self.__savings_rate: Decimal = self._number(0.02)
 
-        self.__borrow_for_securities: Decimal = Decimal(0.0)
+        self.__borrow_for_securities: Decimal = self._number(0.0)
 
         self.defaulting_mode: DefaultingMode = DefaultingMode.FIXED
-        self.__fixed_defaulting_rate: Decimal = Decimal(0.0)
-        self.__defaulting_probability: Decimal = Decimal(0.0)
-        self.__defaulting_min: Decimal = Decimal(0.0) # minimum defaulting percentage for probabilistic mode
-        self.__defaulting_max: Decimal = Decimal(0.0) # maximum defaulting percentage for probabilistic mode
+        self.__fixed_defaulting_rate: Decimal = self._number(0.0)
+        self.__defaulting_probability: Decimal = self._number(0.0)
+        self.__defaulting_min: Decimal = self._number(0.0) # minimum defaulting percentage for probabilistic mode
+        self.__defaulting_max: Decimal = self._number(0.0) # maximum defaulting percentage for probabilistic mode
 
-        self.__defaults_bought_by_debt_collectors: Decimal = Decimal(0.0) # In %
-        self.__unresolved_debt_growth: Decimal = Decimal(0.0) # Net growth of unresolved debt. Can be negative.
+        self.__defaults_bought_by_debt_collectors: Decimal = self._number(0.0) # In %
+        self.__unresolved_debt_growth: Decimal = self._number(0.0) # Net growth of unresolved debt. Can be negative.
 
-        self.__installments: List [Decimal] = [Decimal(0.0)]
+        self.__installments: List [Decimal] = [self._raw(self._money(0.0))] # raw values
 
         # Cycle attributes.
-        self.__installment: Decimal = Decimal(0.0)
-        self.__borrowed_money: Decimal = Decimal(0.0)
+        self.__installment: Decimal = self._money(0.0)
+        self.__borrowed_money: Decimal = self._money(0.0)
 
         # Cycle flags. Some operations can only be executed once per cycle.
 
@@ -65,7 +65,7 @@ class PrivateActor(EconomicActor):
 
     @savings_rate.setter
     def savings_rate(self, rate: Decimal):
-        self.__savings_rate = Decimal(rate)
+        self.__savings_rate = self._number(rate)
 
     @property
     def borrow_for_securities(self) -> Decimal:
@@ -73,7 +73,7 @@ class PrivateActor(EconomicActor):
 
     @borrow_for_securities.setter
     def borrow_for_securities(self, percentage: Decimal):
-        self.__borrow_for_securities = Decimal(percentage)
+        self.__borrow_for_securities = self._number(percentage)
 
     @property
     def fixed_defaulting_rate(self) -> Decimal:
@@ -81,7 +81,7 @@ class PrivateActor(EconomicActor):
 
     @fixed_defaulting_rate.setter
     def fixed_defaulting_rate(self, rate: Decimal):
-        self.__fixed_defaulting_rate = Decimal(rate)
+        self.__fixed_defaulting_rate = self._number(rate)
 
     @property
     def defaulting_probability(self) -> Decimal:
@@ -89,7 +89,7 @@ class PrivateActor(EconomicActor):
 
     @defaulting_probability.setter
     def defaulting_probability(self, probability: Decimal):
-        self.__defaulting_probability = Decimal(probability)
+        self.__defaulting_probability = self._number(probability)
 
     @property
     def defaulting_min(self) -> Decimal:
@@ -97,7 +97,7 @@ class PrivateActor(EconomicActor):
 
     @defaulting_min.setter
     def defaulting_min(self, minimum: Decimal):
-        self.__defaulting_min = Decimal(minimum)
+        self.__defaulting_min = self._number(minimum)
 
     @property
     def defaulting_max(self) -> Decimal:
@@ -105,7 +105,7 @@ class PrivateActor(EconomicActor):
 
     @defaulting_max.setter
     def defaulting_max(self, maximum: Decimal):
-        self.__defaulting_max = Decimal(maximum)
+        self.__defaulting_max = self._number(maximum)
 
     @property
     def defaults_bought_by_debt_collectors(self) -> Decimal:
@@ -113,7 +113,7 @@ class PrivateActor(EconomicActor):
 
     @defaults_bought_by_debt_collectors.setter
     def defaults_bought_by_debt_collectors(self, percentage: Decimal):
-        self.__defaults_bought_by_debt_collectors = Decimal(percentage)
+        self.__defaults_bought_by_debt_collectors = self._number(percentage)
 
     @property
     def unresolved_debt_growth(self) -> Decimal:
@@ -121,7 +121,12 @@ class PrivateActor(EconomicActor):
 
     @unresolved_debt_growth.setter
     def unresolved_debt_growth(self, percentage: Decimal):
-        self.__unresolved_debt_growth = Decimal(percentage)
+        self.__unresolved_debt_growth = self._number(percentage)
+
+    @property
+    def installments(self) -> List[Decimal]:
+        """:return the installments of the bank loans, starting with the next one."""
+        return [self._from_raw(installment) for installment in self.__installments]
 
     @property
     def installment(self) -> Decimal:
@@ -129,7 +134,7 @@ class PrivateActor(EconomicActor):
 
     @property
     def debt(self) -> Decimal:
-        return self.liability(BalanceEntries.DEBT)
+        return self.liability_at(EntryId.DEBT)
 
     @property
     def serviceable_debt(self) -> Decimal:
@@ -145,28 +150,28 @@ class PrivateActor(EconomicActor):
     def start_transactions(self, cycle):
         super().start_transactions(cycle)
 
-        self.__installment = Decimal(0.0)
-        self.__borrowed_money = Decimal(0.0)
+        self.__installment = self._money(0.0)
+        self.__borrowed_money = self._money(0.0)
 
         if self.bank.client_interaction_interval.period_complete(cycle) and len(self.__installments) > 0:
-                self.__installment = self.__installments.pop(0)
+                self.__installment = self._from_raw(self.__installments.pop(0))
 
     def process_savings(self):
-        total_dep_sav: Decimal = self.asset(BalanceEntries.DEPOSITS) + self.asset(BalanceEntries.SAVINGS)
+        total_dep_sav: Decimal = self.asset_at(EntryId.DEPOSITS) + self.asset_at(EntryId.SAVINGS)
         savings_target: Decimal = self.savings_rate * total_dep_sav
-        savings_transfer: Decimal = savings_target - self.asset(BalanceEntries.SAVINGS)
+        savings_transfer: Decimal = savings_target - self.asset_at(EntryId.SAVINGS)
 
-        self.book_asset(BalanceEntries.SAVINGS, savings_transfer)
-        self.book_asset(BalanceEntries.DEPOSITS, -savings_transfer)
+        self.book_asset_at(EntryId.SAVINGS, savings_transfer)
+        self.book_asset_at(EntryId.DEPOSITS, -savings_transfer)
         self.bank.book_savings(savings_transfer)
 
     def borrow(self, amount: Decimal):
         if amount > 0:
             self.__borrowed_money += amount
-            self.book_asset(BalanceEntries.DEPOSITS, amount)
-            self.book_liability(BalanceEntries.DEBT, amount)
+            self.book_asset_at(EntryId.DEPOSITS, amount)
+            self.book_liability_at(EntryId.DEBT, amount)
 
-            installment = amount/self.bank.loan_installments
+            installment = self._raw(amount/self.bank.loan_installments)
 
             for i in range(self.bank.loan_installments):
                 if len(self.__installments) < i + 1:
@@ -183,87 +188,99 @@ class PrivateActor(EconomicActor):
         :param debt_payment the debt payment object to record payments in."""
 
         # Deal with existing unresolved debt.
-        self.book_asset(BalanceEntries.UNRESOLVED_DEBT, self.asset(BalanceEntries.UNRESOLVED_DEBT) * self.unresolved_debt_growth)
-        self.book_liability(BalanceEntries.UNRESOLVED_DEBT, self.liability(BalanceEntries.UNRESOLVED_DEBT) * self.unresolved_debt_growth)
+        self.book_asset_at(EntryId.UNRESOLVED_DEBT, self.asset_at(EntryId.UNRESOLVED_DEBT) * self.unresolved_debt_growth)
+        self.book_liability_at(EntryId.UNRESOLVED_DEBT, self.liability_at(EntryId.UNRESOLVED_DEBT) * self.unresolved_debt_growth)
 
-        unresolved_debt: Decimal = Decimal(0.0)
+        unresolved_debt: Decimal = self._money(0.0)
         debt_payment.debt = self.debt
         debt_payment.full_installment = self.installment
 
         if self.defaulting_mode == DefaultingMode.PROBABILISTIC and random() < self.defaulting_probability:
-            unresolved_debt = Decimal(uniform(float(self.defaulting_min * self.installment),
+            unresolved_debt = self._money(uniform(float(self.defaulting_min * self.installment),
                                               float(self.defaulting_max * self.installment)))
         elif self.defaulting_mode == DefaultingMode.FIXED:
             unresolved_debt = debt_payment.full_installment * self.fixed_defaulting_rate
 
-        debt_payment.installment_paid = self.__pay_bank(self.installment - unresolved_debt, BalanceEntries.DEBT)
-        debt_payment.interest_paid = self.__pay_bank(debt_payment.adjusted_interest, BalanceEntries.EQUITY)
+        debt_payment.installment_paid = self.__pay_bank(self.installment - unresolved_debt, EntryId.DEBT)
+        debt_payment.interest_paid = self.__pay_bank(debt_payment.adjusted_interest, EntryId.EQUITY)
 
         # Defaults and liquidity shortages do not cancel debt but it won't be owed to the banks anymore.
         # Liquidity shortages are systemic defaults in the context of this simulation.
-        self.book_liability(BalanceEntries.DEBT, -unresolved_debt)
-        self.book_liability(BalanceEntries.EQUITY, unresolved_debt)
+        self.book_liability_at(EntryId.DEBT, -unresolved_debt)
+        self.book_liability_at(EntryId.EQUITY, unresolved_debt)
 
         # Unresolved debt can be bought from the banks by private debt collectors. The price which is paid for that
         # debt is included in the paid off debt since the remaining debt is usually bought at a discount.
         unresolved_debt *= self.defaults_bought_by_debt_collectors
-        self.book_asset(BalanceEntries.UNRESOLVED_DEBT, unresolved_debt)
-        self.book_liability(BalanceEntries.UNRESOLVED_DEBT, unresolved_debt)
+        self.book_asset_at(EntryId.UNRESOLVED_DEBT, unresolved_debt)
+        self.book_liability_at(EntryId.UNRESOLVED_DEBT, unresolved_debt)
 
     def pay_bank(self, amount: Decimal) -> Decimal:
-        return self.__pay_bank(amount, BalanceEntries.EQUITY)
+        return self.__pay_bank(amount, EntryId.EQUITY)
 
     def trade_securities_with_bank(self, amount: Decimal, security_type: str = BalanceEntries.SECURITIES) -> Decimal:
         """Attempt to trade the amount of securities, a positive amount indicating a sell, a negative amount
         indicating a buy. When buying, no more than the available deposits + savings can be used."""
 
+        security_id: int = BalanceEntries.IDS[security_type]
+
         # MBS can only be created by banks. Therefore no more MBS can be sold than those which are on the balance sheet.
-        if security_type == BalanceEntries.MBS:
-            amount = min(amount, self.asset(BalanceEntries.MBS))
+        if security_id == EntryId.MBS:
+            amount = min(amount, self.asset_at(EntryId.MBS))
 
         # check for availability of securities with bank
-        if amount < Decimal(0.0):
-            amount = -min(-amount, self.bank.asset(BalanceEntries.SECURITIES))
+        if amount < self._money(0.0):
+            amount = -min(-amount, self.bank.asset_at(EntryId.SECURITIES))
 
-        amount = -self.__pay_bank(-amount, BalanceEntries.EQUITY, self.__borrow_for_securities)
+        amount = -self.__pay_bank(-amount, EntryId.EQUITY, self.__borrow_for_securities)
         amount = self.bank.exchange_client_securities(amount, security_type)
 
         # when selling securities (not MBS), do not subtract more than what was on the balance sheet. The surplus is
         # 'created'. These actually represent securities which were 'hidden' from the books until now.
-        securities_delta: Decimal = min(self.asset(security_type), amount)
+        securities_delta: Decimal = min(self.asset_at(security_id), amount)
 
-        self.book_asset(security_type, -securities_delta)
-        self.book_liability(BalanceEntries.equity_type(security_type), -securities_delta)
+        self.book_asset_at(security_id, -securities_delta)
+        self.book_liability_at(EntryId.equity_type(security_id), -securities_delta)
 
         return amount
 
-    def __pay_bank(self, amount: Decimal, liability_name: str, borrow: Decimal = Decimal(1.0)) -> Decimal:
+    def __pay_bank(self, amount: Decimal, liability_id: int, borrow: Optional[Decimal] = None) -> Decimal:
         """Attempt to pay_bank an amount. Use savings if needed.
 
         :param amount the amount to pay_bank.
-        :param liability_name the name of the liability that needs to be diminished."""
+        :param liability_id the entry id of the liability that needs to be diminished.
+        :param borrow the fraction of the shortage that is borrowed. None borrows the full shortage."""
 
-        deposits: Decimal = self.asset(BalanceEntries.DEPOSITS)
-        savings: Decimal = self.asset(BalanceEntries.SAVINGS)
+        deposits: Decimal = self.asset_at(EntryId.DEPOSITS)
+        savings: Decimal = self.asset_at(EntryId.SAVINGS)
 
         pay_from_deposits: Decimal = min(amount, deposits)
         pay_from_savings: Decimal = min(savings, amount - pay_from_deposits)
 
         # borrowing can only happen when paying for securities
-        to_borrow: Decimal = max(amount - pay_from_deposits - pay_from_savings, Decimal(0.0)) * borrow
+        to_borrow: Decimal = max(amount - pay_from_deposits - pay_from_savings, self._money(0.0))
+
+        if borrow is not None:
+            to_borrow *= borrow
 
         self.borrow(to_borrow)
         pay_from_deposits += to_borrow
 
-        self.book_asset(BalanceEntries.DEPOSITS, -pay_from_deposits)
-        self.book_asset(BalanceEntries.SAVINGS, -pay_from_savings)
-        self.book_liability(liability_name, -(pay_from_deposits + pay_from_savings))
+        self.book_asset_at(EntryId.DEPOSITS, -pay_from_deposits)
+        self.book_asset_at(EntryId.SAVINGS, -pay_from_savings)
+        self.book_liability_at(liability_id, -(pay_from_deposits + pay_from_savings))
 
-        self.bank.pay_bank(pay_from_deposits, BalanceEntries.DEPOSITS)
-        self.bank.pay_bank(pay_from_savings, BalanceEntries.SAVINGS)
+        self.bank.pay_bank(pay_from_deposits, EntryId.DEPOSITS)
+        self.bank.pay_bank(pay_from_savings, EntryId.SAVINGS)
 
         return pay_from_deposits + pay_from_savings
 
+    def _convert_money(self, mode: NumericMode):
+        self.__installments = [mode.to_raw(mode.convert_money(self._from_raw(installment)))
+                               for installment in self.__installments]
+        self.__installment = mode.convert_money(self.__installment)
+        self.__borrowed_money = mode.convert_money(self.__borrowed_money)
+
     def clear(self):
         super().clear()
-        self.__installments = [Decimal(0.0)]
\ No newline at end of file
+        self.__installments = [self._raw(self._money(0.0))]
\ No newline at end of file
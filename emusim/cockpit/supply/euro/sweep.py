@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import os
+import random
+import traceback
+
+from collections import OrderedDict as OrdDict
+from concurrent.futures import Future, ProcessPoolExecutor, FIRST_COMPLETED, wait
+from decimal import *
+from time import perf_counter
+from typing import Any, Callable, Dict, Iterable, Iterator, KeysView, List, Optional, OrderedDict, Set
+
+from . import EuroEconomy, AggregateSimulator, SimpleDataGenerator
+from .. import SeriesInfo, export_series
+
+
+class Scenario:
+    """Definition of a simulation run of a sweep. Scenarios are sent to worker processes, so the setup needs to be a
+    module level function and the arguments need to be picklable."""
+
+    def __init__(self, name: str, cycles: int, setup: Callable[..., None], arguments: Optional[Dict[str, Any]] = None,
+                 seed: Optional[int] = None):
+        """:param name the name of the scenario.
+        :param cycles the number of cycles to simulate.
+        :param setup function which receives a new AggregateSimulator and the arguments. It sets the parameters, the
+        initial balance sheets and the data to collect.
+        :param arguments the keyword arguments of the setup.
+        :param seed the seed of the random module before the setup. None leaves the random module as it is, which
+        only reproduces runs without random draws."""
+        self.name: str = name
+        self.cycles: int = cycles
+        self.setup: Callable[..., None] = setup
+        self.arguments: Dict[str, Any] = arguments if arguments is not None else {}
+        self.seed: Optional[int] = seed
+
+
+class ScenarioResult:
+    """The data collected in the run of a scenario, with the same accessors as DataCollector."""
+
+    def __init__(self, name: str, data: OrderedDict[str, OrderedDict[str, List[Decimal]]], cycles: int,
+                 completed: bool, timed_out: bool = False, error: Optional[str] = None, time: float = 0.0,
+                 infos: Optional[Dict[str, Dict[str, SeriesInfo]]] = None):
+        self.__name: str = name
+        self.__data: OrderedDict[str, OrderedDict[str, List[Decimal]]] = data
+        self.__infos: Dict[str, Dict[str, SeriesInfo]] = infos if infos is not None else {}
+        self.__cycles: int = cycles
+        self.__completed: bool = completed
+        self.__timed_out: bool = timed_out
+        self.__error: Optional[str] = error
+        self.__time: float = time
+
+    @property
+    def name(self) -> str:
+        return self.__name
+
+    @property
+    def cycles(self) -> int:
+        """:return the number of cycles which were simulated."""
+        return self.__cycles
+
+    @property
+    def completed(self) -> bool:
+        """:return True if all cycles of the scenario were simulated. False if a cycle failed, the run timed out or
+        raised an error."""
+        return self.__completed
+
+    @property
+    def timed_out(self) -> bool:
+        return self.__timed_out
+
+    @property
+    def error(self) -> Optional[str]:
+        """:return the traceback of the error raised by the run. None if no error was raised."""
+        return self.__error
+
+    @property
+    def time(self) -> float:
+        """:return the wall time of the run in seconds."""
+        return self.__time
+
+    def get_categories(self) -> KeysView[str]:
+        return self.__data.keys()
+
+    def get_data_fields(self, category: str) -> KeysView[str]:
+        return self.__data[category].keys()
+
+    def get_data_series(self, category: str, data_field: str) -> List[Decimal]:
+        if category in self.__data and data_field in self.__data[category]:
+            return self.__data[category][data_field]
+        else:
+            return []
+
+    def series_info(self, category: str, data_field: str) -> SeriesInfo:
+        return self.__infos.get(category, {}).get(data_field, SeriesInfo())
+
+    def export(self, path: str):
+        """Write all series with their metadata to a binary file, as DataCollector.export."""
+        export_series(path, ((category, data_field, self.get_data_series(category, data_field),
+                              self.series_info(category, data_field))
+                             for category in self.get_categories() for data_field in self.get_data_fields(category)))
+
+
+def run_scenario(scenario: Scenario, timeout: Optional[float] = None) -> ScenarioResult:
+    """Run a scenario on a new economy. This is what the worker processes of a SweepRunner run, so a scenario run with
+    it in the current process has the same result.
+
+    :param scenario the scenario.
+    :param timeout the maximum wall time of the run in seconds.
+    :return the result of the run."""
+    start: float = perf_counter()
+
+    if scenario.seed is not None:
+        random.seed(scenario.seed)
+
+    economy: EuroEconomy = EuroEconomy()
+    simulator: AggregateSimulator = AggregateSimulator(economy, SimpleDataGenerator(economy))
+    error: Optional[str] = None
+
+    try:
+        scenario.setup(simulator, **scenario.arguments)
+
+        if timeout is not None:
+            simulator.timeout = timeout
+
+        simulator.run_simulation(scenario.cycles)
+    except Exception:
+        error = traceback.format_exc()
+
+    collector = simulator.collector
+    data: OrderedDict[str, OrderedDict[str, List[Decimal]]] = OrdDict()
+    infos: Dict[str, Dict[str, SeriesInfo]] = {}
+
+    for category in collector.get_categories():
+        data[category] = OrdDict((data_field, collector.get_data_series(category, data_field))
+                                 for data_field in collector.get_data_fields(category))
+        infos[category] = {data_field: simulator.series_info(category, data_field)
+                           for data_field in collector.get_data_fields(category)}
+
+    completed: bool = error is None and simulator.finished and not simulator.failed
+
+    return ScenarioResult(scenario.name, data, simulator.cycle, completed, simulator.timed_out, error,
+                          perf_counter() - start, infos)
+
+
+class SweepRunner:
+    """Run scenarios in a pool of worker processes, each on an economy of its own. Results are returned as the
+    scenarios finish, so they can be written out while the sweep continues."""
+
+    def __init__(self, workers: Optional[int] = None, max_pending: Optional[int] = None,
+                 timeout: Optional[float] = None):
+        """:param workers the number of worker processes. Defaults to the number of processors. 0 runs the scenarios
+        one after another in the current process.
+        :param max_pending the maximum number of scenarios submitted to the pool of which the result was not returned
+        yet, which bounds the memory of the sweep. Defaults to twice the number of workers.
+        :param timeout the maximum wall time of a scenario in seconds. None for no limit."""
+        self.workers: Optional[int] = workers
+        self.max_pending: Optional[int] = max_pending
+        self.timeout: Optional[float] = timeout
+
+    def run(self, scenarios: Iterable[Scenario]) -> Iterator[ScenarioResult]:
+        """Run the scenarios. They are only taken from the iterable when there is room for them.
+
+        :param scenarios the scenarios to run.
+        :return the results in the order in which the scenarios finish."""
+        if self.workers == 0:
+            for scenario in scenarios:
+                yield run_scenario(scenario, self.timeout)
+
+            return
+
+        workers: int = self.workers if self.workers is not None else os.cpu_count() or 1
+        max_pending: int = max(1, self.max_pending if self.max_pending is not None else 2 * workers)
+
+        with ProcessPoolExecutor(workers) as executor:
+            pending: Set[Future] = set()
+            scenarios = iter(scenarios)
+            exhausted: bool = False
+
+            while True:
+                while not exhausted and len(pending) < max_pending:
+                    scenario: Optional[Scenario] = next(scenarios, None)
+
+                    if scenario is None:
+                        exhausted = True
+                    else:
+                        pending.add(executor.submit(run_scenario, scenario, self.timeout))
+
+                if len(pending) == 0:
+                    break
+
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    yield future.result()
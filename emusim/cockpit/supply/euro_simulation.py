@@ -3,6 +3,8 @@
 
 import os
 
+import numpy as np
+
 from emusim.cockpit.supply.constants import *
 from emusim.cockpit.supply.simulation import Simulation
 
@@ -708,18 +710,12 @@ class Euro_MS_Simulation(Simulation):
 
 
     def get_total_inflow(self, do_deflate=False):
-        inflow = []
-
-        for i in range(len(self.savings_interest)):
-            if i != 0:  # remove setup step
-                total_inflow = self.savings_interest[i] + self.qe_trickle[i] + self.asset_trickle[i]
-
-                if do_deflate:
-                    inflow.append(round(self.deflate(total_inflow, i), 2))
-                else:
-                    inflow.append(round(total_inflow, 2))
+        cycles = len(self.savings_interest)
+        total_inflow = np.asarray(self.savings_interest, dtype=float) \
+            + np.asarray(self.qe_trickle[0:cycles], dtype=float) + np.asarray(self.asset_trickle[0:cycles], dtype=float)
 
-        return inflow
+        # remove setup step
+        return self.get_data(total_inflow, 1, cycles, do_deflate)
 
 
     def write_parameters(self):
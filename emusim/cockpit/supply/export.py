@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import json
+import zipfile
+
+from collections import OrderedDict as OrdDict
+from typing import Any, Dict, Iterable, List, KeysView, Optional, OrderedDict, Tuple
+
+import numpy as np
+
+from emusim.cockpit.utilities.cycles import Period
+
+# Name of the entry of an export which holds the metadata of the series
+METADATA: str = "metadata"
+
+# Units of exported series
+CYCLES: str = "cycles"
+EUROS: str = "EUR"
+SECONDS: str = "s"
+
+
+class SeriesInfo:
+    """Metadata of a collected series."""
+
+    __slots__ = ('unit', 'percentage', 'deflated')
+
+    def __init__(self, unit: str = "", percentage: bool = False, deflated: bool = False):
+        """:param unit the unit of the values, like EUROS or CYCLES. Empty for ratios and other numbers.
+        :param percentage whether the values are fractions which are shown as percentages.
+        :param deflated whether the values are deflated by the collected inflation."""
+        self.unit: str = unit
+        self.percentage: bool = percentage
+        self.deflated: bool = deflated
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'unit': self.unit, 'percentage': self.percentage, 'deflated': self.deflated}
+
+    @staticmethod
+    def from_dict(info: Dict[str, Any]) -> SeriesInfo:
+        return SeriesInfo(info['unit'], info['percentage'], info['deflated'])
+
+
+def export_series(path: str, series: Iterable[Tuple[str, str, Any, SeriesInfo]]):
+    """Write series to an uncompressed .npz file, one float64 array per series, with the metadata of all series as a
+    JSON string. Series of Decimals are converted to floats. The arrays are stored as they are, so ExportedData can
+    map a single series to memory.
+
+    :param path the path of the file. The extension .npz is added if it is missing.
+    :param series the category, the data field, the values and the metadata of every series."""
+    arrays: Dict[str, np.ndarray] = OrdDict()
+    metadata: List[Dict[str, Any]] = []
+
+    for category, data_field, values, info in series:
+        key: str = "series_" + str(len(metadata))
+        arrays[key] = np.asarray(values, dtype=float)
+        metadata.append(dict(category=category, data_field=data_field, key=key, **info.to_dict()))
+
+    arrays[METADATA] = np.array(json.dumps(metadata))
+    np.savez(path, **arrays)
+
+
+class ExportedData:
+    """Series read from a file written by export_series, with the same accessors as DataCollector. Only the metadata is
+    read when the file is opened. Series are read, or mapped to memory, when they are accessed."""
+
+    def __init__(self, path: str):
+        self.__path: str = path
+        self.__keys: OrderedDict[str, OrderedDict[str, str]] = OrdDict()
+        self.__infos: Dict[str, SeriesInfo] = {}
+
+        with np.load(path) as data:
+            for series in json.loads(str(data[METADATA])):
+                self.__keys.setdefault(series['category'], OrdDict())[series['data_field']] = series['key']
+                self.__infos[series['key']] = SeriesInfo.from_dict(series)
+
+    @property
+    def path(self) -> str:
+        return self.__path
+
+    def get_categories(self) -> KeysView[str]:
+        return self.__keys.keys()
+
+    def get_data_fields(self, category: str) -> KeysView[str]:
+        return self.__keys[category].keys()
+
+    def info(self, category: str, data_field: str) -> SeriesInfo:
+        return self.__infos[self.__keys[category][data_field]]
+
+    def get_data_series(self, category: str, data_field: str, mmap: bool = False,
+                        percentages: bool = False, cycle_period: Optional[Period] = None) -> np.ndarray:
+        """:param category the category of the series.
+        :param data_field the data field of the series.
+        :param mmap map the series to memory instead of reading it. Transformed series are computed in memory.
+        :param percentages multiply fractions which are shown as percentages by 100.
+        :param cycle_period express cycle counts in this period, like months, instead of cycles.
+        :return the values of the series, empty if it was not exported."""
+        if category not in self.__keys or data_field not in self.__keys[category]:
+            return np.empty(0)
+
+        key: str = self.__keys[category][data_field]
+        info: SeriesInfo = self.__infos[key]
+        values: np.ndarray = self.__map(key)
+
+        if not mmap:
+            values = np.array(values)
+
+        if percentages and info.percentage:
+            values = values * 100
+
+        if cycle_period is not None and info.unit == CYCLES:
+            values = values / cycle_period.days
+
+        return values
+
+    def __map(self, key: str) -> np.ndarray:
+        # the entries of the zip file are stored uncompressed, so the array starts after the headers
+        with zipfile.ZipFile(self.__path) as archive:
+            offset: int = archive.getinfo(key + ".npy").header_offset
+
+        with open(self.__path, 'rb') as file:
+            file.seek(offset)
+            local_header: bytes = file.read(30)
+            file.seek(offset + 30 + int.from_bytes(local_header[26:28], 'little')
+                      + int.from_bytes(local_header[28:30], 'little'))
+
+            if np.lib.format.read_magic(file) == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(file)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(file)
+
+            offset = file.tell()
+
+        if shape[0] == 0:
+            return np.empty(0, dtype=dtype)
+
+        return np.memmap(self.__path, dtype=dtype, mode='r', offset=offset, shape=shape)
@@ -0,0 +1,81 @@
+from collections import OrderedDict as OrdDict
+from time import perf_counter
+from typing import Any, Callable, KeysView, List, OrderedDict, Tuple
+
+# Profile category, with a data field per phase holding its cumulative wall time in seconds
+PROFILE: str = "Profile"
+
+
+class Profiler:
+    """Cumulative wall time and call count per phase of a simulation. A phase is a method of an object, which is
+    wrapped with a timer while the profiler is attached. Detached, the methods run unchanged, so a simulation which is
+    not profiled has no overhead."""
+
+    def __init__(self):
+        self.__times: OrderedDict[str, float] = OrdDict()
+        self.__calls: OrderedDict[str, int] = OrdDict()
+        self.__attached: List[Tuple[Any, str]] = []
+
+    @property
+    def phases(self) -> KeysView[str]:
+        return self.__times.keys()
+
+    @property
+    def attached(self) -> bool:
+        return len(self.__attached) > 0
+
+    def time(self, phase: str) -> float:
+        """:return the cumulative wall time of a phase in seconds."""
+        return self.__times.get(phase, 0.0)
+
+    def calls(self, phase: str) -> int:
+        return self.__calls.get(phase, 0)
+
+    def attach(self, obj: Any, method_name: str, phase: str = None):
+        """Time all calls of a method of an object until detach is called.
+
+        :param obj the object of which the method is timed.
+        :param method_name the name of the method.
+        :param phase the name of the phase. Defaults to the name of the method."""
+        phase = method_name if phase is None else phase
+        method: Callable = getattr(obj, method_name)
+        times: OrderedDict[str, float] = self.__times
+        calls: OrderedDict[str, int] = self.__calls
+
+        times.setdefault(phase, 0.0)
+        calls.setdefault(phase, 0)
+
+        def timed(*args, **kwargs):
+            start: float = perf_counter()
+
+            try:
+                return method(*args, **kwargs)
+            finally:
+                times[phase] += perf_counter() - start
+                calls[phase] += 1
+
+        # the instance attribute hides the method of the class until it is deleted
+        setattr(obj, method_name, timed)
+        self.__attached.append((obj, method_name))
+
+    def detach(self):
+        """Stop timing all methods. The recorded times are kept."""
+        for obj, method_name in reversed(self.__attached):
+            delattr(obj, method_name)
+
+        self.__attached.clear()
+
+    def clear(self):
+        self.__times.clear()
+        self.__calls.clear()
+
+    def summary(self) -> str:
+        """:return a table with the cumulative time, the number of calls and the time per call of every phase."""
+        string: str = "{:<36}{:>12}{:>12}{:>14}\n".format("Phase", "Time (s)", "Calls", "Per call (us)")
+
+        for phase, time in self.__times.items():
+            calls: int = self.__calls[phase]
+            string += "{:<36}{:>12.4f}{:>12}{:>14.1f}\n".format(phase, time, calls,
+                                                               time / calls * 1000000 if calls > 0 else 0.0)
+
+        return string
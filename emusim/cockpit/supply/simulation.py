@@ -1,5 +1,91 @@
 # module simulation
 
+import numpy as np
+
+
+# list of rates which records the first index written since it was last read, so the values derived from the rates are
+# only built again from there
+class RateSeries(list):
+
+    def __init__(self, rates=()):
+        super().__init__(rates)
+        self.first_written = 0
+
+
+    def read_written(self):
+        first_written = self.first_written
+        self.first_written = None
+
+        return first_written
+
+
+    def __written(self, index):
+        if self.first_written is None or index < self.first_written:
+            self.first_written = index
+
+
+    def __setitem__(self, index, value):
+        self.__written(self.__first_index(index))
+        super().__setitem__(index, value)
+
+
+    def __delitem__(self, index):
+        self.__written(self.__first_index(index))
+        super().__delitem__(index)
+
+
+    def __iadd__(self, rates):
+        self.__written(len(self))
+        return super().__iadd__(rates)
+
+
+    def append(self, rate):
+        self.__written(len(self))
+        super().append(rate)
+
+
+    def extend(self, rates):
+        self.__written(len(self))
+        super().extend(rates)
+
+
+    def insert(self, index, rate):
+        self.__written(self.__first_index(index))
+        super().insert(index, rate)
+
+
+    def pop(self, index=-1):
+        self.__written(self.__first_index(index))
+        return super().pop(index)
+
+
+    def remove(self, rate):
+        self.__written(self.index(rate))
+        super().remove(rate)
+
+
+    def clear(self):
+        super().clear()
+        self.__written(0)
+
+
+    def sort(self, *args, **kwargs):
+        super().sort(*args, **kwargs)
+        self.__written(0)
+
+
+    def reverse(self):
+        super().reverse()
+        self.__written(0)
+
+
+    def __first_index(self, index):
+        if isinstance(index, slice):
+            return index.indices(len(self))[0] if index.step is None or index.step > 0 else 0
+
+        return min(max(0, index + len(self) if index < 0 else index), len(self))
+
+
 class Simulation:
 
     def __init__(self):
@@ -7,6 +93,18 @@ class Simulation:
         self.cycles_executed = 0
         self.initial_inflation_rate = 0.019  # initial_inflation_rate
         self.inflation_rate = []  # real inflation rate
+        self.deflators = None  # cumulative deflator per cycle, built from inflation_rate
+
+
+    # the inflation rates record where they were written, so the deflators are built again from there
+    @property
+    def inflation_rate(self):
+        return self.__inflation_rate
+
+
+    @inflation_rate.setter
+    def inflation_rate(self, rates):
+        self.__inflation_rate = RateSeries(rates)
 
 
     def initialize(self):
@@ -14,43 +112,45 @@ class Simulation:
         self.inflation_rate.append(self.initial_inflation_rate)
 
 
-    def get_data(self, data, start, stop, do_deflate=False):
-        processed_data = []
+    # deflators[cycle] is the product of 1 + inflation_rate[i] for i < cycle
+    def get_deflators(self):
+        first_written = self.inflation_rate.read_written()
 
-        for cycle in range(start, stop):
-            if do_deflate:
-                processed_data.append(round(self.deflate(data[cycle], cycle), 2))
-            else:
-                processed_data.append(round(data[cycle], 2))
+        if first_written is not None:
+            # the deflators up to first_written do not depend on the written rates
+            rates = np.asarray(self.inflation_rate[first_written:], dtype=float)
+            start = self.deflators[first_written] if first_written > 0 else 1.0
+            self.deflators = np.concatenate((self.deflators[:first_written] if first_written > 0 else [],
+                                             np.cumprod(np.concatenate(([start], 1 + rates)))))
 
-        return processed_data
+        return self.deflators
 
-    def get_percentages(self, data, start, stop):
-        percentages = []
 
-        for cycle in range(start, stop):
-            percentages.append(round(data[cycle] * 100, 2))
+    def deflate_series(self, data, start, stop):
+        return np.asarray(data[start:stop], dtype=float) / self.get_deflators()[start:stop]
+
 
-        return percentages
+    def get_data(self, data, start, stop, do_deflate=False):
+        if do_deflate:
+            processed_data = self.deflate_series(data, start, stop)
+        else:
+            processed_data = np.asarray(data[start:stop], dtype=float)
+
+        return np.round(processed_data, 2).tolist()
+
+    def get_percentages(self, data, start, stop):
+        return np.round(np.asarray(data[start:stop], dtype=float) * 100, 2).tolist()
 
 
     # only call after initial_inflation_rate has been applied in a cycle
     def deflate(self, num, cycle):
-        for i in range(cycle):
-            num /= 1 + self.inflation_rate[i]
-
-        return num
+        return num / float(self.get_deflators()[cycle])
 
 
     def get_growth(self, raw_data, do_deflate):
-        growth = []
-
-        for cycle in range(len(raw_data) - 1):
-            if cycle != 0:
-                if do_deflate:
-                    growth.append(round(self.deflate(raw_data[cycle], cycle)
-                                        - self.deflate(raw_data[cycle - 1], cycle - 1), 2))
-                else:
-                    growth.append(round(raw_data[cycle] - raw_data[cycle - 1], 2))
+        if do_deflate:
+            values = self.deflate_series(raw_data, 0, len(raw_data) - 1)
+        else:
+            values = np.asarray(raw_data[0:len(raw_data) - 1], dtype=float)
 
-        return growth
\ No newline at end of file
+        return np.round(np.diff(values), 2).tolist()
@@ -1,7 +1,20 @@
+from __future__ import annotations
+
+import os
+import pickle
+import random
+import zlib
+
 from abc import ABC, abstractmethod
+from collections import OrderedDict as OrdDict
+from contextlib import contextmanager
+from copy import deepcopy
 from decimal import *
+from functools import partial
+from time import perf_counter
+from typing import Any, Callable, Iterator, List, Optional, Tuple
 
-from emusim.cockpit.supply import DataCollector, DataGenerator
+from emusim.cockpit.supply import DataCollector, DataGenerator, Profiler, CycleRecord, SeriesInfo
 from emusim.cockpit.utilities.cycles import Period, Interval
 
 
@@ -11,6 +24,25 @@ class Simulator(ABC):
         self.collect_interval: Period = Period(1, Interval.DAY)
         self.__generator: DataGenerator = generator
         self.__collector = DataCollector(self)
+
+        # Time the phases of each run. run_simulation prints a summary afterwards. See _profiled_phases.
+        self.profiling: bool = False
+        self.__profiler: Profiler = Profiler()
+
+        # Save a checkpoint to checkpoint_path every checkpoint_interval cycles. 0 disables checkpoints.
+        self.checkpoint_interval: int = 0
+        self.checkpoint_path: Optional[str] = None
+
+        # Maximum wall time in seconds of run_simulation or resume_simulation. A run which times out can be resumed.
+        self.timeout: Optional[float] = None
+
+        # position in the current run, kept so a run can be resumed from a checkpoint
+        self.__cycle: int = 0
+        self.__cycles: int = 0
+        self.__success: bool = True
+        self.__converged: bool = False
+        self.__timed_out: bool = False
+
         self._initialize_data_structure()
 
     @property
@@ -25,6 +57,41 @@ class Simulator(ABC):
     def collector(self, collector: DataCollector):
         self.__collector = collector
 
+    @property
+    def profiler(self) -> Profiler:
+        """:return the profiler holding the phase times of the last run with profiling enabled."""
+        return self.__profiler
+
+    @property
+    def cycle(self) -> int:
+        """:return the next cycle of the current run."""
+        return self.__cycle
+
+    @property
+    def cycles(self) -> int:
+        """:return the number of cycles of the current run."""
+        return self.__cycles
+
+    @property
+    def finished(self) -> bool:
+        """:return True if the current run completed all its cycles, stopped on a failed cycle or converged."""
+        return not self.__success or self.__converged or self.__cycle >= self.__cycles
+
+    @property
+    def converged(self) -> bool:
+        """:return True if the current run stopped early because it reached a steady state. See _converged."""
+        return self.__converged
+
+    @property
+    def timed_out(self) -> bool:
+        """:return True if the last run_simulation or resume_simulation stopped after timeout seconds."""
+        return self.__timed_out
+
+    @property
+    def failed(self) -> bool:
+        """:return True if the current run stopped on a failed cycle."""
+        return not self.__success
+
     @abstractmethod
     def _initialize_data_structure(self):
         """Initialize the data structure with flags on what data needs to be collected.
@@ -35,21 +102,236 @@ class Simulator(ABC):
     def data(self, category: str, data_field: str) -> Decimal:
         pass
 
+    def series_info(self, category: str, data_field: str) -> SeriesInfo:
+        """:return the metadata of the series of a field, for exports. Subclasses can override it to give the units."""
+        return SeriesInfo()
+
+    def data_getter(self, category: str, data_field: str) -> Callable[[], Decimal]:
+        """:return a function which returns the current data of a field, as data does. The collector calls it for
+        every collection of a run, so subclasses can override it to resolve the field once."""
+        return partial(self.data, category, data_field)
+
+    def collection_step(self, category: str, data_field: str) -> Optional[Callable[[Decimal], None]]:
+        """:return a function which the collector calls with the value of a field each time it collects the field,
+        after adding the value and before collecting the next fields. None if the field needs no step. Subclasses can
+        override it to update state which depends on the collected values, so the getters stay free of side effects."""
+        return None
+
     @abstractmethod
     def process_cycle(self, cycle: int) -> bool:
         pass
 
+    def _profiled_phases(self) -> List[Tuple[Any, str]]:
+        """:return the objects and the names of their methods which are timed when profiling. Subclasses can add the
+        phases of process_cycle."""
+        return [(self, 'process_cycle'), (self.collector, 'collect_data'), (self.generator, 'generate_next')]
+
+    def _next_event(self, cycle: int) -> int:
+        """:return the first cycle from cycle on which needs to be processed. The cycles before it are skipped with
+        _skip_cycles. By default every cycle is processed."""
+        return cycle
+
+    def _skip_cycles(self, cycle: int, cycles: int) -> int:
+        """Advance over cycles in which nothing but linear updates happen. Needs to be overridden by subclasses which
+        skip cycles.
+
+        :param cycle the first cycle to skip.
+        :param cycles the number of cycles to skip.
+        :return the number of cycles skipped successfully. If less than cycles, the next cycle failed."""
+        return 0
+
+    def _fork_state(self) -> List[Any]:
+        """Prepare the state of the simulation to be shared by forks. Needs to be overridden by subclasses which have
+        state that does not change anymore, like saved histories.
+
+        :return the objects which forks share instead of copying them."""
+        return []
+
+    def _converged(self) -> bool:
+        """Checked every time data is collected. Needs to be overridden by subclasses which detect steady states.
+
+        :return True if the run reached a steady state and can stop before all its cycles are processed."""
+        return False
+
     def run_simulation(self, cycles: int):
-        current_cycle: int = 0
-        success: bool = True
+        self._start_run(cycles)
+
+        for cycle, collected in self._simulate():
+            pass
+
+        if self.profiling:
+            print(self.profiler.summary())
+
+    def resume_simulation(self, cycles: Optional[int] = None):
+        """Continue the current run until all its cycles are processed. A simulator loaded from a checkpoint continues
+        where the checkpoint was saved.
+
+        :param cycles the total number of cycles of the run, to extend it. Defaults to the cycles it was started with."""
+        for cycle, collected in self._simulate(cycles):
+            pass
 
+    def stream(self, cycles: int, every_cycle: bool = False) -> Iterator[CycleRecord]:
+        """Start a run which advances as its records are consumed. Dropping the iterator stops the run, which can be
+        continued with resume_simulation or resume_stream. The data is collected as with run_simulation, so a
+        collector which retains a limited number of samples keeps the memory of long runs bounded.
+
+        :param cycles the number of cycles of the run.
+        :param every_cycle whether a record is yielded for every cycle or only for the cycles in which data was
+        collected.
+        :return the records of the cycles."""
+        self._start_run(cycles)
+
+        return self.resume_stream(every_cycle=every_cycle)
+
+    def resume_stream(self, cycles: Optional[int] = None, every_cycle: bool = False) -> Iterator[CycleRecord]:
+        """Continue the current run as a stream. See stream and resume_simulation."""
+        collector: DataCollector = self.collector
+
+        for cycle, collected in self._simulate(cycles):
+            if collected:
+                yield CycleRecord(cycle, OrdDict(((category, data_field),
+                                                  collector.get_data_series(category, data_field)[-1])
+                                                 for category in collector.get_categories()
+                                                 for data_field in collector.get_data_fields(category)))
+            elif every_cycle:
+                yield CycleRecord(cycle)
+
+    def _start_run(self, cycles: int):
+        """Reset the position and the collected data for a new run. Subclasses with state per run need to extend it."""
+        self.__cycle = 0
+        self.__cycles = cycles
+        self.__success = True
+        self.__converged = False
         self.collector.clear()
 
-        while success and current_cycle < cycles:
-            success = self.process_cycle(current_cycle)
+        # a sample on the first cycle and on every completed collect interval, and one on a failed cycle
+        self.collector.reserve(cycles // self.collect_interval.days + 2)
+
+    def _simulate(self, cycles: Optional[int] = None) -> Iterator[Tuple[int, bool]]:
+        """Continue the current run. Subclasses can extend it to prepare and complete runs.
+
+        :param cycles the total number of cycles of the run, to extend it.
+        :return for every cycle processed, the cycle and whether data was collected in it. Skipped cycles are not
+        returned."""
+        if cycles is not None:
+            self.__cycles = cycles
+
+        if not self.profiling:
+            yield from self.__run_simulation()
+            return
+
+        self.profiler.clear()
+
+        for obj, method_name in self._profiled_phases():
+            self.profiler.attach(obj, method_name)
+
+        try:
+            yield from self.__run_simulation()
+        finally:
+            self.profiler.detach()
+
+    def save_checkpoint(self, path: str):
+        """Save the full state of the simulation: the simulator with its generator and collected data, the position in
+        the current run and the state of the random and decimal modules. The checkpoint is written to a temporary file
+        first, so an interrupted save leaves the previous checkpoint intact.
+
+        :param path the file to save the checkpoint to."""
+        with self.__unprofiled():
+            data: bytes = pickle.dumps((self, random.getstate(), getcontext()), pickle.HIGHEST_PROTOCOL)
+
+        with open(path + '.tmp', 'wb') as file:
+            file.write(zlib.compress(data, 1))
+
+        os.replace(path + '.tmp', path)
+
+    @staticmethod
+    def load_checkpoint(path: str) -> Simulator:
+        """Load a simulator from a checkpoint and restore the state of the random and decimal modules. Its run is
+        continued with resume_simulation.
+
+        :param path the file the checkpoint was saved to.
+        :return the simulator."""
+        with open(path, 'rb') as file:
+            simulator, random_state, context = pickle.loads(zlib.decompress(file.read()))
+
+        random.setstate(random_state)
+        setcontext(context)
 
-            if current_cycle == 0 or self.collect_interval.period_complete(current_cycle) or not success:
+        return simulator
+
+    def fork(self, branches: int) -> List[Simulator]:
+        """Fork the simulation at the current cycle into branches, which continue independently with resume_simulation,
+        for instance after changing parameters. The state prepared by _fork_state is shared copy on write, so
+        branches only pay for the state in which they diverge. The simulator itself continues as one more branch.
+
+        :param branches the number of branches.
+        :return the simulators of the branches."""
+        with self.__unprofiled():
+            shared: List[Any] = self._fork_state()
+
+            return [deepcopy(self, {id(obj): obj for obj in shared}) for _ in range(branches)]
+
+    @contextmanager
+    def __unprofiled(self) -> Iterator[None]:
+        """Detach the profiler while the simulator is copied. The timing wrappers are closures bound to the original
+        objects, which can't be pickled."""
+        profiled: bool = self.profiler.attached
+
+        if profiled:
+            self.profiler.detach()
+
+        try:
+            yield
+        finally:
+            if profiled:
+                for obj, method_name in self._profiled_phases():
+                    self.profiler.attach(obj, method_name)
+
+    def __run_simulation(self) -> Iterator[Tuple[int, bool]]:
+        deadline: Optional[float] = perf_counter() + self.timeout if self.timeout is not None else None
+        self.__timed_out = False
+
+        while not self.finished:
+            if deadline is not None and perf_counter() > deadline:
+                self.__timed_out = True
+                break
+
+            cycle: int = self.__cycle
+            aggregating: bool = self.collector.aggregating
+
+            # aggregates need every cycle
+            idle_cycles: int = min(self._next_event(cycle), self.__cycles) - cycle if not aggregating else 0
+
+            if idle_cycles > 0:
+                skipped_cycles: int = self._skip_cycles(cycle, idle_cycles)
+                self.generator.generate_cycles(skipped_cycles)
+                cycle += skipped_cycles
+                self.__cycle = cycle
+
+                if skipped_cycles == idle_cycles:
+                    self.__save_due_checkpoint(cycle - skipped_cycles)
+                    continue
+
+                self.__success = False
+            else:
+                self.__success = self.process_cycle(cycle)
+
+            collected: bool = cycle == 0 or self.collect_interval.period_complete(cycle) or not self.__success
+
+            if collected:
                 self.collector.collect_data()
+                self.__converged = self.__success and self._converged()
+            elif aggregating:
+                self.collector.accumulate()
 
             self.generator.generate_next()
-            current_cycle += 1
\ No newline at end of file
+            self.__cycle = cycle + 1
+            self.__save_due_checkpoint(cycle)
+
+            yield cycle, collected
+
+    def __save_due_checkpoint(self, previous_cycle: int):
+        """Save a checkpoint if the run passed a multiple of checkpoint_interval since previous_cycle."""
+        if self.checkpoint_interval > 0 and not self.finished \
+                and self.__cycle // self.checkpoint_interval > previous_cycle // self.checkpoint_interval:
+            self.save_checkpoint(self.checkpoint_path)
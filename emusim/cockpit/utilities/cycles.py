@@ -1,4 +1,5 @@
 from enum import Enum
+from typing import List, Optional
 
 
 class Interval(Enum):
@@ -40,3 +41,22 @@ class Period:
 
     def period_complete(self, cycle: int) -> bool:
         return (cycle +1) % self.days == 0
+
+    def next_complete(self, cycle: int) -> int:
+        """:return the first cycle from cycle on in which the period is complete."""
+        return cycle + (-(cycle + 1)) % self.days
+
+
+class EventCalendar:
+    """The cycles in which at least one of a number of periods is complete."""
+
+    def __init__(self, periods: List[Period]):
+        self.__periods: List[Period] = list({period.days: period for period in periods}.values())
+
+    @property
+    def periods(self) -> List[Period]:
+        return self.__periods
+
+    def next_event(self, cycle: int) -> Optional[int]:
+        """:return the first cycle from cycle on in which one of the periods is complete. None without periods."""
+        return min((period.next_complete(cycle) for period in self.__periods), default=None)
@@ -1,6 +1,13 @@
+import pytest
+import struct
+
+from copy import deepcopy
 from decimal import *
-from emusim.cockpit.supply.euro import BalanceSheet, BalanceSheetTimeline
-from emusim.cockpit.supply.euro.balance_entries import BalanceEntries
+from typing import List
+
+from emusim.cockpit.supply.euro import BalanceSheet, BalanceSheetTimeline, ColumnarHistory, SparseHistory, RingHistory, \
+    MappedHistory, NumericMode, Fixed
+from emusim.cockpit.supply.euro.balance_entries import BalanceEntries, EntryId
 
 
 def test_entries():
@@ -56,3 +63,230 @@ def test_history():
     assert delta.asset(BalanceEntries.DEPOSITS) == Decimal(50.0)
     assert delta.asset(BalanceEntries.SECURITIES) == Decimal(50.0)
     assert delta.liability(BalanceEntries.EQUITY) == Decimal(100.0)
+
+
+def test_columnar_history():
+    balance: BalanceSheetTimeline = BalanceSheetTimeline(ColumnarHistory())
+
+    balance.book_asset(BalanceEntries.DEPOSITS, Decimal(100.0))
+    balance.book_liability(BalanceEntries.EQUITY, Decimal(100.0))
+    balance.save_state()
+
+    balance.book_asset(BalanceEntries.SECURITIES, Decimal(50.0))
+    balance.book_liability(BalanceEntries.EQUITY, Decimal(50.0))
+    balance.save_state()
+
+    assert len(balance.history) == 2
+    assert balance.asset_history(BalanceEntries.DEPOSITS, -2) == Decimal(100.0)
+    assert balance.asset_history(BalanceEntries.SECURITIES, -2) == Decimal(0.0)
+    assert BalanceEntries.SECURITIES not in balance.balance_history(-2).assets
+    assert balance.asset_history(BalanceEntries.SECURITIES, -1) == Decimal(50.0)
+    assert balance.liability_history(BalanceEntries.EQUITY, -1) == Decimal(150.0)
+
+    delta: BalanceSheet = balance.delta_history(-2)
+
+    assert delta.asset(BalanceEntries.SECURITIES) == Decimal(50.0)
+    assert delta.liability(BalanceEntries.EQUITY) == Decimal(50.0)
+
+
+def test_columnar_history_exact():
+    # a repeating fraction, a float with 55 digits, an amount with trailing zeros and one with a large exponent
+    for amount in [Decimal(1) / Decimal(3), Decimal(0.03), Decimal('-1.2500E+12'), Decimal(0.03) * Decimal(10) ** 40]:
+        balance: BalanceSheetTimeline = BalanceSheetTimeline(ColumnarHistory())
+
+        balance.book_asset(BalanceEntries.DEPOSITS, amount)
+        balance.book_liability(BalanceEntries.EQUITY, amount)
+        balance.save_state()
+
+        assert str(balance.asset_history(BalanceEntries.DEPOSITS, -1)) == str(amount)
+        assert balance.balance_history(-1).liability(BalanceEntries.EQUITY) == amount
+
+
+def test_skipped_history():
+    for history in [ColumnarHistory(), SparseHistory(keyframe_interval=4)]:
+        balance: BalanceSheetTimeline = BalanceSheetTimeline(history)
+
+        balance.book_asset(BalanceEntries.DEPOSITS, Decimal(100.0))
+        balance.book_liability(BalanceEntries.EQUITY, Decimal(100.0))
+        balance.save_state()
+        balance.book_asset(BalanceEntries.SECURITIES, Decimal(10.0))
+        balance.book_liability(BalanceEntries.EQUITY, Decimal(10.0))
+        balance.save_state(cycles=6)
+
+        # the skipped cycles read as the state after the skip
+        assert len(history) == 7
+        assert balance.asset_history(BalanceEntries.SECURITIES, 7) == Decimal(0.0)
+        assert balance.asset_history(BalanceEntries.SECURITIES, 6) == Decimal(10.0)
+        assert balance.asset_history(BalanceEntries.SECURITIES, 1) == Decimal(10.0)
+        assert balance.liability_history(BalanceEntries.EQUITY, 1) == Decimal(110.0)
+
+
+def test_indexed_entries():
+    balance_sheet: BalanceSheet = BalanceSheet()
+
+    balance_sheet.book_asset_at(EntryId.RESERVES, Decimal(100.0))
+    balance_sheet.book_asset(BalanceEntries.RESERVES, Decimal(50.0))
+    assert balance_sheet.asset(BalanceEntries.RESERVES) == Decimal(150.0)
+    assert balance_sheet.asset_at(EntryId.RESERVES) == Decimal(150.0)
+    assert balance_sheet.asset_at(EntryId.LOANS) == Decimal(0.0)
+    assert list(balance_sheet.assets.keys()) == [BalanceEntries.RESERVES]
+
+    balance_sheet.set_liability_at(EntryId.DEPOSITS, Decimal(150.0))
+    assert balance_sheet.liabilities == {BalanceEntries.DEPOSITS: Decimal(150.0)}
+
+
+def test_running_totals():
+    balance: BalanceSheetTimeline = BalanceSheetTimeline(resum_interval=1)
+
+    balance.book_asset(BalanceEntries.DEPOSITS, Decimal(100.0))
+    balance.set_asset(BalanceEntries.DEPOSITS, Decimal(40.0))
+    balance.book_liability(BalanceEntries.EQUITY, Decimal(40.0))
+    assert balance.assets_value == Decimal(40.0)
+    assert balance.liabilities_value == Decimal(40.0)
+    assert balance.save_state()
+
+    # bypassing the booking methods makes the running totals drift
+    balance.asset_slots[EntryId.DEPOSITS] += Decimal(10.0)
+    assert not balance.save_state()
+    assert balance.assets_value == Decimal(50.0)
+
+
+def test_sparse_history():
+    balance: BalanceSheetTimeline = BalanceSheetTimeline(SparseHistory(keyframe_interval=3))
+
+    for cycle in range(10):
+        balance.book_asset(BalanceEntries.DEPOSITS, Decimal(10.0))
+        balance.book_liability(BalanceEntries.EQUITY, Decimal(10.0))
+
+        if cycle == 4:
+            balance.book_asset(BalanceEntries.MBS, Decimal(5.0))
+            balance.book_liability(BalanceEntries.MBS_EQUITY, Decimal(5.0))
+
+        balance.save_state()
+
+    assert balance.asset_history(BalanceEntries.DEPOSITS, -1) == Decimal(100.0)
+    assert balance.asset_history(BalanceEntries.DEPOSITS, -6) == Decimal(50.0)
+    assert balance.asset_history(BalanceEntries.MBS, -7) == Decimal(0.0)
+    assert balance.asset_history(BalanceEntries.MBS, -6) == Decimal(5.0)
+    assert balance.balance_history(-2).assets == {BalanceEntries.DEPOSITS: Decimal(90.0),
+                                                  BalanceEntries.MBS: Decimal(5.0)}
+
+    balance.history = ColumnarHistory()
+    assert len(balance.history) == 10
+    assert balance.liability_history(BalanceEntries.MBS_EQUITY, -1) == Decimal(5.0)
+
+
+def test_ring_history():
+    dropped: List[Decimal] = []
+    balance: BalanceSheetTimeline = BalanceSheetTimeline(
+        RingHistory(3, lambda index, assets, liabilities: dropped.append(assets[EntryId.DEPOSITS])))
+
+    for cycle in range(5):
+        balance.book_asset(BalanceEntries.DEPOSITS, Decimal(10.0))
+        balance.book_liability(BalanceEntries.EQUITY, Decimal(10.0))
+        balance.save_state()
+
+    assert len(balance.history) == 5
+    assert balance.history.start == 2
+    assert dropped == [Decimal(10.0), Decimal(20.0)]
+    assert balance.asset_history(BalanceEntries.DEPOSITS, -1) == Decimal(50.0)
+    assert balance.asset_history(BalanceEntries.DEPOSITS, -3) == Decimal(30.0)
+
+    with pytest.raises(IndexError):
+        balance.asset_history(BalanceEntries.DEPOSITS, -4)
+
+
+def test_mapped_history(tmp_path):
+    path: str = str(tmp_path / "balance.history")
+    balance: BalanceSheetTimeline = BalanceSheetTimeline(MappedHistory(path, tail=2))
+
+    for cycle in range(5):
+        balance.book_asset(BalanceEntries.DEPOSITS, Decimal(10.0))
+        balance.book_liability(BalanceEntries.EQUITY, Decimal(10.0))
+        balance.save_state()
+
+    assert balance.asset_history(BalanceEntries.DEPOSITS, -1) == Decimal(50.0)
+    assert balance.asset_history(BalanceEntries.DEPOSITS, -5) == Decimal(10.0)
+    assert balance.balance_history(-4).assets == {BalanceEntries.DEPOSITS: Decimal(20.0)}
+
+    reader: MappedHistory = MappedHistory(path, writable=False)
+    assert len(reader) == 5
+    assert reader.liability(EntryId.EQUITY, 4) == Decimal(50.0)
+    assert reader.asset(EntryId.MBS, 4) == Decimal(0.0)
+    reader.close()
+
+
+def test_mapped_history_copy(tmp_path):
+    path: str = str(tmp_path / "balance.history")
+    balance: BalanceSheetTimeline = BalanceSheetTimeline(numeric_mode=NumericMode.FIXED)
+    balance.history = MappedHistory(path, tail=1)
+
+    for cycle in range(3):
+        balance.book_asset(BalanceEntries.DEPOSITS, 10.0)
+        balance.book_liability(BalanceEntries.EQUITY, 10.0)
+        balance.save_state()
+
+    copy: BalanceSheetTimeline = deepcopy(balance)
+    copy.save_state()
+    balance.book_asset(BalanceEntries.DEPOSITS, 10.0)
+    balance.book_liability(BalanceEntries.EQUITY, 10.0)
+    balance.save_state()
+
+    # the copy continues in its own file, the original is not truncated
+    assert copy.history.path != path
+    assert len(balance.history) == 4 and len(copy.history) == 4
+    assert balance.asset_history(BalanceEntries.DEPOSITS, 1) == Fixed(40)
+    assert copy.asset_history(BalanceEntries.DEPOSITS, 1) == Fixed(30)
+
+    balance.history.close()
+    copy.history.close()
+
+    # the header holds the numeric mode and the number of states
+    reader: MappedHistory = MappedHistory(path, writable=False)
+    assert reader.numeric_mode == NumericMode.FIXED
+    assert len(reader) == 4
+    assert reader.asset(EntryId.DEPOSITS, 0) == Fixed(10)
+
+    with pytest.raises(ValueError):
+        reader.numeric_mode = NumericMode.DECIMAL
+
+    reader.close()
+
+    with open(path, 'rb') as file:
+        assert struct.unpack(MappedHistory.HEADER_FORMAT, file.read(MappedHistory.HEADER_SIZE)) == \
+               (MappedHistory.MAGIC, MappedHistory.VERSION, NumericMode.FIXED.value, BalanceEntries.COUNT, 4)
+
+
+def test_fixed_point(tmp_path):
+    assert Fixed('0.0000005') == Fixed(0)
+    assert Fixed('0.0000015').units == 2
+    assert Fixed(10) * Decimal('0.0000001') == Fixed('0.000001')
+    assert Fixed(1) / 3 * 3 == Fixed('0.999999')
+    assert Fixed(3) / Fixed(4) == Decimal('0.75')
+
+    balance_sheet: BalanceSheetTimeline = BalanceSheetTimeline(numeric_mode=NumericMode.FIXED)
+    balance_sheet.book_asset(BalanceEntries.LOANS, 0.1)
+    balance_sheet.book_asset(BalanceEntries.LOANS, 0.2)
+    balance_sheet.book_liability(BalanceEntries.DEPOSITS, 0.3)
+
+    assert balance_sheet.asset(BalanceEntries.LOANS) == Fixed('0.3')
+    assert balance_sheet.validate()
+
+    # the slots hold the units, which are only constructed as Fixed when they are read
+    assert balance_sheet.asset_slots[EntryId.LOANS] == 300000
+    assert isinstance(balance_sheet.asset_at(EntryId.LOANS), Fixed)
+    assert isinstance(balance_sheet.assets_value, Fixed)
+
+    balance_sheet.book_liability_at(EntryId.EQUITY, Fixed.from_units(1))
+    assert not balance_sheet.validate()
+
+    balance_sheet.book_liability_at(EntryId.EQUITY, Fixed.from_units(-1))
+    assert balance_sheet.save_state()
+    assert balance_sheet.asset_history(BalanceEntries.LOANS, 1) == Fixed('0.3')
+    assert balance_sheet.liability_history(BalanceEntries.SAVINGS, 1) == Fixed(0)
+
+    balance_sheet.history = MappedHistory(str(tmp_path / "fixed.history"), 0)
+    assert balance_sheet.asset_history(BalanceEntries.LOANS, 1) == Fixed('0.3')
+
+    balance_sheet.numeric_mode = NumericMode.DECIMAL
+    assert isinstance(balance_sheet.asset_history(BalanceEntries.LOANS, 1), Decimal)
@@ -1,4 +1,4 @@
-from emusim.cockpit.utilities.cycles import Period, Interval
+from emusim.cockpit.utilities.cycles import Period, Interval, EventCalendar
 
 
 def test_period_completion():
@@ -9,3 +9,14 @@ def test_period_completion():
     assert year.period_complete(Period.YEAR_DAYS - 1)
     assert month.period_complete(Period.MONTH_DAYS - 1)
     assert week.period_complete(Period.WEEK_DAYS - 1)
+
+
+def test_event_calendar():
+    calendar: EventCalendar = EventCalendar([Period(1, Interval.MONTH), Period(1, Interval.WEEK),
+                                             Period(7, Interval.DAY)])
+
+    assert len(calendar.periods) == 2
+    assert calendar.next_event(0) == Period.WEEK_DAYS - 1
+    assert calendar.next_event(Period.WEEK_DAYS - 1) == Period.WEEK_DAYS - 1
+    assert calendar.next_event(Period.MONTH_DAYS) == Period.MONTH_DAYS + Period.WEEK_DAYS - 1
+    assert EventCalendar([]).next_event(0) is None
@@ -0,0 +1,72 @@
+from decimal import *
+
+from emusim.cockpit.supply.euro import CentralBank, Bank, PrivateActor, BookingJournal, NumericMode, Fixed
+from emusim.cockpit.supply.euro.balance_entries import BalanceEntries
+
+central_bank: CentralBank = CentralBank()
+bank: Bank = Bank(central_bank)
+client: PrivateActor = PrivateActor(bank)
+
+
+def test_journaled_bookings():
+    audited: list = []
+    journal: BookingJournal = BookingJournal(lambda records: audited.append(len(records)))
+
+    central_bank.clear()
+    client.savings_rate = 0.4
+
+    for actor in [central_bank, bank, client]:
+        actor.journal = journal
+
+    central_bank.start_transactions(0)
+    client.borrow(Decimal(100.0))
+    client.process_savings()
+
+    # bookings are pending in the journal but visible to reads
+    assert client.balance.asset(BalanceEntries.DEPOSITS) == Decimal(0.0)
+    assert round(client.asset(BalanceEntries.DEPOSITS), 8) == round(Decimal(60.0), 8)
+    assert round(client.assets_value, 8) == round(Decimal(100.0), 8)
+    assert len(journal) > 0
+
+    assert central_bank.end_transactions()
+
+    assert len(journal) == 0
+    assert len(audited) == 1
+    assert round(client.balance.asset(BalanceEntries.DEPOSITS), 8) == round(Decimal(60.0), 8)
+    assert round(client.balance.asset(BalanceEntries.SAVINGS), 8) == round(Decimal(40.0), 8)
+    assert round(bank.balance.liability(BalanceEntries.SAVINGS), 8) == round(Decimal(40.0), 8)
+    assert round(bank.balance.total_balance, 8) == round(Decimal(100.0), 8)
+
+    for actor in [central_bank, bank, client]:
+        actor.journal = None
+
+
+def test_journaled_fixed_bookings():
+    records: list = []
+    journal: BookingJournal = BookingJournal(lambda committed: records.extend(committed.records))
+
+    central_bank.clear()
+    client.savings_rate = 0.4
+
+    for actor in [central_bank, bank, client]:
+        actor.numeric_mode = NumericMode.FIXED
+        actor.journal = journal
+
+    central_bank.start_transactions(0)
+    client.borrow(Fixed(100))
+    client.process_savings()
+
+    # the journal sums the units, reads are Fixed
+    assert client.asset(BalanceEntries.DEPOSITS) == Fixed(60)
+    assert client.assets_value == Fixed(100)
+    assert all(isinstance(installment, Fixed) for installment in client.installments)
+
+    assert central_bank.end_transactions()
+
+    assert all(isinstance(amount, Fixed) for actor, entry, amount in records)
+    assert client.balance.asset(BalanceEntries.SAVINGS) == Fixed(40)
+    assert bank.balance.total_balance == Fixed(100)
+
+    for actor in [central_bank, bank, client]:
+        actor.journal = None
+        actor.numeric_mode = NumericMode.DECIMAL
@@ -1,11 +1,18 @@
+import random
+import numpy as np
+import pytest
+
 from decimal import *
 
-from emusim.cockpit.supply import DataCollector
+from emusim.cockpit.supply.euro_simulation import Euro_MS_Simulation
+from emusim.cockpit.supply import DataCollector, DataSeries, Aggregate, ExportedData, Simulator, ConvergenceMonitor, PROFILE
 from emusim.cockpit.supply.euro import AggregateSimulator, EuroEconomy,QEMode, HelicopterMode,\
-    SimpleDataGenerator, SpendingMode, DefaultingMode, BalanceEntries
-from emusim.cockpit.supply.euro.aggregate_simulator import SYSTEM_DATA_FIELDS, SYSTEM, INFLATION, \
-    IM,REAL_GROWTH, BANK, PROFIT, CENTRAL_BANK_BS, BANK_BS, PRIVATE_SECTOR_BS
+    SimpleDataGenerator, SpendingMode, DefaultingMode, BalanceEntries, CheckLevel, NumericMode, EnsembleSimulator, \
+    Scenario, SweepRunner, run_scenario, ColumnarHistory, RingHistory, MappedHistory
+from emusim.cockpit.supply.euro.aggregate_simulator import SYSTEM_DATA_FIELDS, SYSTEM, INFLATION, CYCLE, \
+    IM,REAL_GROWTH, BANK, PROFIT, CENTRAL_BANK_BS, BANK_BS, PRIVATE_SECTOR_BS, DEBT_RATIO, EXTRAPOLATED
 from emusim.cockpit.utilities.cycles import Period, Interval
+from emusim import run_simulations
 
 economy: EuroEconomy = EuroEconomy()
 generator: SimpleDataGenerator = SimpleDataGenerator(economy)
@@ -43,6 +50,7 @@ def set_default_parameters():
     economy.bank.min_risk_assets = 0.0
     economy.bank.max_mbs_assets = 1.0
     economy.bank.max_security_assets = 1.0
+    economy.bank.max_risk_assets = 1.0
     economy.bank.savings_ir = 0.011
     economy.bank.client_interaction_interval = Period(1, Interval.DAY)
     economy.bank.loan_ir = 0.025
@@ -58,6 +66,7 @@ def set_default_parameters():
     economy.client.savings_rate = 0.2
     economy.client.borrow_for_securities = 0.0
     economy.client.defaulting_mode = DefaultingMode.NONE
+    economy.client.unresolved_debt_growth = 0.0
 
 
 def init_collector():
@@ -90,6 +99,17 @@ def init_collector():
     collector.set_collect_data(BANK, PROFIT, True)
 
 
+def reset_economy():
+    economy.central_bank.clear()
+    economy.client.borrow(Decimal(1000000.0))
+
+
+def init_simulation():
+    set_default_parameters()
+    init_collector()
+    reset_economy()
+
+
 def test_no_growth():
     init_collector()
     set_default_parameters()
@@ -200,4 +220,618 @@ def test_deposits_savings():
 
     for i in range(len(client_deposits)):
         assert round(client_deposits[i], 8) == round(bank_deposits[i], 8)
-        assert round(client_savings[i], 8) == round(bank_savings[i], 8)
\ No newline at end of file
+        assert round(client_savings[i], 8) == round(bank_savings[i], 8)
+
+
+def test_check_levels():
+    init_simulation()
+
+    # unbalance the bank without going through the double entry bookings
+    economy.bank.book_asset(BalanceEntries.RESERVES, Decimal(1000.0))
+
+    simulator.check_level = CheckLevel.OFF
+    simulator.run_simulation(Period.MONTH_DAYS)
+    assert simulator.failed_check is None
+    assert collector.get_data_series(SYSTEM, CYCLE)[-1] == Period.MONTH_DAYS
+
+    reset_economy()
+    economy.bank.book_asset(BalanceEntries.RESERVES, Decimal(1000.0))
+
+    simulator.check_level = CheckLevel.SAMPLED
+    simulator.check_interval = 7
+    simulator.run_simulation(Period.MONTH_DAYS)
+    assert simulator.failed_check == (6, economy.bank)
+
+    simulator.check_level = CheckLevel.FULL
+
+
+def test_numeric_modes():
+    init_simulation()
+
+    divergence = simulator.numeric_divergence(Period.MONTH_DAYS)
+
+    assert economy.numeric_mode == NumericMode.DECIMAL
+    assert divergence[SYSTEM][IM] < Decimal(1e-9)
+    assert divergence[BANK_BS][BalanceEntries.DEPOSITS] < Decimal(1e-9)
+
+    simulator.numeric_mode = NumericMode.FLOAT
+    simulator.run_simulation(Period.MONTH_DAYS)
+
+    assert simulator.failed_check is None
+    assert isinstance(collector.get_data_series(SYSTEM, IM)[-1], float)
+    assert isinstance(economy.bank.liability(BalanceEntries.DEPOSITS), float)
+    assert isinstance(economy.bank.balance.balance_history(1).assets_value, float)
+
+    simulator.numeric_mode = NumericMode.DECIMAL
+
+    assert isinstance(economy.bank.balance.liability_history(BalanceEntries.DEPOSITS, 1), Decimal)
+
+
+def test_skip_idle_cycles():
+    set_default_parameters()
+    init_collector()
+
+    economy.security_growth = 0.0001
+    economy.bank.reserves_interval = Period(1, Interval.MONTH)
+    economy.central_bank.reserve_interest_interval = Period(1, Interval.MONTH)
+    economy.central_bank.loan_interval = Period(1, Interval.WEEK)
+    economy.central_bank.loan_duration = Period(4, Interval.WEEK)
+    economy.bank.client_interaction_interval = Period(1, Interval.MONTH)
+    economy.bank.loan_duration = Period(1, Interval.YEAR)
+    simulator.collect_interval = Period(1, Interval.MONTH)
+
+    ims = []
+
+    for skip_idle_cycles in [False, True]:
+        reset_economy()
+
+        simulator.skip_idle_cycles = skip_idle_cycles
+        simulator.run_simulation(Period.YEAR_DAYS)
+        ims.append(collector.get_data_series(SYSTEM, IM))
+
+        assert economy.central_bank.cycle == Period.YEAR_DAYS
+
+    assert len(ims[0]) == len(ims[1])
+
+    for im, skipped_im in zip(ims[0], ims[1]):
+        assert round(im, 6) == round(skipped_im, 6)
+
+    simulator.skip_idle_cycles = False
+    simulator.collect_interval = Period(1, Interval.DAY)
+
+
+def test_profiling(capsys):
+    init_simulation()
+
+    collector.set_collect_data(PROFILE, "update_risk_assets", True)
+    simulator.profiling = True
+    simulator.run_simulation(Period.MONTH_DAYS)
+
+    assert capsys.readouterr().out == simulator.profiler.summary() + "\n"
+
+    # a profiled stream does not print the summary, only run_simulation does
+    reset_economy()
+
+    for record in simulator.stream(Period.MONTH_DAYS):
+        pass
+
+    simulator.profiling = False
+    collector.set_collect_data(PROFILE, "update_risk_assets", False)
+
+    assert capsys.readouterr().out == ""
+    assert simulator.profiler.calls("process_cycle") == Period.MONTH_DAYS
+    assert simulator.profiler.calls("update_risk_assets") == Period.MONTH_DAYS
+    assert simulator.profiler.calls("collect_data") == len(collector.get_data_series(SYSTEM, CYCLE))
+    assert simulator.profiler.time("process_cycle") >= simulator.profiler.time("update_risk_assets")
+    assert len(collector.get_data_series(PROFILE, "update_risk_assets")) == Period.MONTH_DAYS
+
+    # the phases are not timed without profiling
+    assert not simulator.profiler.attached
+    assert "process_cycle" not in vars(simulator)
+
+
+def test_checkpoint(tmp_path):
+    set_default_parameters()
+    init_collector()
+
+    economy.client.defaulting_mode = DefaultingMode.PROBABILISTIC
+    reset_economy()
+
+    random.seed(1)
+    simulator.checkpoint_interval = Period.MONTH_DAYS
+    simulator.checkpoint_path = str(tmp_path / "simulation.checkpoint")
+    simulator.run_simulation(2 * Period.MONTH_DAYS + 10)
+    simulator.checkpoint_interval = 0
+    economy.client.defaulting_mode = DefaultingMode.NONE
+
+    # the checkpoint of the last complete month includes the state of the random module
+    random.seed(2)
+    resumed: AggregateSimulator = Simulator.load_checkpoint(simulator.checkpoint_path)
+
+    assert resumed.cycle == 2 * Period.MONTH_DAYS
+    assert not resumed.finished
+
+    resumed.resume_simulation()
+
+    assert resumed.finished
+    assert list(resumed.collector.get_data_series(SYSTEM, IM)) == list(collector.get_data_series(SYSTEM, IM))
+    assert resumed.economy.bank.balance.assets_value == economy.bank.balance.assets_value
+
+
+def test_fork():
+    init_simulation()
+
+    simulator.run_simulation(2 * Period.MONTH_DAYS)
+    ims = list(collector.get_data_series(SYSTEM, IM))
+
+    reset_economy()
+
+    simulator.run_simulation(Period.MONTH_DAYS)
+    same, diverging = simulator.fork(2)
+    diverging.economy.growth_rate = 0.0
+
+    for branch in [same, diverging]:
+        branch.resume_simulation(2 * Period.MONTH_DAYS)
+
+    assert list(same.collector.get_data_series(SYSTEM, IM)) == ims
+    assert diverging.collector.get_data_series(SYSTEM, IM)[-1] != ims[-1]
+
+    # the history up to the fork is shared
+    assert same.economy.bank.balance.history.base is diverging.economy.bank.balance.history.base
+    assert len(same.economy.bank.balance.history.history) == Period.MONTH_DAYS
+
+
+def test_fork_bounded_history(tmp_path):
+    for mapped in [False, True]:
+        init_simulation()
+
+        if mapped:
+            economy.map_history(str(tmp_path), 10)
+        else:
+            economy.retain_history(10)
+
+        simulator.run_simulation(Period.MONTH_DAYS)
+        branches = simulator.fork(2)
+
+        for branch in branches:
+            branch.resume_simulation(2 * Period.MONTH_DAYS)
+
+        histories = [branch.economy.bank.balance.history.history for branch in branches]
+
+        if mapped:
+            # every branch writes its own file
+            assert all(isinstance(history, MappedHistory) for history in histories)
+            assert len({history.path for history in histories + [economy.bank.balance.history.base]}) == 3
+            assert all(len(history) == Period.MONTH_DAYS for history in histories)
+        else:
+            # the branches only retain as many states as the economy
+            assert all(isinstance(history, RingHistory) and history.capacity == 10 for history in histories)
+            assert branches[0].economy.bank.balance.history.start == 2 * Period.MONTH_DAYS - 10
+
+        assert branches[0].economy.bank.balance.asset_history(BalanceEntries.LOANS, 1) \
+               == branches[0].economy.bank.balance.asset(BalanceEntries.LOANS)
+
+        for actor in [economy.central_bank, economy.bank, economy.client]:
+            actor.balance.history = ColumnarHistory()
+
+
+def setup_sweep(sweep_simulator: AggregateSimulator, growth_rate: float):
+    sweep_simulator.economy.growth_rate = growth_rate
+    sweep_simulator.economy.central_bank.clear()
+    sweep_simulator.economy.client.borrow(Decimal(1000000.0))
+    sweep_simulator.collector.set_collect_data(SYSTEM, IM, True)
+
+
+def test_sweep():
+    scenarios = [Scenario(str(growth_rate), Period.MONTH_DAYS, setup_sweep, {'growth_rate': growth_rate})
+                 for growth_rate in [0.0, 0.03, 0.1]]
+    sequential = {result.name: result for result in SweepRunner(0).run(scenarios)}
+    results = list(SweepRunner(2, max_pending=2).run(scenarios))
+
+    assert sorted(result.name for result in results) == sorted(sequential.keys())
+
+    for result in results:
+        assert result.completed
+        assert list(result.get_data_series(SYSTEM, IM)) == list(sequential[result.name].get_data_series(SYSTEM, IM))
+
+    timed_out = run_scenario(Scenario("timeout", 2 * Period.MONTH_DAYS, setup_sweep, {'growth_rate': 0.03}), 0.0)
+
+    assert timed_out.timed_out and not timed_out.completed
+    assert timed_out.cycles < 2 * Period.MONTH_DAYS
+
+
+def test_convergence():
+    init_simulation()
+
+    simulator.run_simulation(Period.YEAR_DAYS)
+    cycles = list(collector.get_data_series(SYSTEM, CYCLE))
+    ims = list(collector.get_data_series(SYSTEM, IM))
+
+    reset_economy()
+
+    simulator.convergence = ConvergenceMonitor([(SYSTEM, REAL_GROWTH), (SYSTEM, DEBT_RATIO)], Period.MONTH_DAYS, 0.01)
+    simulator.run_simulation(Period.YEAR_DAYS)
+    simulator.convergence = None
+
+    assert simulator.converged
+    assert simulator.cycle < Period.YEAR_DAYS
+    assert simulator.extrapolated == Period.YEAR_DAYS - simulator.cycle
+    assert list(collector.get_data_series(SYSTEM, CYCLE)) == cycles
+    assert abs(collector.get_data_series(SYSTEM, IM)[-1] / ims[-1] - 1) < 0.001
+
+    flags = collector.get_data_series(SYSTEM, EXTRAPOLATED)
+
+    assert len(flags) == len(cycles)
+    assert sum(flags) == simulator.extrapolated
+    assert flags[-1] == 1
+
+
+def test_stream():
+    init_simulation()
+
+    simulator.run_simulation(Period.MONTH_DAYS)
+    ims = list(collector.get_data_series(SYSTEM, IM))
+
+    reset_economy()
+
+    collector.retain = 2
+    stream = simulator.stream(Period.MONTH_DAYS)
+    streamed_ims = [next(stream).sample[(SYSTEM, IM)] for cycle in range(10)]
+
+    # dropping the stream stops the run
+    del stream
+
+    assert simulator.cycle == 10
+    assert len(collector.get_data_series(SYSTEM, IM)) < 4
+
+    streamed_ims += [record.sample[(SYSTEM, IM)] for record in simulator.resume_stream(every_cycle=True)]
+    collector.retain = None
+
+    assert streamed_ims == ims
+    assert simulator.finished
+
+
+def test_deflate():
+    set_default_parameters()
+    init_collector()
+    collector.set_collect_data(SYSTEM, INFLATION, True)
+    collector.exact = True
+
+    reset_economy()
+
+    simulator.run_simulation(Period.MONTH_DAYS)
+    collector.set_collect_data(SYSTEM, INFLATION, False)
+
+    amount = Decimal(1000.0)
+    deflated = amount
+    nominal = []
+
+    for inflation in collector.get_data_series(SYSTEM, INFLATION):
+        deflated /= 1 + inflation
+        nominal.append(amount)
+
+    # reading the inflation outside of a collection does not deflate again
+    simulator.data(SYSTEM, INFLATION)
+
+    assert abs(simulator.deflate(amount, True) - deflated) < Decimal(1e-20)
+    assert abs(simulator.deflate_series(nominal)[-1] - deflated) < Decimal(1e-20)
+
+    collector.exact = False
+
+
+def test_collection_plan():
+    init_simulation()
+
+    simulator.run_simulation(Period.MONTH_DAYS)
+
+    assert len(collector.get_data_series(SYSTEM, INFLATION)) == 0
+    assert collector.get_last_data(SYSTEM, IM) == simulator.data(SYSTEM, IM)
+
+    # the plan is compiled again with the changed flags
+    size: int = collector.size
+    collector.set_collect_data(SYSTEM, INFLATION, True)
+    simulator.resume_simulation(2 * Period.MONTH_DAYS)
+    collector.set_collect_data(SYSTEM, INFLATION, False)
+
+    assert len(collector.get_data_series(SYSTEM, INFLATION)) == collector.size - size
+    assert collector.get_last_data(SYSTEM, INFLATION) == economy.inflation
+
+
+def test_balance_collection():
+    set_default_parameters()
+    init_collector()
+
+    simulator.set_collect_balance_data(CENTRAL_BANK_BS, False)
+    simulator.set_collect_balance_data(BANK_BS, False)
+    simulator.set_collect_balance_data(BANK_BS, True, [BalanceEntries.EQUITY])
+    simulator.set_collect_balance_data(PRIVATE_SECTOR_BS, False)
+
+    reset_economy()
+
+    simulator.run_simulation(Period.MONTH_DAYS)
+
+    assert CENTRAL_BANK_BS not in collector.get_categories()
+    assert PRIVATE_SECTOR_BS not in collector.get_categories()
+    assert list(collector.get_data_fields(BANK_BS)) == [BalanceEntries.EQUITY]
+    assert len(collector.get_data_series(BANK_BS, BalanceEntries.EQUITY)) == collector.size
+
+
+def test_data_series():
+    series: DataSeries = DataSeries(2)
+
+    for value in range(5):
+        series.append(float(value))
+
+    assert series.values.dtype == float
+    assert list(series.values) == [0.0, 1.0, 2.0, 3.0, 4.0]
+
+    series.trim(2)
+
+    assert list(series.values) == [3.0, 4.0]
+
+    decimals: DataSeries = DataSeries(2)
+    decimals.append(Decimal(1) / 3)
+
+    assert decimals.values.dtype == float
+    assert decimals.last == Decimal(1) / 3
+
+    exact: DataSeries = DataSeries(2, exact=True)
+    exact.append(Decimal(1) / 3)
+
+    assert exact.values[0] == Decimal(1) / 3
+
+
+def test_decimal_collection():
+    init_simulation()
+
+    simulator.run_simulation(Period.YEAR_DAYS)
+
+    assert isinstance(simulator.data(SYSTEM, IM), Decimal)
+    assert collector.get_data_series(SYSTEM, IM).dtype == float
+    assert collector.get_data_series(SYSTEM, "unknown").dtype == float
+
+    # 8 bytes per value of the series, which were reserved for the run
+    series: int = sum(len(collector.get_data_fields(category)) for category in collector.get_categories())
+    assert collector.nbytes <= 8 * (Period.YEAR_DAYS + 2) * series
+
+
+def test_decimal_history():
+    init_simulation()
+
+    history: ColumnarHistory = ColumnarHistory()
+    economy.bank.balance.history = history
+    simulator.run_simulation(3 * Period.YEAR_DAYS)
+
+    assert len(history) == 3 * Period.YEAR_DAYS
+
+    # at most 18 bytes per value of a column, a 128-bit coefficient and a 16-bit exponent
+    assert history.nbytes <= 18 * 2 * BalanceEntries.COUNT * len(history)
+
+    for name in [BalanceEntries.LOANS, BalanceEntries.RESERVES]:
+        assert economy.bank.balance.asset_history(name, 1) == economy.bank.balance.asset(name)
+
+
+def test_retained_size():
+    init_simulation()
+
+    collector.retain = 10
+    simulator.run_simulation(Period.MONTH_DAYS)
+    collector.retain = None
+
+    assert 10 <= collector.size < 20
+    assert collector.size == len(collector.get_data_series(SYSTEM, CYCLE))
+    assert collector.get_data_series(SYSTEM, CYCLE)[-1] == Period.MONTH_DAYS
+
+
+def test_aggregates():
+    init_simulation()
+
+    simulator.collect_interval = Period(1, Interval.MONTH)
+    collector.set_aggregates(SYSTEM, DEBT_RATIO, [Aggregate.MIN, Aggregate.MAX, Aggregate.MEAN])
+    simulator.run_simulation(Period.YEAR_DAYS)
+    collector.set_aggregates(SYSTEM, DEBT_RATIO, [])
+    simulator.collect_interval = Period(1, Interval.DAY)
+
+    ratios = collector.get_data_series(SYSTEM, DEBT_RATIO)
+    minima = collector.get_data_series(SYSTEM, Aggregate.MIN.series_name(DEBT_RATIO))
+    maxima = collector.get_data_series(SYSTEM, Aggregate.MAX.series_name(DEBT_RATIO))
+    means = collector.get_data_series(SYSTEM, Aggregate.MEAN.series_name(DEBT_RATIO))
+
+    assert len(ratios) == len(minima) == len(maxima) == len(means) == 13
+    assert Aggregate.data_field(Aggregate.MEAN.series_name(DEBT_RATIO)) == DEBT_RATIO
+
+    for ratio, minimum, maximum, mean in zip(ratios, minima, maxima, means):
+        assert minimum <= ratio <= maximum
+        assert minimum <= mean <= maximum
+
+
+def test_export(tmp_path):
+    set_default_parameters()
+    init_collector()
+    collector.set_collect_data(SYSTEM, INFLATION, True)
+
+    reset_economy()
+
+    simulator.run_simulation(Period.MONTH_DAYS)
+    collector.set_collect_data(SYSTEM, INFLATION, False)
+
+    path = str(tmp_path / "export.npz")
+    collector.export(path)
+    exported: ExportedData = ExportedData(path)
+
+    assert list(exported.get_categories()) == list(collector.get_categories())
+    assert list(exported.get_data_series(SYSTEM, IM, mmap=True)) \
+           == [float(im) for im in collector.get_data_series(SYSTEM, IM)]
+    assert exported.info(SYSTEM, IM).deflated
+    assert exported.get_data_series(SYSTEM, INFLATION, percentages=True)[-1] \
+           == float(collector.get_data_series(SYSTEM, INFLATION)[-1]) * 100
+    assert exported.get_data_series(SYSTEM, CYCLE, cycle_period=Period(1, Interval.WEEK))[-1] \
+           == float(collector.get_data_series(SYSTEM, CYCLE)[-1]) / Period.WEEK_DAYS
+
+
+def test_legacy_deflators():
+    simulation: Euro_MS_Simulation = Euro_MS_Simulation()
+    simulation.run_simulation(50)
+    cycles: int = simulation.cycles_executed
+
+    deflated = []
+
+    for cycle in range(1, cycles):
+        amount = simulation.im[cycle]
+
+        for inflation in simulation.inflation_rate[0:cycle]:
+            amount /= 1 + inflation
+
+        deflated.append(amount)
+
+    for expected, value in zip(deflated, simulation.deflate_series(simulation.im, 1, cycles)):
+        assert abs(value - expected) < 1e-9 * expected
+
+    assert simulation.get_data(simulation.im, 1, cycles) == np.round(simulation.im[1:cycles], 2).tolist()
+    assert len(simulation.get_growth(simulation.im, True)) == len(simulation.im) - 2
+
+    # the deflators are built again from the rates of a new run of the same length
+    simulation.initial_inflation_rate = 0.03
+    simulation.run_simulation(50)
+
+    assert simulation.cycles_executed == cycles
+    assert abs(simulation.deflate(1.0, 1) - 1 / (1 + simulation.inflation_rate[0])) < 1e-12
+
+    # and from a rate which is written in place
+    simulation.inflation_rate[1] = 0.5
+    assert abs(simulation.deflate(1.0, 2) - 1 / (1 + simulation.inflation_rate[0]) / 1.5) < 1e-12
+    assert simulation.deflate(1.0, 1) == 1 / (1 + simulation.inflation_rate[0])
+
+
+def test_ensemble():
+    init_simulation()
+
+    ensemble: EnsembleSimulator = EnsembleSimulator(simulator, 3)
+    ensemble.set_parameter('economy.growth_rate', [0.03, 0.0, 0.03])
+    ensemble.balance_entry(BANK_BS, BalanceEntries.RESERVES)[2] += 1000.0
+    ensemble.run_simulation(Period.MONTH_DAYS)
+
+    simulator.run_simulation(Period.MONTH_DAYS)
+
+    ims = ensemble.get_data_series(SYSTEM, IM)
+    assert list(ensemble.active) == [True, True, False]
+    assert len(ims) == len(collector.get_data_series(SYSTEM, IM))
+
+    for im, deflated_im in zip(ims[:, 0], collector.get_data_series(SYSTEM, IM)):
+        assert round(im, 4) == round(float(deflated_im), 4)
+
+    # without growth only inflation is left
+    for real_growth in ensemble.get_data_series(SYSTEM, REAL_GROWTH)[1:, 1]:
+        assert round(real_growth, 4) == -0.019
+
+    # the unbalanced replication stops after its first cycle
+    assert ensemble.get_data_series(SYSTEM, CYCLE)[0, 2] == 1
+    assert all(im != im for im in ims[1:, 2])
+
+    # a new run starts from the initial state again
+    ensemble.run_simulation(Period.MONTH_DAYS)
+
+    assert list(ensemble.active) == [True, True, False]
+    assert np.array_equal(ensemble.get_data_series(SYSTEM, IM), ims, equal_nan=True)
+    assert ensemble.parameter('economy.inflation')[0] == 0.019
+
+
+def assert_same_series(ensemble: EnsembleSimulator, data_collector: DataCollector, length: int):
+    """Compare all collected series of all replications of an ensemble with the ones of a simulator."""
+    for category in data_collector.get_categories():
+        for data_field in data_collector.get_data_fields(category):
+            expected = data_collector.get_data_series(category, data_field)
+            series = ensemble.get_data_series(category, data_field)
+
+            assert len(series) == len(expected) == length
+
+            for values, expected_value in zip(series, expected):
+                expected_value = float(expected_value)
+
+                for value in values:
+                    assert value == expected_value or abs(value - expected_value) < 1e-9 * max(1.0, abs(expected_value))
+
+
+def assert_ensemble_matches(years: int):
+    """Run an ensemble of two replications of the current economy and the simulator itself, and compare all collected
+    series of both replications with the ones of the simulator."""
+    ensemble: EnsembleSimulator = EnsembleSimulator(simulator, 2)
+    ensemble.run_simulation(years * Period.YEAR_DAYS)
+    simulator.run_simulation(years * Period.YEAR_DAYS)
+
+    assert list(ensemble.active) == [True, True]
+    assert_same_series(ensemble, collector, years * 12 + 1)
+
+
+@pytest.mark.parametrize('param_initialization', [run_simulations.set_no_sec_parameters,
+                                                  run_simulations.set_sec_parameters])
+@pytest.mark.parametrize('setup', [run_simulations.base_no_growth, run_simulations.no_growth,
+                                   run_simulations.base_low_growth, run_simulations.long_base_low_growth,
+                                   run_simulations.base_high_growth, run_simulations.high_growth,
+                                   run_simulations.equal_growth_interest])
+def test_ensemble_scenarios(setup, param_initialization):
+    # the ensemble books the same cycles as the simulator in every scenario of run_simulations
+    scenario_economy: EuroEconomy = EuroEconomy()
+    scenario_simulator: AggregateSimulator = AggregateSimulator(scenario_economy,
+                                                                SimpleDataGenerator(scenario_economy))
+    setup(scenario_simulator, param_initialization, 0.9)
+
+    ensemble: EnsembleSimulator = EnsembleSimulator(scenario_simulator, 2)
+    ensemble.run_simulation(3 * Period.YEAR_DAYS)
+    scenario_simulator.run_simulation(3 * Period.YEAR_DAYS)
+
+    assert list(ensemble.active) == [True, True]
+    assert_same_series(ensemble, scenario_simulator.collector, 3 * 12 + 1)
+
+
+def test_ensemble_qe():
+    init_simulation()
+
+    economy.central_bank.qe_mode = QEMode.DEBT_RELATED
+    economy.central_bank.qe_debt_related = 0.001
+    economy.central_bank.helicopter_mode = HelicopterMode.FIXED
+    economy.central_bank.helicopter_fixed = 100
+    simulator.collect_interval = Period(1, Interval.MONTH)
+
+    assert_ensemble_matches(3)
+    assert collector.get_data_series(CENTRAL_BANK_BS, BalanceEntries.SECURITIES)[-1] > 0.0
+
+    simulator.collect_interval = Period(1, Interval.DAY)
+
+
+def test_ensemble_defaulting():
+    init_simulation()
+
+    # every installment defaults by the same share, so the draws of both simulations agree
+    economy.client.defaulting_mode = DefaultingMode.PROBABILISTIC
+    economy.client.defaulting_probability = 1.0
+    economy.client.defaulting_min = 0.01
+    economy.client.defaulting_max = 0.01
+    economy.client.defaults_bought_by_debt_collectors = 0.5
+    economy.client.unresolved_debt_growth = 0.001
+    simulator.collect_interval = Period(1, Interval.MONTH)
+
+    assert_ensemble_matches(3)
+    assert collector.get_data_series(PRIVATE_SECTOR_BS, BalanceEntries.UNRESOLVED_DEBT)[-1] > 0.0
+
+    simulator.collect_interval = Period(1, Interval.DAY)
+
+
+def test_ensemble_risk_assets():
+    init_simulation()
+
+    # the bank balances its risk assets with the batched linear programs of the ensemble
+    economy.security_growth = 0.0001
+    economy.mbs_growth = 0.0001
+    economy.central_bank.securities_relative_reserve = 0.05
+    economy.central_bank.mbs_relative_reserve = 0.05
+    economy.bank.min_risk_assets = 0.1
+    economy.bank.max_risk_assets = 0.4
+    economy.bank.max_mbs_assets = 0.5
+    economy.bank.max_security_assets = 0.8
+    simulator.collect_interval = Period(1, Interval.MONTH)
+
+    assert_ensemble_matches(3)
+    assert collector.get_data_series(BANK_BS, BalanceEntries.SECURITIES)[-1] > 0.0
+
+    simulator.collect_interval = Period(1, Interval.DAY)
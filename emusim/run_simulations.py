@@ -1,35 +1,21 @@
 from decimal import *
 from datetime import datetime
+from typing import Callable, List
 
 from emusim.cockpit.supply import DataCollector
 from emusim.cockpit.supply.euro import AggregateSimulator, EuroEconomy,QEMode,HelicopterMode,\
-    SimpleDataGenerator, SpendingMode, DefaultingMode, BalanceEntries, Bank, PrivateActor
+    SimpleDataGenerator, SpendingMode, DefaultingMode, BalanceEntries, Bank, PrivateActor, Scenario, ScenarioResult, \
+    SweepRunner
 from emusim.cockpit.supply.euro.aggregate_simulator import PERCENTAGE_FIELDS, SYSTEM_DATA_FIELDS, SYSTEM, \
     CYCLE, REAL_GROWTH, DEBT_RATIO, REQUIRED_LENDING,REQUIRED_LENDING_RATE, BANK, BANK_DATA_FIELDS, CENTRAL_BANK_BS, BANK_BS, \
     PRIVATE_SECTOR_BS
 from emusim.cockpit.utilities.cycles import Period, Interval
 
-economy: EuroEconomy
-generator: SimpleDataGenerator
-simulator: AggregateSimulator
-collector: DataCollector
-
 YEARS: int = 100
 
-def reset():
-    global economy
-    global generator
-    global simulator
-    global collector
-
-    economy = EuroEconomy()
-    generator = SimpleDataGenerator(economy)
-    simulator = AggregateSimulator(economy, generator)
-    collector = simulator.collector
 
-
-def set_no_sec_parameters():
-    reset()
+def set_no_sec_parameters(simulator: AggregateSimulator):
+    economy: EuroEconomy = simulator.economy
 
     # simulator
     simulator.collect_interval = Period(1, Interval.MONTH)
@@ -80,8 +66,9 @@ def set_no_sec_parameters():
     economy.client.defaulting_mode = DefaultingMode.NONE
 
 
-def set_sec_parameters():
-    set_no_sec_parameters()
+def set_sec_parameters(simulator: AggregateSimulator):
+    set_no_sec_parameters(simulator)
+    economy: EuroEconomy = simulator.economy
 
     economy.central_bank.mbs_relative_reserve = 0.0
     economy.central_bank.securities_relative_reserve = 0.05
@@ -92,7 +79,9 @@ def set_sec_parameters():
     economy.bank.max_security_assets = 1.0
 
 
-def init_collector():
+def init_collector(collector: DataCollector):
+    # the data files show the collected Decimals
+    collector.exact = True
     collector.set_collect_data(SYSTEM, CYCLE, True)
     collector.set_collect_data(SYSTEM, REAL_GROWTH, True)
     collector.set_collect_data(SYSTEM, DEBT_RATIO, True)
@@ -130,7 +119,7 @@ def init_collector():
 
 
 # debt percentage of money stock
-def init_bank_balance(debt):
+def init_bank_balance(economy: EuroEconomy, debt):
     bank: Bank = economy.bank
     client: PrivateActor = economy.client
 
@@ -150,17 +139,17 @@ def init_bank_balance(debt):
     assert client.balance.validate()
 
 
-def dump_data(file_name: str):
-    file_name = sec_no_sec + " - " + file_name
+def dump_data(result: ScenarioResult):
+    file_name: str = result.name
     file = open("data/" + file_name + ".csv", "w")
 
-    for category in collector.get_categories():
-        for data_field in collector.get_data_fields(category):
+    for category in result.get_categories():
+        for data_field in result.get_data_fields(category):
             file.write(category + " - " + data_field)
 
             first_column: bool = True
 
-            for data in collector.get_data_series(category, data_field):
+            for data in result.get_data_series(category, data_field):
                 if not first_column:
                     if data_field == CYCLE:
                         data /= Period.MONTH_DAYS
@@ -185,14 +174,15 @@ def dump_data(file_name: str):
             if data_field == CYCLE:
                 print(file_name
                       + ": "
-                      + str(round(collector.get_data_series(category, data_field)[-1] / Period.YEAR_DAYS, 2)))
+                      + str(round(result.get_data_series(category, data_field)[-1] / Period.YEAR_DAYS, 2)))
 
             file.write("\n")
     file.close()
 
 
-def run_base_high_growth(param_initialization, debt):
-    param_initialization()
+def base_high_growth(simulator: AggregateSimulator, param_initialization, debt):
+    param_initialization(simulator)
+    economy: EuroEconomy = simulator.economy
 
     economy.growth_rate = 0.1
 
@@ -210,15 +200,13 @@ def run_base_high_growth(param_initialization, debt):
     economy.bank.profit_spending = 1
 
     economy.central_bank.clear()
-    init_bank_balance(debt)
-    init_collector()
-    simulator.run_simulation(YEARS * Period.YEAR_DAYS)
-
-    dump_data("base_high_growth")
+    init_bank_balance(economy, debt)
+    init_collector(simulator.collector)
 
 
-def run_base_low_growth(param_initialization, debt):
-    param_initialization()
+def base_low_growth(simulator: AggregateSimulator, param_initialization, debt):
+    param_initialization(simulator)
+    economy: EuroEconomy = simulator.economy
 
     economy.growth_rate = 0.03
 
@@ -236,15 +224,13 @@ def run_base_low_growth(param_initialization, debt):
     economy.bank.profit_spending = 1
 
     economy.central_bank.clear()
-    init_bank_balance(debt)
-    init_collector()
-    simulator.run_simulation(YEARS * Period.YEAR_DAYS)
+    init_bank_balance(economy, debt)
+    init_collector(simulator.collector)
 
-    dump_data("base_low_growth")
 
-
-def run_long_base_low_growth(param_initialization, debt):
-    param_initialization()
+def long_base_low_growth(simulator: AggregateSimulator, param_initialization, debt):
+    param_initialization(simulator)
+    economy: EuroEconomy = simulator.economy
 
     economy.growth_rate = 0.03
 
@@ -261,16 +247,17 @@ def run_long_base_low_growth(param_initialization, debt):
     economy.bank.spending_mode = SpendingMode.PROFIT
     economy.bank.profit_spending = 1
 
-    economy.central_bank.clear()
-    init_bank_balance(debt)
-    init_collector()
-    simulator.run_simulation(500 * Period.YEAR_DAYS)
+    # only the recent balance history is needed, keep memory constant over the long run
+    economy.retain_history(Period.MONTH_DAYS)
 
-    dump_data("long_base_low_growth")
+    economy.central_bank.clear()
+    init_bank_balance(economy, debt)
+    init_collector(simulator.collector)
 
 
-def run_base_no_growth(param_initialization, debt):
-    param_initialization()
+def base_no_growth(simulator: AggregateSimulator, param_initialization, debt):
+    param_initialization(simulator)
+    economy: EuroEconomy = simulator.economy
 
     economy.growth_rate = 0.0
 
@@ -288,17 +275,15 @@ def run_base_no_growth(param_initialization, debt):
     economy.bank.profit_spending = 1
 
     economy.central_bank.clear()
-    init_bank_balance(debt)
-    init_collector()
-    simulator.run_simulation(YEARS * Period.YEAR_DAYS)
-
-    dump_data("base_no_growth")
+    init_bank_balance(economy, debt)
+    init_collector(simulator.collector)
 
 
-def run_no_growth(param_initialization, debt):
-    param_initialization()
+def no_growth(simulator: AggregateSimulator, param_initialization, debt):
+    param_initialization(simulator)
+    economy: EuroEconomy = simulator.economy
 
-    simulator.economy.growth_rate = 0.0
+    economy.growth_rate = 0.0
 
     # central bank
     economy.central_bank.min_reserve = 0.0
@@ -316,17 +301,15 @@ def run_no_growth(param_initialization, debt):
     economy.lending_satisfaction_rate = 1
 
     economy.central_bank.clear()
-    init_bank_balance(debt)
-    init_collector()
-    simulator.run_simulation(YEARS * Period.YEAR_DAYS)
-
-    dump_data("no_growth")
+    init_bank_balance(economy, debt)
+    init_collector(simulator.collector)
 
 
-def run_equal_growth_interest(param_initialization, debt):
-    param_initialization()
+def equal_growth_interest(simulator: AggregateSimulator, param_initialization, debt):
+    param_initialization(simulator)
+    economy: EuroEconomy = simulator.economy
 
-    simulator.economy.growth_rate = 0.025
+    economy.growth_rate = 0.025
 
     # central bank
     economy.central_bank.min_reserve = 0.0
@@ -344,17 +327,15 @@ def run_equal_growth_interest(param_initialization, debt):
     economy.lending_satisfaction_rate = 0.95
 
     economy.central_bank.clear()
-    init_bank_balance(debt)
-    init_collector()
-    simulator.run_simulation(YEARS * Period.YEAR_DAYS)
+    init_bank_balance(economy, debt)
+    init_collector(simulator.collector)
 
-    dump_data("equal_growth_interest - 95%")
 
+def high_growth(simulator: AggregateSimulator, param_initialization, debt):
+    param_initialization(simulator)
+    economy: EuroEconomy = simulator.economy
 
-def run_high_growth(param_initialization, debt):
-    param_initialization()
-
-    simulator.economy.growth_rate = 0.1
+    economy.growth_rate = 0.1
 
     # central bank
     economy.central_bank.min_reserve = 0.0
@@ -371,38 +352,46 @@ def run_high_growth(param_initialization, debt):
     economy.bank.profit_spending = 0.0
 
     economy.central_bank.clear()
-    init_bank_balance(debt)
-    init_collector()
-    simulator.run_simulation(YEARS * Period.YEAR_DAYS)
+    init_bank_balance(economy, debt)
+    init_collector(simulator.collector)
 
-    dump_data("high_growth")
 
+def batch(name: str, param_initialization: Callable[[AggregateSimulator], None],
+          initial_debt) -> List[Scenario]:
+    def scenario(setup: Callable, file_name: str, years: int = YEARS) -> Scenario:
+        return Scenario(name + " - " + file_name, years * Period.YEAR_DAYS, setup,
+                        {'param_initialization': param_initialization, 'debt': initial_debt})
 
-def run_batch(param_initialization, initial_debt):
-    # run_base_no_growth(param_initialization, initial_debt)
-    # run_no_growth(param_initialization, initial_debt)
-    #
-    # run_base_low_growth(param_initialization, initial_debt)
-    # run_long_base_low_growth(param_initialization, initial_debt)
-    #
-    # run_base_high_growth(param_initialization, initial_debt)
-    # run_high_growth(param_initialization, initial_debt)
+    return [
+        # scenario(base_no_growth, "base_no_growth"),
+        # scenario(no_growth, "no_growth"),
+        #
+        # scenario(base_low_growth, "base_low_growth"),
+        # scenario(long_base_low_growth, "long_base_low_growth", 500),
+        #
+        # scenario(base_high_growth, "base_high_growth"),
+        # scenario(high_growth, "high_growth"),
+
+        scenario(equal_growth_interest, "equal_growth_interest - 95%"),
+    ]
 
-    run_equal_growth_interest(param_initialization, initial_debt)
 
-now = datetime.now()
-print("Starting")
+if __name__ == '__main__':
+    now = datetime.now()
+    print("Starting")
 
-# sec_no_sec: str = "debt = 0.1"
-# run_batch(set_no_sec_parameters, 0.1)
-#
-# sec_no_sec: str = "debt = 0.5"
-# run_batch(set_no_sec_parameters, 0.5)
+    scenarios: List[Scenario] = []
+    # scenarios += batch("debt = 0.1", set_no_sec_parameters, 0.1)
+    # scenarios += batch("debt = 0.5", set_no_sec_parameters, 0.5)
+    scenarios += batch("debt = 0.9", set_no_sec_parameters, 0.9)
+    # scenarios += batch("sec", set_sec_parameters, 0.9)
 
-sec_no_sec: str = "debt = 0.9"
-run_batch(set_no_sec_parameters, 0.9)
+    # every scenario runs on an economy of its own in a worker process
+    for result in SweepRunner().run(scenarios):
+        if result.error is not None:
+            print(result.name + " failed:\n" + result.error)
 
-# sec_no_sec = "sec"
-# run_batch(set_sec_parameters)
-print("Done: " + str(datetime.now() - now))
+        dump_data(result)
+        result.export("data/" + result.name + ".npz")
 
+    print("Done: " + str(datetime.now() - now))